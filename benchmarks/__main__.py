@@ -0,0 +1,80 @@
+"""
+Time the change-layout hot path and friends, headless, and print the results as JSON.
+
+    python -m benchmarks [--filter NAME] [--rounds N] [--output PATH]
+
+Every benchmark is run as many times as fit in about 0.2s, repeated --rounds times. Times are per call, in
+microseconds: compare the min of two runs, it is the least disturbed by the rest of the machine.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import ExitStack
+from typing import List, Optional
+
+from benchmarks.cases import BENCHMARKS
+
+RESULTS_VERSION = 1
+
+
+def run_benchmark(name: str, rounds: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="winshift-bench-") as tmp_dir, ExitStack() as stack:
+        try:
+            function = BENCHMARKS[name](tmp_dir, stack)
+        except ImportError as e:
+            return {"name": name, "skipped": f"{e}"}
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        times = [duration / number * 1_000_000 for duration in timer.repeat(rounds, number)]
+    return {
+        "name": name,
+        "number": number,
+        "rounds": rounds,
+        "min_us": round(min(times), 3),
+        "median_us": round(statistics.median(times), 3),
+        "mean_us": round(statistics.mean(times), 3),
+        "stdev_us": round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="winshift benchmarks")
+    parser.add_argument("--filter", type=str, default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of timed rounds (default: 5)")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON results to this file")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    results = []
+    for name in names:
+        result = run_benchmark(name, args.rounds)
+        results.append(result)
+        summary = result.get("skipped") or f"{result['min_us']:.3f}us min, {result['median_us']:.3f}us median"
+        print(f"{name}: {summary}", file=sys.stderr)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
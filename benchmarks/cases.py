@@ -0,0 +1,243 @@
+import os
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fake_tools import XDOTOOL_WINDOW, fake_tools, xrandr_monitors
+from winshift.modules import config, layout, reproject, screen, tiling, window
+from winshift.modules.config import ConfigData
+from winshift.modules.direction import Direction
+from winshift.modules.layout import BarHeight, Layout
+from winshift.modules.screen import ScreenData, ScreenGraph, ScreenIndex
+
+# a benchmark gets a temporary directory and an ExitStack for its cleanups, and returns the function to time
+Benchmark = Callable[[str, ExitStack], Callable[[], object]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+LAYOUT_COUNT = 500
+SCREEN_GRID = (8, 8)
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def make_screens(columns: int, rows: int) -> List[ScreenData]:
+    """Return a wall of 1920x1080 screens, every other column rotated."""
+    screens = []
+    x = 0
+    for column in range(columns):
+        width, height = (1080, 1920) if column % 2 else (1920, 1080)
+        for row in range(rows):
+            direction = Direction.VERTICAL if column % 2 else Direction.HORIZONTAL
+            screens.append(ScreenData(f"DP-{column}-{row}", x, row * height, width, height, direction))
+        x += width
+    return screens
+
+
+def make_layouts(count: int) -> List[Layout]:
+    """Return distinct layouts of both directions, sizes in ninths of the screen."""
+    layouts = []
+    for i in range(count):
+        column, span = i % 9, i % 8 + 1
+        direction = Direction.VERTICAL if i % 2 else Direction.HORIZONTAL
+        layouts.append(
+            Layout(f"layout-{i}", f"{{width}}*{column}/9,0,{{width}}*{span}/9,{{height}}-{i % 50}", direction)
+        )
+    return layouts
+
+
+def make_config(layout_count: int) -> ConfigData:
+    screens = make_screens(*SCREEN_GRID)
+    return ConfigData(
+        bar_heights=[BarHeight(s.name, top=32, bottom=0, left=0, right=0, gap=8) for s in screens[::3]],
+        layouts=make_layouts(layout_count),
+    )
+
+
+def _halves() -> Tuple[ScreenData, Layout, BarHeight]:
+    screen_data = ScreenData("DP-0", 2160, 973, 3840, 2160, Direction.HORIZONTAL)
+    return (
+        screen_data,
+        Layout("half-left", "0,0,{width}/2,{height}", Direction.HORIZONTAL),
+        BarHeight("DP-0", 32, 0, 0, 0),
+    )
+
+
+@benchmark("calculate_layout_screen")
+def _calculate_layout_screen(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screen_data, half_left, bar_height = _halves()
+    return lambda: layout.calculate_layout_screen(screen_data, half_left, bar_height)
+
+
+@benchmark("calculate_layout_screen_uncached")
+def _calculate_layout_screen_uncached(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screen_data, half_left, bar_height = _halves()
+
+    def run() -> object:
+        layout._calculate_layout.cache_clear()  # pylint: disable=protected-access
+        return layout.calculate_layout_screen(screen_data, half_left, bar_height)
+
+    return run
+
+
+@benchmark("calculate_layouts_500x64")
+def _calculate_layouts(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screens, big_config = make_screens(*SCREEN_GRID), make_config(LAYOUT_COUNT)
+    return lambda: layout.calculate_layouts(screens, big_config.layouts, big_config.bar_height_index)
+
+
+@benchmark("validate_layout")
+def _validate_layout(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    def run() -> object:
+        layout.compile_layout.cache_clear()
+        return layout.validate_layout("int({width}/3),{height}-{height}/2,{width}*2/3,{height}/2")
+
+    return run
+
+
+def _config_file(tmp_dir: str, stack: ExitStack) -> str:
+    config_path = os.path.join(tmp_dir, "config.toml")
+    config._write_config(config_path, make_config(LAYOUT_COUNT))  # pylint: disable=protected-access
+    # old enough for the parsed snapshot to be stored
+    os.utime(config_path, (0, 0))
+    old_config_path = config.DEFAULT_CONFIG_PATH
+    config.DEFAULT_CONFIG_PATH = config_path
+    stack.callback(setattr, config, "DEFAULT_CONFIG_PATH", old_config_path)
+    return config_path
+
+
+@benchmark("load_config_500_layouts")
+def _load_config(tmp_dir: str, stack: ExitStack) -> Callable[[], object]:
+    _config_file(tmp_dir, stack)
+    config.load_config()
+    return config.load_config
+
+
+@benchmark("load_config_500_layouts_uncached")
+def _load_config_uncached(tmp_dir: str, stack: ExitStack) -> Callable[[], object]:
+    cache_path = config._config_cache_path(_config_file(tmp_dir, stack))  # pylint: disable=protected-access
+
+    def run() -> object:
+        if os.path.exists(cache_path):
+            os.unlink(cache_path)
+        return config.load_config()
+
+    return run
+
+
+@benchmark("parse_screen_data")
+def _parse_screen_data(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    monitors = [line.split() for line in xrandr_monitors(make_screens(*SCREEN_GRID)).splitlines()[1:]]
+    return lambda: [screen._parse_screen_data(monitor) for monitor in monitors]  # pylint: disable=protected-access
+
+
+@benchmark("parse_window_data")
+def _parse_window_data(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    lines = XDOTOOL_WINDOW.split("\n")
+    return lambda: window._parse_window_data(lines)  # pylint: disable=protected-access
+
+
+@benchmark("get_screens_data_fake_xrandr")
+def _get_screens_data(_tmp_dir: str, stack: ExitStack) -> Callable[[], object]:
+    stack.enter_context(fake_tools(make_screens(*SCREEN_GRID)))
+    return screen.get_screens_data
+
+
+@benchmark("get_active_window_data_fake_xdotool")
+def _get_active_window_data(_tmp_dir: str, stack: ExitStack) -> Callable[[], object]:
+    stack.enter_context(fake_tools(make_screens(*SCREEN_GRID)))
+    return window.get_active_window_data
+
+
+@benchmark("locate_point_on_screen_64_screens")
+def _locate_point_on_screen(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screens = make_screens(*SCREEN_GRID)
+    return lambda: screen.locate_point_on_screen(screens, 10_000, 5_000)
+
+
+@benchmark("screen_index_locate_64_screens")
+def _screen_index_locate(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screen_index = ScreenIndex(make_screens(*SCREEN_GRID))
+    return lambda: screen_index.locate(10_000, 5_000)
+
+
+@benchmark("screen_graph_build_64_screens")
+def _screen_graph_build(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screens = make_screens(*SCREEN_GRID)
+    return lambda: ScreenGraph(screens)
+
+
+@benchmark("screen_graph_neighbor_64_screens")
+def _screen_graph_neighbor(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screen_graph = ScreenGraph(make_screens(*SCREEN_GRID))
+    return lambda: screen_graph.neighbor("DP-3-4", "right")
+
+
+@benchmark("reproject_windows_500_unplugged")
+def _reproject_windows(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    old_screens = make_screens(*SCREEN_GRID)
+    # the last column unplugged, its windows go to the one next to it
+    new_screens = old_screens[: -SCREEN_GRID[1]]
+    unplugged = old_screens[-SCREEN_GRID[1] :]
+    windows = [
+        window.WindowData(str(i), unplugged[i % len(unplugged)].x + i, unplugged[i % len(unplugged)].y, 800, 600)
+        for i in range(500)
+    ]
+    bar_heights = make_config(0).bar_height_index
+    return lambda: reproject.reproject_windows(windows, old_screens, new_screens, bar_heights)
+
+
+@benchmark("tile_screen_60_windows")
+def _tile_screen(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    screen_data, _, bar_height = _halves()
+    return lambda: [tiling.tile_screen(screen_data, 60, mode, bar_height) for mode in tiling.TILING_MODES]
+
+
+@benchmark("rule_matcher_500_rules")
+def _rule_matcher(_tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    from winshift.modules.rules import RuleMatcher, WindowRule  # pylint: disable=import-outside-toplevel
+
+    matcher = RuleMatcher(
+        [WindowRule(f"layout-{i}", window_class=f"^app{i}\\.", title=f"project-{i}") for i in range(500)]
+    )
+    # matched by the last rule
+    client_window = window.ClientWindow("1", 0, 0, 800, 600, window_class="app499.App499", title="project-499")
+    return lambda: matcher.match(client_window)
+
+
+def _icon_arguments(tmp_dir: str) -> dict:
+    return {
+        "image_size": 72,
+        "margin": 8,
+        "screen_dims": (1920, 1080),
+        "window_dims": (0, 0, 960, 1080),
+        "output_path": os.path.join(tmp_dir, "icon.png"),
+        "screen_color": "#6699ff",
+        "screen_border_color": "#b2b2b2",
+        "screen_border_width": 0,
+        "window_color": "#003399",
+        "window_border_color": "#b2b2b2",
+        "window_border_width": 1,
+    }
+
+
+@benchmark("create_image")
+def _create_image(tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    from winshift.modules.icons import create_image  # pylint: disable=import-outside-toplevel
+
+    arguments = _icon_arguments(tmp_dir)
+    return lambda: create_image(**arguments)
+
+
+@benchmark("rasterize_icon")
+def _rasterize_icon(tmp_dir: str, _stack: ExitStack) -> Callable[[], object]:
+    from winshift.modules.raster import IconRasterizer  # pylint: disable=import-outside-toplevel
+
+    arguments = _icon_arguments(tmp_dir)
+    output_path = arguments.pop("output_path")
+    rasterizer = IconRasterizer()
+    return lambda: rasterizer.encode(rasterizer.render(**arguments), arguments["image_size"], output_path)
@@ -0,0 +1,43 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from winshift.modules.screen import ScreenData
+
+
+def xrandr_monitors(screens: List[ScreenData]) -> str:
+    """Return what xrandr --listactivemonitors prints for the screens."""
+    lines = [f"Monitors: {len(screens)}"]
+    for i, screen_data in enumerate(screens):
+        lines.append(
+            f" {i}: +{'*' if i == 0 else ''}{screen_data.name} "
+            f"{screen_data.width}/600x{screen_data.height}/340+{screen_data.x}+{screen_data.y}  {screen_data.name}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+XDOTOOL_WINDOW = "Window 71303175\n  Position: 2200,1000 (screen: 0)\n  Geometry: 1920x1080\n"
+
+
+def _write_tool(bin_dir: str, name: str, output: str) -> None:
+    path = os.path.join(bin_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"#!/bin/sh\ncat <<'EOF'\n{output}EOF\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+@contextmanager
+def fake_tools(screens: List[ScreenData]) -> Iterator[str]:
+    """Put xrandr, xdotool and wmctrl stand-ins first in the PATH, so the subprocess paths run without X."""
+    with tempfile.TemporaryDirectory(prefix="winshift-bench-") as bin_dir:
+        _write_tool(bin_dir, "xrandr", xrandr_monitors(screens))
+        _write_tool(bin_dir, "xdotool", XDOTOOL_WINDOW)
+        _write_tool(bin_dir, "wmctrl", "")
+        old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{old_path}"
+        try:
+            yield bin_dir
+        finally:
+            os.environ["PATH"] = old_path
@@ -0,0 +1,8 @@
+import pytest
+
+from tests.modules.fakes import SCREENS, WINDOWS, FakeBackend
+
+
+@pytest.fixture(name="fake_backend")
+def fixture_fake_backend() -> FakeBackend:
+    return FakeBackend(list(SCREENS), list(WINDOWS))
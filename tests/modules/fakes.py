@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional, Tuple
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.direction import Direction
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.screen import ScreenData
+from winshift.modules.window import ClientWindow, WindowData
+
+
+class FakeBackend(DisplayBackend):
+    """In-memory display backend recording the applied geometries."""
+
+    def __init__(self, screens: List[ScreenData], windows: List[ClientWindow], fingerprint: Optional[str] = None):
+        self.screens = screens
+        self.windows: Dict[str, ClientWindow] = {window.name: window for window in windows}
+        self.active_window = windows[0].name if windows else None
+        self.fingerprint = fingerprint
+        self.changed = False
+        self.current_desktop: Optional[int] = None
+        self.queries = 0
+        self.moves: List[Tuple[str, CalculatedLayout]] = []
+
+    def get_screens_data(self) -> List[ScreenData]:
+        self.queries += 1
+        return self.screens
+
+    def get_active_window_data(self) -> WindowData:
+        if self.active_window is None:
+            raise RuntimeError("No active window found")
+        return self.windows[self.active_window]
+
+    def get_window_data(self, window_id: str) -> WindowData:
+        if window_id not in self.windows:
+            raise RuntimeError(f"Window {window_id} not found")
+        return self.windows[window_id]
+
+    def list_client_windows(self) -> List[ClientWindow]:
+        return list(self.windows.values())
+
+    def get_current_desktop(self) -> Optional[int]:
+        return self.current_desktop
+
+    def move_resize_window(self, window_data: WindowData, layout_data: CalculatedLayout) -> None:
+        self.moves.append((window_data.name, layout_data))
+
+    def get_screens_fingerprint(self) -> Optional[str]:
+        return self.fingerprint
+
+    def screens_changed(self) -> bool:
+        return self.changed
+
+
+SCREENS = [
+    ScreenData(name="DP-0", x=2160, y=973, width=3840, height=2160, direction=Direction.HORIZONTAL),
+    ScreenData(name="DP-2", x=0, y=0, width=2160, height=3840, direction=Direction.VERTICAL),
+]
+WINDOWS = [
+    ClientWindow(name="1", x=3953, y=1833, width=2160, height=960, window_class="firefox.Firefox", title="Inbox"),
+    ClientWindow(name="2", x=100, y=100, width=800, height=600, window_class="kitty.kitty", title="htop"),
+    ClientWindow(name="3", x=200, y=200, width=800, height=600, window_class="kitty.kitty", title="vim"),
+]
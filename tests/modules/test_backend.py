@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from pytest_mock import MockFixture
+
+from winshift.modules import backend
+from winshift.modules.backend import SubprocessBackend
+from winshift.modules.screen_cache import ScreenCache
+
+
+def test_get_backend_subprocess() -> None:
+    assert isinstance(backend.get_backend("subprocess"), SubprocessBackend)
+
+
+def test_get_backend_auto_falls_back_to_subprocess(mocker: MockFixture) -> None:
+    pytest.importorskip("Xlib")
+    mocker.patch("winshift.modules.x11.X11Backend", side_effect=ConnectionError("no display"))
+
+    assert isinstance(backend.get_backend("auto"), SubprocessBackend)
+
+
+def test_get_backend_x11_raises_without_display(mocker: MockFixture) -> None:
+    pytest.importorskip("Xlib")
+    mocker.patch("winshift.modules.x11.X11Backend", side_effect=ConnectionError("no display"))
+
+    with pytest.raises(ConnectionError):
+        backend.get_backend("x11")
+
+
+def test_get_backend_unknown() -> None:
+    with pytest.raises(ValueError):
+        backend.get_backend("wayland")
+
+
+def test_subprocess_backend_screen_cache_trusted_until_refresh(mocker: MockFixture, tmp_path) -> None:
+    monitors = ["Monitors: 1\n 0: +*DP-0 3840/600x2160/340+0+0  DP-0\n"]
+    read_active_monitors = mocker.patch("winshift.modules.screen.read_active_monitors", side_effect=lambda: monitors[0])
+    cache = ScreenCache(SubprocessBackend(), os.path.join(tmp_path, "screens.json"))
+
+    assert cache.get_screens_data()[0].width == 3840
+    # e.g. xrandr --output DP-0 --rotate left
+    monitors[0] = "Monitors: 1\n 0: +*DP-0 2160/340x3840/600+0+0  DP-0\n"
+    assert cache.get_screens_data()[0].width == 3840
+    # cached lookups don't run xrandr
+    assert read_active_monitors.call_count == 1
+
+    assert cache.refresh()[0].width == 2160
+    assert read_active_monitors.call_count == 2
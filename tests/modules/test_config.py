@@ -1,10 +1,23 @@
+import os
+import threading
+
 import pytest
 from pytest_mock import MockFixture
 
 from winshift.modules import config
 from winshift.modules.config import ConfigData
 from winshift.modules.direction import Direction
-from winshift.modules.layout import Layout
+from winshift.modules.layout import BarHeight, Layout, LayoutGroup
+from winshift.modules.profile import Profile, ProfileWindow
+from winshift.modules.rules import WindowRule
+
+
+@pytest.fixture(autouse=True)
+def isolated_config_path(mocker: MockFixture, tmp_path) -> str:
+    """Keep the tests away from the real config file and the snapshot stored next to it."""
+    config_path = os.path.join(tmp_path, "config.toml")
+    mocker.patch("winshift.modules.config.DEFAULT_CONFIG_PATH", config_path)
+    return config_path
 
 
 @pytest.mark.parametrize(
@@ -65,3 +78,196 @@ def test_load_config(mocker: MockFixture, config_str: str, path_exists: bool, ex
     if path_exists:
         mock_open.assert_called_once_with(config.DEFAULT_CONFIG_PATH, encoding="utf-8")
     assert result == expected
+
+
+def test_load_config_with_profiles(mocker: MockFixture) -> None:
+    config_str = (
+        "[profiles.desk]\n"
+        'name = "desk"\n'
+        "[[profiles.desk.windows]]\n"
+        'class = "kitty"\n'
+        'title = "^vim"\n'
+        'layout = "half-left"\n'
+        'screen = "DP-0"\n'
+    )
+    mocker.patch("builtins.open", mocker.mock_open(read_data=config_str))
+    mocker.patch("os.path.exists", return_value=True)
+
+    result = config.load_config()
+
+    expected = Profile(
+        name="desk", windows=[ProfileWindow(layout="half-left", window_class="kitty", title="^vim", screen_name="DP-0")]
+    )
+    assert result.get_profile("desk") == expected
+    assert ConfigData.from_dict(result.as_dict()).profiles == [expected]
+
+
+@pytest.mark.parametrize(
+    "window_str",
+    [
+        # typo in the matcher key, the window would match every window
+        'clas = "kitty"\nlayout = "half-left"\n',
+        'class = ""\ntitle = ""\nlayout = "half-left"\n',
+        'class = "kitty"\nlayout = ""\n',
+    ],
+)
+def test_load_config_rejects_invalid_profile_windows(isolated_config_path: str, window_str: str) -> None:
+    with open(isolated_config_path, "w", encoding="utf-8") as f:
+        f.write(f'[profiles.desk]\nname = "desk"\n[[profiles.desk.windows]]\n{window_str}')
+
+    with pytest.raises(ValueError):
+        config.load_config()
+
+
+def test_load_config_with_groups(mocker: MockFixture) -> None:
+    config_str = '[groups.left]\nname = "left"\nlayouts = ["half-left", "two-thirds-left"]\n'
+    mocker.patch("builtins.open", mocker.mock_open(read_data=config_str))
+    mocker.patch("os.path.exists", return_value=True)
+
+    result = config.load_config()
+
+    expected = LayoutGroup(name="left", layouts=["half-left", "two-thirds-left"])
+    assert result.get_group("left") == expected
+    assert ConfigData.from_dict(result.as_dict()).groups == [expected]
+    with pytest.raises(ValueError):
+        result.add_group(LayoutGroup(name="left"))
+
+
+def test_load_config_with_rules(mocker: MockFixture) -> None:
+    config_str = (
+        '[[rules]]\nclass = "kitty"\ntitle = "^vim"\nlayout = "half-left"\n'
+        '[[rules]]\nrole = "pop-up"\nlayout = "half-right"\nscreen = "DP-0"\n'
+    )
+    mocker.patch("builtins.open", mocker.mock_open(read_data=config_str))
+    mocker.patch("os.path.exists", return_value=True)
+
+    result = config.load_config()
+
+    expected = [
+        WindowRule(layout="half-left", window_class="kitty", title="^vim"),
+        WindowRule(layout="half-right", role="pop-up", screen_name="DP-0"),
+    ]
+    assert result.rules == expected
+    assert ConfigData.from_dict(result.as_dict()).rules == expected
+
+
+@pytest.mark.parametrize(
+    "rule_str",
+    [
+        # typo in the matcher key, the rule would match every window
+        'clas = "Firefox"\nlayout = "half-left"\n',
+        'class = "kitty"\nlayout = ""\n',
+        'title = "(vim"\nlayout = "half-left"\n',
+    ],
+)
+def test_load_config_rejects_invalid_rules(isolated_config_path: str, rule_str: str) -> None:
+    with open(isolated_config_path, "w", encoding="utf-8") as f:
+        f.write(f'[[rules]]\nclass = "kitty"\nlayout = "half-right"\n[[rules]]\n{rule_str}')
+
+    with pytest.raises(ValueError, match="rule 2"):
+        config.load_config()
+
+
+def test_read_config_reuses_snapshot_while_file_is_unchanged(mocker: MockFixture, tmp_path) -> None:
+    config_path = os.path.join(tmp_path, "config.toml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(
+            '[layouts.centered]\nname = "centered"\nlayout = "100,100,{width}/2,{height}/2"\ndirection = "vertical"\n'
+        )
+    os.utime(config_path, (0, 0))
+
+    first = config._read_config(config_path)
+    toml_load = mocker.patch("toml.load", side_effect=AssertionError("config parsed again"))
+    second = config._read_config(config_path)
+
+    assert os.path.exists(os.path.join(tmp_path, "config.cache"))
+    assert first == second
+    assert second.layouts[0].direction == Direction.VERTICAL
+
+    with open(config_path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    os.utime(config_path, (1, 1))
+    toml_load.side_effect = None
+    toml_load.return_value = {}
+
+    assert config._read_config(config_path).layouts == []
+
+
+def test_config_data_indexes_layouts_and_bar_heights() -> None:
+    config_data = ConfigData(bar_heights=[], layouts=list(config.DEFAULT_CONFIG.layouts))
+    vertical = Layout(name="half-left", layout="0,0,{width},{height}/2", direction=Direction.VERTICAL)
+
+    config_data.add_layout(vertical)
+    config_data.add_bar_height(BarHeight(screen_name="DP-0", top=0, bottom=45, left=0, right=0))
+
+    assert config_data.get_layout("half-left", Direction.VERTICAL) is vertical
+    assert config_data.get_layout("half-left", Direction.HORIZONTAL) is config.DEFAULT_CONFIG.layouts[1]
+    assert config_data.get_layout("unknown", Direction.HORIZONTAL) is None
+    assert config_data.get_bar_height("DP-0").bottom == 45
+    assert len(config.DEFAULT_CONFIG.layouts) == 3
+
+
+def test_config_data_rejects_duplicates() -> None:
+    config_data = ConfigData(bar_heights=[BarHeight(screen_name="DP-0", top=0, bottom=45, left=0, right=0)], layouts=[])
+
+    with pytest.raises(ValueError):
+        ConfigData(bar_heights=[], layouts=config.DEFAULT_CONFIG.layouts + config.DEFAULT_CONFIG.layouts[:1])
+    with pytest.raises(ValueError):
+        config_data.add_bar_height(BarHeight(screen_name="DP-0", top=10, bottom=0, left=0, right=0))
+
+
+@pytest.fixture(name="config_path")
+def fixture_config_path(mocker: MockFixture, tmp_path) -> str:
+    config_path = os.path.join(tmp_path, "winshift", "config.toml")
+    mocker.patch.object(config, "DEFAULT_CONFIG_PATH", config_path)
+    return config_path
+
+
+def test_add_layout_appends_to_config(config_path: str) -> None:
+    config.add_bar_height(BarHeight(screen_name="DP-0", top=0, bottom=45, left=0, right=0))
+    config.add_layout(Layout(name="centered", layout="100,100,{width}/2,{height}/2", direction=Direction.HORIZONTAL))
+    config.add_layout(Layout(name="centered", layout="100,100,{width}/2,{height}/2", direction=Direction.VERTICAL))
+
+    with pytest.raises(ValueError):
+        config.add_layout(Layout(name="centered", layout="0,0,{width},{height}", direction=Direction.VERTICAL))
+
+    result = config._read_config(config_path)
+    assert [(layout.direction, layout.name) for layout in result.layouts] == [
+        (Direction.HORIZONTAL, "centered"),
+        (Direction.VERTICAL, "centered"),
+    ]
+    assert result.get_bar_height("DP-0").bottom == 45
+
+
+def test_concurrent_add_layout_keeps_every_layout(config_path: str) -> None:
+    threads = [
+        threading.Thread(
+            target=config.add_layout,
+            args=(Layout(name=f"layout-{i}", layout="0,0,{width},{height}", direction=Direction.HORIZONTAL),),
+        )
+        for i in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(config._read_config(config_path).layouts) == 20
+
+
+def test_import_layouts_writes_once(mocker: MockFixture, config_path: str) -> None:
+    config.add_layout(Layout(name="layout-0", layout="0,0,{width},{height}", direction=Direction.HORIZONTAL))
+    write_config = mocker.spy(config, "_write_config")
+    layouts = [
+        Layout(name=f"layout-{i}", layout=f"0,0,{{width}}/{i + 1},{{height}}", direction=Direction.HORIZONTAL)
+        for i in range(300)
+    ]
+
+    with pytest.raises(ValueError):
+        config.import_layouts(layouts)
+    added = config.import_layouts(layouts, skip_existing=True)
+
+    assert added == 299
+    assert write_config.call_count == 1
+    assert len(config._read_config(config_path).layouts) == 300
+    assert not [name for name in os.listdir(os.path.dirname(config_path)) if name.endswith(".tmp")]
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from tests.modules.fakes import SCREENS
+from winshift.modules import config
+from winshift.modules.config import ConfigData
+from winshift.modules.cycle import LayoutCycler
+from winshift.modules.direction import Direction
+from winshift.modules.geometry import GeometryTable
+from winshift.modules.layout import Layout, LayoutGroup
+from winshift.modules.window import WindowData
+
+CONFIG = ConfigData(
+    bar_heights=[],
+    layouts=[
+        *config.DEFAULT_CONFIG.layouts,
+        Layout(name="two-thirds-left", layout="0,0,{width}*2/3,{height}", direction=Direction.HORIZONTAL),
+        Layout(name="third-left", layout="0,0,{width}/3,{height}", direction=Direction.HORIZONTAL),
+    ],
+    groups=[
+        LayoutGroup(name="left", layouts=["half-left", "two-thirds-left", "third-left", "half-top"]),
+        LayoutGroup(name="top", layouts=["half-top"]),
+    ],
+)
+DP_0 = SCREENS[0]
+# somewhere on DP-0, at none of the group's geometries
+WINDOW = WindowData(name="1", x=2500, y=1200, width=800, height=600)
+
+
+def test_next_layout_cycles_through_the_group_layouts_of_the_screen_direction() -> None:
+    cycler = LayoutCycler()
+    group = CONFIG.get_group("left")
+
+    names = [cycler.next_layout(CONFIG, group, DP_0, WINDOW) for _ in range(4)]
+
+    assert names == ["half-left", "two-thirds-left", "third-left", "half-left"]
+
+
+def test_next_layout_continues_from_the_window_geometry_once_expired() -> None:
+    cycler = LayoutCycler(expiry=0)
+    group = CONFIG.get_group("left")
+    table = GeometryTable.build(CONFIG, SCREENS)
+    two_thirds = table.get(DP_0.name, "two-thirds-left")
+    at_two_thirds = WindowData("1", int(two_thirds.x), int(two_thirds.y), int(two_thirds.width), int(two_thirds.height))
+
+    assert cycler.next_layout(CONFIG, group, DP_0, WINDOW, table) == "half-left"
+    assert cycler.next_layout(CONFIG, group, DP_0, WINDOW, table) == "half-left"
+    assert cycler.next_layout(CONFIG, group, DP_0, at_two_thirds, table) == "third-left"
+    assert cycler.next_layout(CONFIG, group, DP_0, at_two_thirds) == "third-left"
+
+
+def test_next_layout_without_layouts_for_the_screen_direction() -> None:
+    with pytest.raises(RuntimeError):
+        LayoutCycler().next_layout(CONFIG, CONFIG.get_group("top"), DP_0, WINDOW)
+
+
+def test_cycle_state_is_kept_between_commands(tmp_path) -> None:
+    state_path = os.path.join(tmp_path, "cycle.json")
+    group = CONFIG.get_group("left")
+
+    assert LayoutCycler(state_path).next_layout(CONFIG, group, DP_0, WINDOW) == "half-left"
+    assert LayoutCycler(state_path).next_layout(CONFIG, group, DP_0, WINDOW) == "two-thirds-left"
+    assert LayoutCycler(state_path, expiry=0).next_layout(CONFIG, group, DP_0, WINDOW) == "third-left"
+    assert LayoutCycler(state_path).next_layout(CONFIG, group, DP_0, WINDOW) == "half-left"
@@ -0,0 +1,72 @@
+import os
+import socket
+import threading
+
+import pytest
+from pytest_mock import MockFixture
+
+from winshift.cli import AppCLI
+from winshift.client import send_command
+from winshift.modules import config
+from winshift.modules.daemon import WinshiftDaemon
+
+
+def test_daemon_serves_commands(mocker: MockFixture, tmp_path) -> None:
+    mocker.patch("winshift.cli.load_config", return_value=config.DEFAULT_CONFIG)
+    app = AppCLI()
+    app.reload()
+    socket_path = os.path.join(tmp_path, "winshift.sock")
+
+    with WinshiftDaemon(app, socket_path) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            listed = send_command(["list-layouts"], socket_path)
+            refused = send_command(["daemon"], socket_path)
+            invalid = send_command(["change-layout"], socket_path)
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+    assert listed["ok"]
+    assert "half-left" in listed["output"]
+    assert not refused["ok"]
+    assert not invalid["ok"]
+    assert not os.path.exists(socket_path)
+
+
+def test_daemon_answers_failed_reload(mocker: MockFixture, tmp_path) -> None:
+    mocker.patch("winshift.cli.load_config", side_effect=OSError("config.toml is unreadable"))
+    socket_path = os.path.join(tmp_path, "winshift.sock")
+
+    with WinshiftDaemon(AppCLI(), socket_path) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            response = send_command(["reload"], socket_path)
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+    assert not response["ok"]
+    assert "config.toml is unreadable" in response["output"]
+
+
+def test_send_command_rejects_empty_response(tmp_path) -> None:
+    socket_path = os.path.join(tmp_path, "winshift.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen(1)
+
+        def close_without_answering() -> None:
+            connection, _ = server.accept()
+            connection.recv(1024)
+            connection.close()
+
+        thread = threading.Thread(target=close_without_answering)
+        thread.start()
+        try:
+            with pytest.raises(ValueError):
+                send_command(["list-layouts"], socket_path)
+        finally:
+            thread.join()
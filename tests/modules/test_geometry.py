@@ -0,0 +1,55 @@
+import os
+
+from tests.modules.fakes import SCREENS, WINDOWS, FakeBackend
+from winshift.cli import AppCLI
+from winshift.modules.config import ConfigData
+from winshift.modules.direction import Direction
+from winshift.modules.geometry import GeometryTable
+from winshift.modules.layout import BarHeight, CalculatedLayout, Layout, calculate_layout_screen
+from winshift.modules.screen_cache import ScreenCache
+
+CONFIG = ConfigData(
+    bar_heights=[BarHeight(screen_name="DP-0", top=30, bottom=0, left=0, right=0, gap=8)],
+    layouts=[
+        Layout(name="half-left", layout="0,0,{width}/2,{height}", direction=Direction.HORIZONTAL),
+        Layout(name="half-top", layout="0,0,{width},{height}/2", direction=Direction.VERTICAL),
+        Layout(name="broken", layout="0,0,{width}", direction=Direction.HORIZONTAL),
+    ],
+)
+
+
+def test_geometry_table_calculates_layouts_of_each_screen_direction() -> None:
+    table = GeometryTable.build(CONFIG, SCREENS)
+
+    assert table.get("DP-0", "half-left") == calculate_layout_screen(
+        SCREENS[0], CONFIG.layouts[0], CONFIG.get_bar_height("DP-0")
+    )
+    assert table.get("DP-2", "half-top") == CalculatedLayout(x=0, y=0, width=2160, height=1920)
+    assert table.get("DP-2", "half-left") is None
+    assert table.get("DP-0", "broken") is None
+    assert table.as_dict()["DP-2"] == {"half-top": {"x": 0, "y": 0, "width": 2160, "height": 1920}}
+
+
+def test_geometry_table_returns_copies() -> None:
+    table = GeometryTable.build(CONFIG, SCREENS)
+
+    table.get("DP-2", "half-top").x = 100
+
+    assert table.get("DP-2", "half-top").x == 0
+
+
+def test_geometry_table_is_rebuilt_when_screens_change(tmp_path) -> None:
+    backend = FakeBackend(list(SCREENS), list(WINDOWS))
+    app = AppCLI()
+    app.config = CONFIG
+    app.screen_cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+
+    table = app.get_geometry_table()
+    assert app.get_geometry_table() is table
+
+    backend.screens = [SCREENS[1]]
+    backend.changed = True
+    rebuilt = app.get_geometry_table()
+
+    assert rebuilt is not table
+    assert list(rebuilt.as_dict()) == ["DP-2"]
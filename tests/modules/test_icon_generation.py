@@ -0,0 +1,109 @@
+import json
+import os
+from dataclasses import replace
+
+import pytest
+
+from winshift.modules import icon_generation
+from winshift.modules.direction import Direction
+from winshift.modules.icon_generation import IconJob, IconStyle
+from winshift.modules.layout import Layout
+from winshift.modules.screen import ScreenData
+
+STYLE = IconStyle(
+    image_size=72,
+    margin=8,
+    screen_color="#6699ff",
+    screen_border_color="#b2b2b2",
+    screen_border_width=0,
+    window_color="#003399",
+    window_border_color="#b2b2b2",
+    window_border_width=1,
+)
+
+
+def _jobs(count: int) -> list:
+    return [
+        IconJob(file_name=f"horizontal-{i}.png", screen_dims=(1920, 1080), window_dims=(0, 0, 1920 // (i + 1), 1080))
+        for i in range(count)
+    ]
+
+
+def test_layout_icon_jobs_rotates_screen_for_other_direction() -> None:
+    layouts = [
+        Layout(name="half-left", layout="0,0,{width}/2,{height}", direction=Direction.HORIZONTAL),
+        Layout(name="half-top", layout="0,0,{width},{height}/2", direction=Direction.VERTICAL),
+    ]
+    screen_data = ScreenData(name="DP-0", x=2160, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL)
+
+    jobs = icon_generation.layout_icon_jobs(layouts, screen_data)
+
+    assert jobs == [
+        IconJob(file_name="horizontal-half-left.png", screen_dims=(1920, 1080), window_dims=(0, 0, 960, 1080)),
+        IconJob(file_name="vertical-half-top.png", screen_dims=(1080, 1920), window_dims=(0, 0, 1080, 960)),
+    ]
+
+
+def test_generate_icons_skips_unchanged_icons(tmp_path) -> None:
+    pytest.importorskip("PIL")
+    jobs = _jobs(3)
+
+    first = icon_generation.generate_icons(jobs, STYLE, str(tmp_path))
+    second = icon_generation.generate_icons(jobs, STYLE, str(tmp_path))
+    os.unlink(os.path.join(tmp_path, "horizontal-0.png"))
+    third = icon_generation.generate_icons(jobs, STYLE, str(tmp_path))
+    fourth = icon_generation.generate_icons(jobs, replace(STYLE, window_color="#ff0000"), str(tmp_path))
+
+    assert (len(first.rendered), len(first.skipped)) == (3, 0)
+    assert (len(second.rendered), len(second.skipped)) == (0, 3)
+    assert third.rendered == ["horizontal-0.png"]
+    assert len(fourth.rendered) == 3
+
+
+def test_content_hash_ignores_compress_level_of_svg_icons() -> None:
+    png_job = IconJob(file_name="horizontal-full.png", screen_dims=(1920, 1080), window_dims=(0, 0, 1920, 1080))
+    svg_job = replace(png_job, file_name="horizontal-full.svg")
+    faster_style = replace(STYLE, compress_level=1)
+
+    assert svg_job.content_hash(STYLE) == svg_job.content_hash(faster_style)
+    assert png_job.content_hash(STYLE) != png_job.content_hash(faster_style)
+
+
+def test_generate_icons_in_parallel(tmp_path) -> None:
+    pytest.importorskip("PIL")
+    jobs = _jobs(icon_generation.PARALLEL_THRESHOLD)
+
+    report = icon_generation.generate_icons(jobs, STYLE, str(tmp_path), workers=2)
+
+    assert sorted(report.rendered) == sorted(job.file_name for job in jobs)
+    assert all(os.path.exists(os.path.join(tmp_path, job.file_name)) for job in jobs)
+
+
+def test_sprite_sheet_index_places_sizes_in_bands() -> None:
+    index = icon_generation.sprite_sheet_index(_jobs(5), [24, 48], "layouts.png")
+
+    assert (index["width"], index["height"]) == (3 * 48, 2 * 24 + 2 * 48)
+    assert index["icons"]["horizontal-0"]["24"] == {"x": 0, "y": 0, "width": 24, "height": 24}
+    assert index["icons"]["horizontal-4"]["24"] == {"x": 24, "y": 24, "width": 24, "height": 24}
+    assert index["icons"]["horizontal-4"]["48"] == {"x": 48, "y": 48 + 48, "width": 48, "height": 48}
+
+
+def test_generate_sprite_sheet_matches_single_icons(tmp_path) -> None:
+    image = pytest.importorskip("PIL.Image")
+    jobs = _jobs(5)
+    style = replace(STYLE, margin=0, screen_border_width=2)
+    icon_generation.generate_icons(jobs, style, str(tmp_path / "single"), workers=1)
+
+    report = icon_generation.generate_sprite_sheet(jobs, style, [72], str(tmp_path / "sheet"))
+    skipped = icon_generation.generate_sprite_sheet(jobs, style, [72], str(tmp_path / "sheet"))
+
+    assert report.rendered == ["layouts.png", "layouts.json"]
+    assert skipped.skipped == ["layouts.png", "layouts.json"]
+    with open(tmp_path / "sheet" / "layouts.json", encoding="utf-8") as f:
+        index = json.load(f)
+    with image.open(tmp_path / "sheet" / "layouts.png") as sheet:
+        for job in jobs:
+            position = index["icons"][os.path.splitext(job.file_name)[0]]["72"]
+            box = (position["x"], position["y"], position["x"] + 72, position["y"] + 72)
+            with image.open(tmp_path / "single" / job.file_name) as icon:
+                assert list(sheet.crop(box).getdata()) == list(icon.getdata())
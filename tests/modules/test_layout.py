@@ -114,8 +114,8 @@ BAR_HEIGHTS_SET = [
             CalculatedLayout(
                 x=10,
                 y=10,
-                width=1910,
-                height=1070,
+                width=1900,
+                height=1060,
             ),
         ),
         (
@@ -200,3 +200,77 @@ def test_calculate_layout_screen_invalid_layout(layout_str: str) -> None:
             ),
             None,
         )
+
+
+@pytest.mark.parametrize(
+    "layout_str",
+    [
+        "__import__('os'),0,0,0",
+        "{width}.bit_length(),0,0,0",
+        "{name},0,0,0",
+        "0,0,{width}**100,{height}",
+        "0,0,{width}**{height},{height}",
+        "0,0,{width}**0.5,{height}",
+        "0,0,{width}/0,{height}",
+    ],
+)
+def test_compile_layout_rejects_unsafe_or_invalid_expressions(layout_str: str) -> None:
+    with pytest.raises(ValueError):
+        layout.compile_layout(layout_str)
+
+
+def test_compile_layout_accepts_small_integer_exponents() -> None:
+    assert layout.compile_layout("0,0,{width}/2**1,{height}/2**2").evaluate(0, 0, 1920, 1080) == (0, 0, 960, 270)
+
+
+def test_compile_layout_is_cached_by_layout_string() -> None:
+    compiled = layout.compile_layout("int({width}/3),0,{width}*2/3,{height}")
+
+    assert layout.compile_layout("int({width}/3),0,{width}*2/3,{height}") is compiled
+    assert compiled.evaluate(0, 0, 1920, 1080) == (640, 0, 1280, 1080)
+
+
+def test_calculate_layout_screen_returns_independent_results() -> None:
+    screen_data = ScreenData(name="DP-0", x=0, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL)
+    test_layout = Layout(name="test", layout="0,0,{width}/2,{height}", direction=Direction.HORIZONTAL)
+
+    first = layout.calculate_layout_screen(screen_data, test_layout)
+    first.x = 100
+
+    assert layout.calculate_layout_screen(screen_data, test_layout) == CalculatedLayout(
+        x=0, y=0, width=960, height=1080
+    )
+
+
+def test_calculate_layouts_matches_calculate_layout_screen() -> None:
+    screens = [
+        ScreenData(name="DP-0", x=2160, y=973, width=3840, height=2160, direction=Direction.HORIZONTAL),
+        ScreenData(name="DP-2", x=0, y=0, width=2160, height=3840, direction=Direction.VERTICAL),
+        ScreenData(name="HDMI-0", x=6000, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL),
+    ]
+    layouts = [
+        Layout(name="half-left", layout="0,0,{width}/2,{height}", direction=Direction.HORIZONTAL),
+        Layout(name="bottom-third", layout="0,{height}*2/3,{width},{height}/3", direction=Direction.VERTICAL),
+        Layout(name="full", layout="{x}-{x},0,{width},{height}", direction=Direction.HORIZONTAL),
+    ]
+    bar_heights = {
+        "DP-0": BarHeight(screen_name="DP-0", top=30, bottom=0, left=0, right=0, gap=8),
+        "DP-2": BarHeight(screen_name="DP-2", top=45, bottom=45, left=45, right=45),
+    }
+
+    result = layout.calculate_layouts(screens, layouts, bar_heights)
+
+    assert result == [
+        [
+            layout.calculate_layout_screen(screen_data, test_layout, bar_heights.get(screen_data.name))
+            for screen_data in screens
+        ]
+        for test_layout in layouts
+    ]
+    assert result[0][2] == CalculatedLayout(x=6000, y=0, width=960, height=1080)
+
+
+def test_calculate_layouts_without_screens() -> None:
+    test_layout = Layout(name="test", layout="0,0,{width}/2,{height}", direction=Direction.HORIZONTAL)
+
+    assert layout.calculate_layouts([], [test_layout]) == [[]]
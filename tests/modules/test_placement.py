@@ -0,0 +1,74 @@
+import pytest
+
+from tests.modules.fakes import FakeBackend
+from winshift.modules import config, placement
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.placement import PlanEntry
+from winshift.modules.profile import Profile, ProfileWindow
+from winshift.modules.screen import ScreenIndex
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        "active half-left\n# comment\n2 full-size DP-0\n",
+        '[{"window": "active", "layout": "half-left"}, {"window": 2, "layout": "full-size", "screen": "DP-0"}]',
+    ],
+)
+def test_parse_plan(plan: str) -> None:
+    assert placement.parse_plan(plan) == [
+        PlanEntry(window="active", layout_name="half-left"),
+        PlanEntry(window="2", layout_name="full-size", screen_name="DP-0"),
+    ]
+
+
+def test_parse_plan_invalid_line() -> None:
+    with pytest.raises(ValueError):
+        placement.parse_plan("active\n")
+
+
+def test_apply_plan_reports_failures_without_aborting(fake_backend: FakeBackend, mocker) -> None:
+    move_resize_windows = mocker.spy(fake_backend, "move_resize_windows")
+    entries = [
+        PlanEntry(window="active", layout_name="half-left"),
+        PlanEntry(window="404", layout_name="half-left"),
+        PlanEntry(window="2", layout_name="unknown"),
+        PlanEntry(window="2", layout_name="full-size", screen_name="DP-0"),
+    ]
+
+    results = placement.apply_plan(fake_backend, config.DEFAULT_CONFIG, ScreenIndex(fake_backend.screens), entries)
+
+    assert [result.error is None for result in results] == [True, False, False, True]
+    move_resize_windows.assert_called_once()
+    assert fake_backend.moves == [
+        ("1", CalculatedLayout(x=2160, y=973, width=1920, height=2160)),
+        ("2", CalculatedLayout(x=2160, y=973, width=3840, height=2160)),
+    ]
+    assert all(result.duration >= 0 for result in results)
+
+
+def test_apply_plan_reports_batch_failure(fake_backend: FakeBackend, mocker) -> None:
+    mocker.patch.object(fake_backend, "move_resize_windows", side_effect=RuntimeError("BadWindow"))
+    entries = [PlanEntry(window="active", layout_name="half-left"), PlanEntry(window="2", layout_name="unknown")]
+
+    results = placement.apply_plan(fake_backend, config.DEFAULT_CONFIG, ScreenIndex(fake_backend.screens), entries)
+
+    assert results[0].error == "BadWindow"
+    assert results[1].error.startswith("Layout unknown not found")
+
+
+def test_restore_profile_moves_matched_windows_in_one_batch(fake_backend: FakeBackend, mocker) -> None:
+    move_resize_windows = mocker.spy(fake_backend, "move_resize_windows")
+    desk = Profile(
+        name="desk",
+        windows=[
+            ProfileWindow(layout="half-right", window_class="kitty", title="vim", screen_name="DP-0"),
+            ProfileWindow(layout="unknown", window_class="kitty"),
+        ],
+    )
+
+    restored = placement.restore_profile(fake_backend, config.DEFAULT_CONFIG, ScreenIndex(fake_backend.screens), desk)
+
+    assert [(r.window.name, r.error is None) for r in restored] == [("2", False), ("3", True)]
+    move_resize_windows.assert_called_once()
+    assert fake_backend.moves == [("3", CalculatedLayout(x=4080, y=973, width=1920, height=2160))]
@@ -0,0 +1,44 @@
+import pytest
+
+from winshift.modules import profile
+from winshift.modules.profile import Profile, ProfileWindow
+from winshift.modules.window import ClientWindow
+
+PROFILE = Profile(
+    name="desk",
+    windows=[
+        ProfileWindow(layout="half-left", window_class="kitty", title="^vim"),
+        ProfileWindow(layout="half-right", window_class="kitty"),
+        ProfileWindow(layout="full-size", title="Inbox", screen_name="DP-0"),
+    ],
+)
+
+
+@pytest.mark.parametrize(
+    "window_class, title, expected",
+    [
+        ("kitty.kitty", "vim notes.md", "half-left"),
+        ("kitty.kitty", "htop", "half-right"),
+        ("firefox.Firefox", "Inbox - Mail", "full-size"),
+        ("firefox.Firefox", "News", None),
+    ],
+)
+def test_profile_matcher(window_class: str, title: str, expected: str) -> None:
+    window = ClientWindow("1", 0, 0, 100, 100, window_class=window_class, title=title)
+
+    matched = profile.ProfileMatcher(PROFILE).match(window)
+
+    assert (matched.layout if matched else None) == expected
+
+
+@pytest.mark.parametrize(
+    "profile_window",
+    [
+        ProfileWindow(layout="half-left"),
+        ProfileWindow(layout="", window_class="kitty"),
+        ProfileWindow(layout="half-left", title="(unclosed"),
+    ],
+)
+def test_validate_profile(profile_window: ProfileWindow) -> None:
+    with pytest.raises(ValueError):
+        profile.validate_profile(Profile(name="desk", windows=[profile_window]))
@@ -0,0 +1,69 @@
+import pytest
+
+from winshift.modules.raster import IconRasterizer, icon_rectangles
+
+# (image size, margin, screen dims, window dims, screen border width, window border width)
+ICONS = [
+    (72, 8, (1920, 1080), (0, 0, 960, 1080), 0, 1),
+    (72, 0, (1080, 1920), (0, 960, 1080, 960), 2, 3),
+    (24, 3, (3840, 2160), (1280, 0, 1280, 2160), 5, 9),
+    (16, 0, (2560, 1440), (-200, 100, 2900, 200), 1, 7),
+    (144, 12, (1920, 1080), (10, 10, 5, 5), 0, 4),
+]
+
+
+@pytest.mark.parametrize("image_size,margin,screen_dims,window_dims,screen_border,window_border", ICONS)
+@pytest.mark.parametrize("window_border_color", ["#b2b2b2", "#003399"])
+def test_render_matches_pillow(
+    tmp_path, image_size, margin, screen_dims, window_dims, screen_border, window_border, window_border_color
+) -> None:
+    image = pytest.importorskip("PIL.Image")
+    from winshift.modules.icons import create_image  # pylint: disable=import-outside-toplevel
+
+    style = {
+        "image_size": image_size,
+        "margin": margin,
+        "screen_dims": screen_dims,
+        "window_dims": window_dims,
+        "screen_color": "#6699ff",
+        "screen_border_color": "#b2b2b2",
+        "screen_border_width": screen_border,
+        "window_color": "#003399",
+        "window_border_color": window_border_color,
+        "window_border_width": window_border,
+    }
+    create_image(output_path=str(tmp_path / "pillow.png"), **style)
+    rasterizer = IconRasterizer()
+    rasterizer.encode(rasterizer.render(**style), image_size, str(tmp_path / "raster.png"))
+
+    with image.open(tmp_path / "pillow.png") as pillow, image.open(tmp_path / "raster.png") as raster:
+        assert raster.mode == pillow.mode
+        assert raster.tobytes() == pillow.tobytes()
+
+
+def test_render_reuses_buffers() -> None:
+    pytest.importorskip("PIL")
+    rasterizer = IconRasterizer()
+    style = {
+        "margin": 0,
+        "screen_color": "#6699ff",
+        "screen_border_color": "#b2b2b2",
+        "screen_border_width": 0,
+        "window_color": "#003399",
+        "window_border_color": "#b2b2b2",
+        "window_border_width": 1,
+    }
+
+    first = rasterizer.render(image_size=8, screen_dims=(8, 8), window_dims=(0, 0, 8, 8), **style)
+    second = rasterizer.render(image_size=8, screen_dims=(8, 8), window_dims=(0, 0, 2, 2), **style)
+
+    assert first is second
+    # the previous icon was cleared: the bottom right pixel is now the screen color
+    assert second[-4:] == bytes((0x66, 0x99, 0xFF, 0xFF))
+
+
+def test_icon_rectangles_center_screen() -> None:
+    screen, window = icon_rectangles(72, 8, (1920, 1080), (960, 0, 960, 1080))
+
+    assert screen == (8, 20, 64, 51)
+    assert window == (36, 20, 64, 51)
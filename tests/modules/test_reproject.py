@@ -0,0 +1,90 @@
+import os
+
+from tests.modules.fakes import SCREENS, WINDOWS, FakeBackend
+from winshift.cli import AppCLI
+from winshift.modules.config import ConfigData
+from winshift.modules.direction import Direction
+from winshift.modules.layout import BarHeight, CalculatedLayout
+from winshift.modules.reproject import reproject_window, reproject_windows, screen_areas
+from winshift.modules.screen import ScreenData
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.window import WindowData
+
+DP_0, DP_2 = SCREENS
+FULL_HD = ScreenData(name="HDMI-0", x=6000, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL)
+
+
+def test_screen_areas() -> None:
+    usable, inner = screen_areas(DP_0, BarHeight("DP-0", top=32, bottom=0, left=10, right=0, gap=8))
+
+    assert usable == (2170, 1005, 3830, 2128)
+    assert inner == (2178, 1013, 3814, 2112)
+    assert screen_areas(DP_0) == ((2160, 973, 3840, 2160), (2160, 973, 3840, 2160))
+
+
+def test_reproject_window_keeps_relative_geometry() -> None:
+    left_half = WindowData(name="1", x=2160, y=973, width=1920, height=2160)
+
+    assert reproject_window(left_half, DP_0, FULL_HD) == CalculatedLayout(6000, 0, 960, 1080)
+    assert reproject_window(left_half, DP_0, DP_2) == CalculatedLayout(0, 0, 1080, 3840)
+
+
+def test_reproject_window_between_bars_and_gaps() -> None:
+    source_bar = BarHeight("DP-0", top=32, bottom=0, left=0, right=0, gap=8)
+    target_bar = BarHeight("HDMI-0", top=0, bottom=40, left=0, right=0, gap=4)
+    # the right half of DP-0 below its bar, inside the gaps
+    right_half = WindowData(name="1", x=2160 + 8 + 1912, y=973 + 32 + 8, width=1912, height=2112)
+
+    calculated_layout = reproject_window(right_half, DP_0, FULL_HD, source_bar, target_bar)
+
+    assert calculated_layout == CalculatedLayout(6000 + 4 + 956, 4, 956, 1032)
+
+
+def test_reproject_window_stays_inside_the_target_bars() -> None:
+    source_bar = BarHeight("DP-0", top=0, bottom=0, left=0, right=0, gap=10)
+    target_bar = BarHeight("HDMI-0", top=30, bottom=0, left=0, right=0, gap=0)
+    # off the source screen, over its bar area
+    window = WindowData(name="1", x=2160, y=900, width=5000, height=400)
+
+    calculated_layout = reproject_window(window, DP_0, FULL_HD, source_bar, target_bar)
+
+    assert calculated_layout == CalculatedLayout(6000, 30, 1920, 196)
+
+
+def test_reproject_windows_of_unplugged_and_resized_screens() -> None:
+    old_screens = [*SCREENS, FULL_HD]
+    # DP-2 unplugged, HDMI-0 switched to 4K
+    new_screens = [DP_0, ScreenData("HDMI-0", 6000, 0, 3840, 2160, Direction.HORIZONTAL)]
+    windows = [
+        WindowData(name="1", x=2160, y=973, width=1920, height=2160),
+        WindowData(name="2", x=0, y=0, width=1080, height=1920),
+        WindowData(name="3", x=6960, y=540, width=960, height=540),
+    ]
+
+    moves = reproject_windows(windows, old_screens, new_screens, {"DP-0": BarHeight("DP-0", 32, 0, 0, 0)})
+
+    assert [(window.name, calculated_layout) for window, calculated_layout in moves] == [
+        ("2", CalculatedLayout(2160, 1005, 1920, 1064)),
+        ("3", CalculatedLayout(7920, 1080, 1920, 1080)),
+    ]
+
+
+def test_reproject_windows_without_screen_change() -> None:
+    assert reproject_windows(WINDOWS, SCREENS, list(SCREENS)) == []
+    assert reproject_windows(WINDOWS, SCREENS, []) == []
+
+
+def test_reproject_windows_command_moves_windows_once(tmp_path) -> None:
+    backend = FakeBackend(list(SCREENS), list(WINDOWS))
+    app = AppCLI()
+    app.config = ConfigData(bar_heights=[], layouts=[])
+    app.backend = backend
+    app.screen_cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+    app.get_screens_data()
+
+    backend.screens = [DP_0]
+    backend.changed = True
+    app.reproject_windows()
+    app.reproject_windows()
+
+    assert [name for name, _ in backend.moves] == ["2", "3"]
@@ -0,0 +1,130 @@
+import asyncio
+import os
+
+from tests.modules.fakes import SCREENS, WINDOWS, FakeBackend
+from winshift.modules import config
+from winshift.modules.config import ConfigData
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.rule_watcher import RuleWatcher
+from winshift.modules.rules import WindowRule
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.window import ClientWindow
+
+CONFIG = ConfigData(
+    bar_heights=[],
+    layouts=config.DEFAULT_CONFIG.layouts,
+    rules=[
+        WindowRule(layout="half-left", window_class="kitty", title="^vim"),
+        WindowRule(layout="half-right", window_class="^firefox", screen_name="DP-0"),
+        WindowRule(layout="missing", title="^broken"),
+    ],
+)
+NEW_WINDOWS = [
+    ClientWindow(name="4", x=3000, y=1200, width=800, height=600, window_class="kitty.kitty", title="vim notes"),
+    ClientWindow(name="5", x=3000, y=1200, width=800, height=600, window_class="firefox.Firefox", title="News"),
+    ClientWindow(name="6", x=3000, y=1200, width=800, height=600, window_class="xterm.XTerm", title="broken"),
+    ClientWindow(name="7", x=3000, y=1200, width=800, height=600, window_class="xterm.XTerm", title="bash"),
+]
+
+
+class NotifyingBackend(FakeBackend):
+    """Fake backend signalling client list changes through a pipe, like the X connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.read_fd, False)
+        self.queried = []
+
+    def watch_client_list(self):
+        return self.read_fd
+
+    def client_list_changed(self) -> bool:
+        try:
+            return bool(os.read(self.read_fd, 1024))
+        except BlockingIOError:
+            return False
+
+    def get_client_windows(self, window_ids):
+        self.queried.extend(window_ids)
+        return super().get_client_windows(window_ids)
+
+    def open_windows(self, windows) -> None:
+        self.windows.update({window.name: window for window in windows})
+        os.write(self.write_fd, b"x")
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+def _watcher(backend: FakeBackend, tmp_path, **kwargs) -> RuleWatcher:
+    return RuleWatcher(backend, CONFIG, ScreenCache(backend, os.path.join(tmp_path, "screens.json")), **kwargs)
+
+
+def test_place_new_windows_in_one_batch(tmp_path) -> None:
+    backend = FakeBackend(SCREENS, WINDOWS)
+    watcher = _watcher(backend, tmp_path)
+    watcher.known_windows = {window.name for window in WINDOWS}
+
+    new_ids = watcher.new_window_ids([window.name for window in [*WINDOWS, *NEW_WINDOWS]])
+    placed = watcher.place_windows(NEW_WINDOWS)
+
+    assert new_ids == ["4", "5", "6", "7"]
+    assert [(ruled.window.name, ruled.rule.layout, ruled.error is None) for ruled in placed] == [
+        ("4", "half-left", True),
+        ("5", "half-right", True),
+        ("6", "missing", False),
+    ]
+    assert backend.moves == [
+        ("4", CalculatedLayout(x=2160, y=973, width=1920, height=2160)),
+        ("5", CalculatedLayout(x=4080, y=973, width=1920, height=2160)),
+    ]
+    assert watcher.new_window_ids(["1", "2", "3", "4", "5", "6", "7"]) == []
+    assert watcher.new_window_ids(["1", "2", "3"]) == []
+    assert watcher.known_windows == {"1", "2", "3"}
+
+
+def _run_until(watcher: RuleWatcher, until, place_existing: bool = False, action=None) -> None:
+    async def watch() -> None:
+        task = asyncio.create_task(watcher.run(place_existing))
+        await asyncio.sleep(0.01)
+        if action:
+            action()
+        for _ in range(200):
+            if until():
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(watch())
+
+
+def test_run_places_windows_opened_while_watching(tmp_path) -> None:
+    backend = NotifyingBackend(SCREENS, list(WINDOWS))
+    placed = []
+    watcher = _watcher(backend, tmp_path, on_placed=placed.extend)
+    try:
+        _run_until(watcher, lambda: placed, action=lambda: backend.open_windows(NEW_WINDOWS))
+    finally:
+        backend.close()
+
+    assert [ruled.window.name for ruled in placed] == ["4", "5", "6"]
+    assert [name for name, _ in backend.moves] == ["4", "5"]
+    # the windows open before aren't queried again
+    assert backend.queried == ["4", "5", "6", "7"]
+
+
+def test_run_polls_backends_without_notifications(tmp_path) -> None:
+    backend = FakeBackend(SCREENS, [*WINDOWS, *NEW_WINDOWS])
+    placed = []
+    watcher = _watcher(backend, tmp_path, poll_interval=0.01, dry_run=True, on_placed=placed.extend)
+
+    _run_until(watcher, lambda: placed, place_existing=True)
+
+    assert [ruled.window.name for ruled in placed] == ["1", "3", "4", "5", "6"]
+    assert not backend.moves
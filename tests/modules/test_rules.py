@@ -0,0 +1,112 @@
+import random
+import re
+
+import pytest
+
+from winshift.modules import rules
+from winshift.modules.rules import RuleMatcher, WindowRule
+from winshift.modules.window import ClientWindow
+
+RULES = [
+    WindowRule(layout="half-left", window_class="kitty", title="^vim"),
+    WindowRule(layout="half-right", window_class="kitty"),
+    WindowRule(layout="full-size", title="Inbox", screen_name="DP-0"),
+    WindowRule(layout="one-third-right", role="^pop-?up$"),
+    WindowRule(layout="two-thirds-left", window_class="(?i)^FIREFOX"),
+]
+
+
+@pytest.mark.parametrize(
+    "window_class, title, role, expected",
+    [
+        ("kitty.kitty", "vim notes.md", "", "half-left"),
+        ("kitty.kitty", "htop", "", "half-right"),
+        ("kitty.kitty", "notes - vim", "", "half-right"),
+        ("firefox.Firefox", "Inbox - Mail", "browser", "full-size"),
+        ("firefox.Firefox", "News", "pop-up", "one-third-right"),
+        ("firefox.Firefox", "News", "browser", "two-thirds-left"),
+        ("Navigator.firefox", "News", "", None),
+        # a title spanning lines doesn't fill the role field
+        ("slack.Slack", "News\npopup", "", None),
+    ],
+)
+def test_rule_matcher(window_class: str, title: str, role: str, expected: str) -> None:
+    window = ClientWindow("1", 0, 0, 100, 100, window_class=window_class, title=title, role=role)
+
+    matcher = RuleMatcher(RULES)
+    matched = matcher.match(window)
+
+    assert matcher.pattern is not None
+    assert (matched.layout if matched else None) == expected
+
+
+def test_rule_matcher_with_backreferences_matches_them_one_by_one() -> None:
+    matcher = RuleMatcher([WindowRule(layout="half-left", title=r"(\w+) \1"), *RULES])
+    window = ClientWindow("1", 0, 0, 100, 100, window_class="kitty.kitty", title="vim vim")
+
+    assert matcher.pattern is not None
+    assert matcher.separate == [0]
+    assert matcher.match(window).layout == "half-left"
+    assert matcher.match(ClientWindow("2", 0, 0, 100, 100, window_class="kitty.kitty")).layout == "half-right"
+
+
+MATCHER_PATTERNS = {
+    "window_class": [None, "kitty", r"kitty\Z", r"\Akitty", r"^kitty\.kitty$", r"(?i)FIREFOX", r"y\sv", r"(?s)y.v"],
+    "title": [None, r"\Avim", r"vim\Z", r"(?<!\s)vim", r"vim(?!\s)", r"(?<=[^a])vim", r"\bvim\b", r"\s"],
+    "role": [None, r"\Apop", r"up\Z", r"^$", r"[^x]"],
+}
+MATCHED_WINDOWS = [
+    ("kitty.kitty", "vim", ""),
+    ("kitty.kitty", "vim notes.md", "pop-up"),
+    ("kitty.kitty", "notes - vim", "popup"),
+    ("firefox.Firefox", "vim", "pop-up"),
+    ("Navigator.firefox", "", ""),
+    ("kitty", "", "browser"),
+]
+
+
+def _match_one_by_one(rule_list, window: ClientWindow):
+    for rule in rule_list:
+        fields = ((rule.window_class, window.window_class), (rule.title, window.title), (rule.role, window.role))
+        if all(pattern is None or re.search(pattern, field) for pattern, field in fields):
+            return rule
+    return None
+
+
+def test_rule_matcher_matches_like_rules_one_by_one() -> None:
+    randomizer = random.Random(42)
+    windows = [
+        ClientWindow(str(i), 0, 0, 100, 100, window_class=window_class, title=title, role=role)
+        for i, (window_class, title, role) in enumerate(MATCHED_WINDOWS)
+    ]
+    for _ in range(300):
+        rule_list = [
+            WindowRule(
+                layout=f"layout-{i}",
+                window_class=randomizer.choice(MATCHER_PATTERNS["window_class"]),
+                title=randomizer.choice(MATCHER_PATTERNS["title"]),
+                role=randomizer.choice(MATCHER_PATTERNS["role"]),
+            )
+            for i in range(randomizer.randint(1, 6))
+        ]
+        matcher = RuleMatcher(rule_list)
+
+        for window in windows:
+            assert matcher.match(window) is _match_one_by_one(rule_list, window), (rule_list, window)
+
+
+def test_rule_matcher_without_rules() -> None:
+    assert RuleMatcher([]).match(ClientWindow("1", 0, 0, 100, 100, window_class="kitty.kitty")) is None
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        WindowRule(layout="half-left"),
+        WindowRule(layout="", window_class="kitty"),
+        WindowRule(layout="half-left", role="(unclosed"),
+    ],
+)
+def test_validate_rules(rule: WindowRule) -> None:
+    with pytest.raises(ValueError):
+        rules.validate_rules([WindowRule(layout="full-size", title="^htop$"), rule])
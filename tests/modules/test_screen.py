@@ -71,3 +71,94 @@ def test_locate_point_on_screen(x: int, y: int, expected: str) -> None:
     result = screen.locate_point_on_screen(screens, x, y)
 
     assert result.name == expected
+
+
+def _video_wall(columns: int, rows: int) -> list:
+    return [
+        ScreenData(
+            name=f"DP-{row * columns + column}",
+            x=column * 1920,
+            y=row * 1080,
+            width=1920,
+            height=1080,
+            direction=Direction.HORIZONTAL,
+        )
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+@pytest.mark.parametrize(
+    "x, y, expected",
+    [
+        (0, 0, "DP-0"),
+        (1919, 1079, "DP-0"),
+        (1920, 0, "DP-1"),
+        (1920, 1080, "DP-7"),
+        (11519, 4319, "DP-23"),
+        (-500, 500, "DP-0"),
+        (20000, 5000, "DP-23"),
+        (7000, -10, "DP-3"),
+    ],
+)
+def test_screen_index_locate(x: int, y: int, expected: str) -> None:
+    index = screen.ScreenIndex(_video_wall(6, 4))
+
+    assert index.locate(x, y).name == expected
+    assert screen.locate_point_on_screen(index.screens, x, y).name == expected
+
+
+def test_screen_index_prefers_first_listed_screen_when_overlapping() -> None:
+    mirrored = [
+        ScreenData(name="HDMI-0", x=0, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL),
+        ScreenData(name="DP-0", x=0, y=0, width=3840, height=2160, direction=Direction.HORIZONTAL),
+    ]
+    index = screen.ScreenIndex(mirrored)
+
+    assert index.locate(100, 100).name == "HDMI-0"
+    assert index.locate(2000, 100).name == "DP-0"
+    assert index.get("DP-0") is mirrored[1]
+
+
+def test_screen_index_without_screens() -> None:
+    assert screen.ScreenIndex([]).locate(0, 0) is None
+    assert screen.locate_point_on_screen([], 0, 0) is None
+
+
+@pytest.mark.parametrize(
+    "name, side, expected",
+    [
+        ("DP-0", "right", "DP-1"),
+        ("DP-0", "down", "DP-6"),
+        ("DP-0", "left", None),
+        ("DP-0", "up", None),
+        ("DP-7", "left", "DP-6"),
+        ("DP-7", "up", "DP-1"),
+        ("DP-23", "right", None),
+        ("DP-23", "up", "DP-17"),
+    ],
+)
+def test_screen_graph_neighbor(name: str, side: str, expected: str) -> None:
+    graph = screen.ScreenGraph(_video_wall(6, 4))
+
+    neighbor = graph.neighbor(name, side)
+
+    assert (neighbor.name if neighbor else None) == expected
+
+
+def test_screen_graph_neighbor_of_mixed_screens() -> None:
+    screens = [
+        ScreenData(name="DP-0", x=2160, y=973, width=3840, height=2160, direction=Direction.HORIZONTAL),
+        ScreenData(name="DP-2", x=0, y=0, width=2160, height=3840, direction=Direction.VERTICAL),
+        # above DP-0 without touching it, sharing no edge with any other screen
+        ScreenData(name="HDMI-0", x=7000, y=-1500, width=1920, height=1080, direction=Direction.HORIZONTAL),
+    ]
+    graph = screen.ScreenGraph(screens)
+
+    assert graph.neighbor("DP-0", "left").name == "DP-2"
+    assert graph.neighbor("DP-2", "right").name == "DP-0"
+    assert graph.neighbor("DP-0", "up").name == "HDMI-0"
+    assert graph.neighbor("HDMI-0", "down").name == "DP-0"
+    assert graph.neighbor("DP-2", "down") is None
+    with pytest.raises(ValueError):
+        graph.neighbor("DP-0", "diagonal")
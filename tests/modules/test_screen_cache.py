@@ -0,0 +1,73 @@
+import os
+
+from tests.modules.fakes import SCREENS, FakeBackend
+from winshift.modules.screen_cache import ScreenCache
+
+
+def test_screen_cache_keeps_screens_in_memory(tmp_path) -> None:
+    backend = FakeBackend(SCREENS, [])
+    cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+
+    assert cache.get_screens_data() == SCREENS
+    assert cache.get_screens_data() == SCREENS
+    assert backend.queries == 1
+
+    backend.changed = True
+    cache.get_screens_data()
+    assert backend.queries == 2
+    assert not os.path.exists(cache.cache_path)
+
+
+def test_screen_cache_reuses_disk_cache_for_same_fingerprint(tmp_path) -> None:
+    cache_path = os.path.join(tmp_path, "cache", "screens.json")
+    backend = FakeBackend(SCREENS, [], fingerprint="x11::1:1")
+
+    assert ScreenCache(backend, cache_path).get_screens_data() == SCREENS
+    assert ScreenCache(backend, cache_path).get_screens_data() == SCREENS
+    assert backend.queries == 1
+
+    backend.fingerprint = "x11::1:2"
+    ScreenCache(backend, cache_path).get_screens_data()
+    assert backend.queries == 2
+
+
+def test_screen_cache_refresh(tmp_path) -> None:
+    backend = FakeBackend(SCREENS, [], fingerprint="x11::1:1")
+    cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+    cache.get_screens_data()
+
+    assert cache.refresh() == SCREENS
+    assert backend.queries == 2
+
+
+def test_screen_cache_rebuilds_screen_graph_when_screens_change(tmp_path) -> None:
+    backend = FakeBackend(SCREENS, [])
+    cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+
+    graph = cache.get_screen_graph()
+    assert cache.get_screen_graph() is graph
+    assert graph.neighbor("DP-0", "left").name == "DP-2"
+
+    backend.screens = SCREENS[:1]
+    backend.changed = True
+    assert cache.get_screen_graph().neighbor("DP-0", "left") is None
+
+
+def test_screen_cache_remembers_previous_screens(tmp_path) -> None:
+    cache_path = os.path.join(tmp_path, "screens.json")
+    backend = FakeBackend(SCREENS, [], fingerprint="x11::1:1")
+    ScreenCache(backend, cache_path).get_screens_data()
+
+    backend.screens, backend.fingerprint = SCREENS[:1], "x11::1:2"
+    cache = ScreenCache(backend, cache_path)
+    assert cache.get_screens_data() == SCREENS[:1]
+    assert cache.previous_screens_data == SCREENS
+    # still known to the next command
+    cache = ScreenCache(backend, cache_path)
+    cache.get_screens_data()
+    assert cache.previous_screens_data == SCREENS
+
+    cache.forget_previous_screens()
+    cache = ScreenCache(backend, cache_path)
+    cache.get_screens_data()
+    assert cache.previous_screens_data is None
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from xml.etree import ElementTree
+
+from winshift.modules.svg_icons import create_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _create_svg(path, screen_border_width: int = 0, window_border_width: int = 1) -> ElementTree.Element:
+    create_svg(
+        image_size=72,
+        margin=8,
+        screen_dims=(1920, 1080),
+        window_dims=(960, 0, 960, 1080),
+        output_path=str(path),
+        screen_color="#6699ff",
+        screen_border_color="#b2b2b2",
+        screen_border_width=screen_border_width,
+        window_color="#003399",
+        window_border_color="#b2b2b2",
+        window_border_width=window_border_width,
+    )
+    return ElementTree.parse(path).getroot()
+
+
+def test_create_svg_keeps_screen_coordinates(tmp_path) -> None:
+    root = _create_svg(tmp_path / "icon.svg")
+
+    screen, window = root.findall(f"{SVG}rect")
+    # 8px of margin at 56px for 1920 wide are 274.29 screen pixels
+    assert root.get("viewBox") == "-274.286 -694.286 2468.57 2468.57"
+    assert (root.get("width"), root.get("height")) == ("72", "72")
+    assert screen.attrib == {"x": "0", "y": "0", "width": "1920", "height": "1080", "fill": "#6699ff"}
+    assert window.get("stroke-width") == "34.2857"
+    assert float(window.get("x")) + float(window.get("width")) / 2 == 1440
+
+
+def test_create_svg_skips_invisible_borders(tmp_path) -> None:
+    root = _create_svg(tmp_path / "icon.svg", screen_border_width=0, window_border_width=0)
+
+    assert all(rect.get("stroke") is None for rect in root.findall(f"{SVG}rect"))
+
+
+def test_generate_svg_icons_does_not_import_pillow(tmp_path) -> None:
+    code = (
+        "import sys\n"
+        "from winshift.modules.icon_generation import IconJob, IconStyle, generate_icons\n"
+        "style = IconStyle(72, 8, '#6699ff', '#b2b2b2', 0, '#003399', '#b2b2b2', 1)\n"
+        "jobs = [IconJob(f'horizontal-{i}.svg', (1920, 1080), (0, 0, 960, 1080)) for i in range(20)]\n"
+        f"report = generate_icons(jobs, style, {str(tmp_path)!r}, icon_format='svg')\n"
+        "print(len(report.rendered), 'PIL' in sys.modules)\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == ["20", "False"]
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from tests.modules.fakes import SCREENS, WINDOWS, FakeBackend
+from winshift.cli import AppCLI
+from winshift.modules.config import ConfigData
+from winshift.modules.direction import Direction
+from winshift.modules.layout import BarHeight, CalculatedLayout
+from winshift.modules.screen import ScreenData, ScreenIndex
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.tiling import TILING_MODES, tile_screen, tile_windows
+from winshift.modules.window import ClientWindow
+
+DP_0, DP_2 = SCREENS
+FULL_HD = ScreenData(name="HDMI-0", x=0, y=0, width=1920, height=1080, direction=Direction.HORIZONTAL)
+BAR_HEIGHT = BarHeight("HDMI-0", top=30, bottom=0, left=0, right=0, gap=10)
+
+
+def _assert_tiles_partition_area(tiles, area, gap) -> None:
+    x, y, width, height = area
+    covered = 0
+    for i, tile in enumerate(tiles):
+        assert tile.width > 0 and tile.height > 0
+        assert x <= tile.x and tile.x + tile.width <= x + width
+        assert y <= tile.y and tile.y + tile.height <= y + height
+        covered += tile.width * tile.height
+        for other in tiles[i + 1 :]:
+            # apart by at least the gap on one axis
+            assert (
+                tile.x + tile.width + gap <= other.x
+                or other.x + other.width + gap <= tile.x
+                or tile.y + tile.height + gap <= other.y
+                or other.y + other.height + gap <= tile.y
+            )
+    assert covered <= width * height
+
+
+def test_tile_screen_grid() -> None:
+    assert tile_screen(FULL_HD, 3, "grid", BAR_HEIGHT) == [
+        CalculatedLayout(10, 40, 945, 510),
+        CalculatedLayout(965, 40, 945, 510),
+        CalculatedLayout(10, 560, 1900, 510),
+    ]
+
+
+def test_tile_screen_master_stack() -> None:
+    assert tile_screen(FULL_HD, 3, "master-stack", BAR_HEIGHT, master_ratio=0.6) == [
+        CalculatedLayout(10, 40, 1134, 1030),
+        CalculatedLayout(1154, 40, 756, 510),
+        CalculatedLayout(1154, 560, 756, 510),
+    ]
+
+
+def test_tile_screen_columns_of_vertical_screen_are_rows() -> None:
+    assert tile_screen(DP_2, 2, "columns") == [
+        CalculatedLayout(0, 0, 2160, 1920),
+        CalculatedLayout(0, 1920, 2160, 1920),
+    ]
+
+
+def test_tile_screen_bsp() -> None:
+    assert tile_screen(FULL_HD, 4, "bsp") == [
+        CalculatedLayout(0, 0, 960, 540),
+        CalculatedLayout(0, 540, 960, 540),
+        CalculatedLayout(960, 0, 960, 540),
+        CalculatedLayout(960, 540, 960, 540),
+    ]
+
+
+@pytest.mark.parametrize("mode", TILING_MODES)
+@pytest.mark.parametrize("count", [1, 2, 5, 12, 60])
+def test_tile_screen_partitions_the_area_between_bars_and_gaps(mode: str, count: int) -> None:
+    tiles = tile_screen(DP_0, count, mode, BarHeight("DP-0", top=32, bottom=0, left=0, right=0, gap=8))
+
+    assert len(tiles) == count
+    _assert_tiles_partition_area(tiles, (2168, 1013, 3824, 2112), 8)
+
+
+def test_tile_screen_unknown_mode() -> None:
+    assert tile_screen(FULL_HD, 0) == []
+    with pytest.raises(ValueError):
+        tile_screen(FULL_HD, 2, "spiral")
+
+
+def test_tile_windows_of_the_screen_in_one_batch() -> None:
+    windows = [*WINDOWS, ClientWindow(name="4", x=3000, y=1200, width=800, height=600)]
+    backend = FakeBackend(SCREENS, windows)
+
+    moves = tile_windows(backend, ScreenIndex(SCREENS), DP_0, "columns", first_window="4")
+
+    assert [(window.name, calculated_layout) for window, calculated_layout in moves] == [
+        ("4", CalculatedLayout(2160, 973, 1920, 2160)),
+        ("1", CalculatedLayout(4080, 973, 1920, 2160)),
+    ]
+    assert [name for name, _ in backend.moves] == ["4", "1"]
+
+
+def test_tile_windows_leaves_panels_and_other_desktops_alone() -> None:
+    windows = [
+        ClientWindow(name="1", x=3953, y=1833, width=2160, height=960, desktop=0),
+        ClientWindow(name="bar", x=2160, y=973, width=3840, height=45, desktop=-1, window_type="dock"),
+        # wmctrl doesn't report window types, a bar is only known to be on every desktop
+        ClientWindow(name="polybar", x=2160, y=973, width=3840, height=45, desktop=-1),
+        ClientWindow(name="wallpaper", x=2160, y=973, width=3840, height=2160, desktop=0, window_type="desktop"),
+        ClientWindow(name="minimized", x=3000, y=1200, width=800, height=600, desktop=0, hidden=True),
+        ClientWindow(name="other-desktop", x=3000, y=1200, width=800, height=600, desktop=1),
+        ClientWindow(name="4", x=3000, y=1200, width=800, height=600, desktop=0),
+    ]
+    backend = FakeBackend(SCREENS, windows)
+    backend.current_desktop = 0
+
+    moves = tile_windows(backend, ScreenIndex(SCREENS), DP_0, "columns")
+
+    assert [window.name for window, _ in moves] == ["1", "4"]
+    assert [name for name, _ in backend.moves] == ["1", "4"]
+
+
+def test_tile_command_tiles_the_screen_showing_most_of_the_active_window(tmp_path, capsys) -> None:
+    # top-left corner on DP-2, center on DP-0
+    active = ClientWindow(name="5", x=2000, y=1000, width=1600, height=800)
+    backend = FakeBackend(SCREENS, [active, *WINDOWS])
+    app = AppCLI()
+    app.config = ConfigData(bar_heights=[], layouts=[])
+    app.backend = backend
+    app.screen_cache = ScreenCache(backend, os.path.join(tmp_path, "screens.json"))
+
+    app.tile("columns", dry_run=True)
+
+    assert 'Calculated 2 windows on screen "DP-0"' in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+
+from pytest_mock import MockFixture
+
+from tests.modules.fakes import FakeBackend
+from winshift.cli import AppCLI
+from winshift.modules import config, trace
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.trace import NULL_TRACER, Tracer
+
+
+def test_tracer_writes_json_lines() -> None:
+    stream = io.StringIO()
+    tracer = Tracer(stream=stream)
+
+    with tracer.span("outer"):
+        with tracer.span("inner"):
+            pass
+    tracer.flush()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["stage"] for line in lines] == ["inner", "outer"]
+    assert lines[1]["duration_us"] >= lines[0]["duration_us"]
+    assert not tracer.spans
+
+
+def test_tracer_writes_chrome_trace(tmp_path) -> None:
+    trace_path = os.path.join(tmp_path, "trace.json")
+    tracer = Tracer(trace_path)
+
+    for name in ("first", "second"):
+        with tracer.span(name):
+            pass
+        tracer.flush()
+
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert [(event["name"], event["ph"]) for event in events] == [("first", "X"), ("second", "X")]
+
+
+def test_get_tracer(monkeypatch, tmp_path) -> None:
+    monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+    assert trace.get_tracer() is NULL_TRACER
+    assert trace.get_tracer(profile=True).trace_path is None
+
+    monkeypatch.setenv(trace.TRACE_ENV, os.path.join(tmp_path, "trace.jsonl"))
+    assert trace.get_tracer().trace_path == os.path.join(tmp_path, "trace.jsonl")
+
+
+def test_null_tracer_records_nothing() -> None:
+    with NULL_TRACER.span("stage"):
+        pass
+
+    assert NULL_TRACER.span("stage") is NULL_TRACER.span("other")
+    assert not NULL_TRACER.spans
+
+
+def test_change_layout_stages(mocker: MockFixture, fake_backend: FakeBackend, tmp_path) -> None:
+    mocker.patch("winshift.cli.load_config", return_value=config.DEFAULT_CONFIG)
+    stream = io.StringIO()
+    app = AppCLI()
+    app.backend = fake_backend
+    app.screen_cache = ScreenCache(fake_backend, os.path.join(tmp_path, "screens.json"))
+    mocker.patch("winshift.cli.get_tracer", return_value=Tracer(stream=stream))
+
+    app.run(["--profile", "change-layout", "half-left"])
+
+    stages = [json.loads(line)["stage"] for line in stream.getvalue().splitlines()]
+    assert stages == ["config load", "window query", "screen query", "layout", "apply", "change-layout"]
+    assert len(fake_backend.moves) == 1
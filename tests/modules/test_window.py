@@ -1,7 +1,8 @@
 from pytest_mock import MockFixture
 
 from winshift.modules import window
-from winshift.modules.window import WindowData
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.window import ClientWindow, WindowData
 
 
 def test_get_active_window_data(mocker: MockFixture) -> None:
@@ -16,3 +17,48 @@ def test_get_active_window_data(mocker: MockFixture) -> None:
     expected = WindowData(name="123731979", x=3953, y=1833, width=2160, height=960)
 
     assert result == expected
+
+
+def test_resize_reposition_window(mocker: MockFixture) -> None:
+    mock_call = mocker.patch("subprocess.call")
+
+    window.resize_reposition_window(
+        WindowData(name="123731979", x=3953, y=1833, width=2160, height=960),
+        CalculatedLayout(x=0, y=0, width=960, height=1080),
+    )
+
+    mock_call.assert_called_once_with(
+        ["xdotool", "windowmove", "123731979", "0", "0", "windowsize", "123731979", "960", "1080"]
+    )
+
+
+def test_list_client_windows(mocker: MockFixture) -> None:
+    mock_output = (
+        "0x03400003  0 3953 1833 2160 960  firefox.Firefox       host Inbox - Mail\n"
+        "0x04200007 -1 0    0    3840 45   polybar.Polybar       host \n"
+    ).encode("utf-8")
+
+    mock_process = mocker.MagicMock()
+    mock_process.__enter__.return_value.stdout.read.return_value = mock_output
+    mocker.patch("subprocess.Popen", return_value=mock_process)
+
+    result = window.list_client_windows()
+
+    assert result == [
+        ClientWindow(
+            "54525955", 3953, 1833, 2160, 960, window_class="firefox.Firefox", title="Inbox - Mail", desktop=0
+        ),
+        ClientWindow("69206023", 0, 0, 3840, 45, window_class="polybar.Polybar", title="", desktop=-1),
+    ]
+
+
+def test_get_current_desktop(mocker: MockFixture) -> None:
+    mock_output = (
+        "0  - DG: 3840x2160  VP: N/A  WA: 0,45 3840x2115  1\n" "1  * DG: 3840x2160  VP: 0,0  WA: 0,45 3840x2115  2\n"
+    ).encode("utf-8")
+
+    mock_process = mocker.MagicMock()
+    mock_process.__enter__.return_value.stdout.read.return_value = mock_output
+    mocker.patch("subprocess.Popen", return_value=mock_process)
+
+    assert window.get_current_desktop() == 1
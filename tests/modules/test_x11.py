@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockFixture
+
+from winshift.modules.direction import Direction
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.screen import ScreenData
+from winshift.modules.window import WindowData
+
+pytest.importorskip("Xlib")
+
+from Xlib import error  # pylint: disable=wrong-import-position
+
+from winshift.modules import x11  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture(name="x_display")
+def fixture_x_display(mocker: MockFixture):
+    x_display = mocker.MagicMock()
+    x_display.has_extension.return_value = True
+    mocker.patch("winshift.modules.x11.display.Display", return_value=x_display)
+    return x_display
+
+
+def test_get_screens_data(x_display) -> None:
+    root = x_display.screen.return_value.root
+    root.xrandr_get_monitors.return_value.monitors = [
+        SimpleNamespace(name=1, x=2160, y=973, width_in_pixels=3840, height_in_pixels=2160),
+        SimpleNamespace(name=2, x=0, y=0, width_in_pixels=2160, height_in_pixels=3840),
+    ]
+    x_display.get_atom_name.side_effect = {1: "DP-0", 2: "DP-2"}.get
+
+    result = x11.X11Backend().get_screens_data()
+
+    assert result == [
+        ScreenData(name="DP-0", x=2160, y=973, width=3840, height=2160, direction=Direction.HORIZONTAL),
+        ScreenData(name="DP-2", x=0, y=0, width=2160, height=3840, direction=Direction.VERTICAL),
+    ]
+
+
+def test_get_active_window_data(x_display) -> None:
+    root = x_display.screen.return_value.root
+    root.get_full_property.return_value.value = [123731979]
+    root.translate_coords.return_value = SimpleNamespace(x=3953, y=1833)
+    x_display.create_resource_object.return_value.get_geometry.return_value = SimpleNamespace(width=2160, height=960)
+
+    result = x11.X11Backend().get_active_window_data()
+
+    assert result == WindowData(name="123731979", x=3953, y=1833, width=2160, height=960)
+    x_display.create_resource_object.assert_called_once_with("window", 123731979)
+
+
+def test_get_active_window_data_without_active_window(x_display) -> None:
+    x_display.screen.return_value.root.get_full_property.return_value = None
+
+    with pytest.raises(RuntimeError):
+        x11.X11Backend().get_active_window_data()
+
+
+def test_move_resize_window_without_ewmh_support(x_display) -> None:
+    x_display.screen.return_value.root.get_full_property.return_value = None
+
+    x11.X11Backend().move_resize_window(
+        WindowData(name="42", x=0, y=0, width=10, height=10), CalculatedLayout(x=960, y=0, width=960.0, height=1080)
+    )
+
+    x_display.create_resource_object.return_value.configure.assert_called_once_with(x=960, y=0, width=960, height=1080)
+
+
+def test_move_resize_window_with_ewmh_support(x_display) -> None:
+    root = x_display.screen.return_value.root
+    x_display.intern_atom.side_effect = {"_NET_ACTIVE_WINDOW": 1, "_NET_MOVERESIZE_WINDOW": 2, "_NET_SUPPORTED": 3}.get
+    root.get_full_property.return_value.value = [1, 2]
+
+    x11.X11Backend().move_resize_window(
+        WindowData(name="42", x=0, y=0, width=10, height=10), CalculatedLayout(x=960, y=0, width=960.0, height=1080)
+    )
+
+    message = root.send_event.call_args.args[0]
+    assert message.client_type == 2
+    assert list(message.data[1])[1:] == [960, 0, 960, 1080]
+    x_display.create_resource_object.return_value.configure.assert_not_called()
+
+
+def test_event_queue_is_shared_by_screen_and_client_list_changes(x_display) -> None:
+    x_display.intern_atom.side_effect = {"_NET_CLIENT_LIST": 5}.get
+    x_display.query_extension.return_value.first_event = 89
+    backend = x11.X11Backend()
+    events = [SimpleNamespace(type=x11.X.PropertyNotify, atom=5), SimpleNamespace(type=89, atom=0)]
+    x_display.pending_events.side_effect = lambda: bool(events)
+    x_display.next_event.side_effect = lambda: events.pop(0)
+    x_display.fileno.return_value = 7
+
+    assert backend.watch_client_list() == 7
+    assert backend.screens_changed()
+    assert backend.client_list_changed()
+    assert not backend.client_list_changed()
+    assert not backend.screens_changed()
+
+
+def test_list_client_windows_reports_desktop_type_and_state(x_display) -> None:
+    atoms = {
+        name: i
+        for i, name in enumerate(
+            [
+                "_NET_CLIENT_LIST",
+                "_NET_WM_DESKTOP",
+                "_NET_WM_WINDOW_TYPE",
+                "_NET_WM_WINDOW_TYPE_DOCK",
+                "_NET_WM_WINDOW_TYPE_DESKTOP",
+                "_NET_WM_STATE",
+                "_NET_WM_STATE_HIDDEN",
+            ],
+            start=1,
+        )
+    }
+    x_display.intern_atom.side_effect = lambda name: atoms.get(name, 100)
+    root = x_display.screen.return_value.root
+    root.get_full_property.side_effect = lambda atom, _type: SimpleNamespace(value=[42]) if atom == 1 else None
+    root.translate_coords.return_value = SimpleNamespace(x=0, y=0)
+    window = x_display.create_resource_object.return_value
+    window.get_geometry.return_value = SimpleNamespace(width=3840, height=45)
+    window.get_wm_class.return_value = ("polybar", "Polybar")
+    window.get_wm_name.return_value = "bar"
+    properties = {
+        atoms["_NET_WM_DESKTOP"]: [0xFFFFFFFF],
+        atoms["_NET_WM_WINDOW_TYPE"]: [atoms["_NET_WM_WINDOW_TYPE_DOCK"]],
+        atoms["_NET_WM_STATE"]: [atoms["_NET_WM_STATE_HIDDEN"]],
+    }
+    window.get_full_property.side_effect = lambda atom, _type: (
+        SimpleNamespace(value=properties[atom]) if atom in properties else None
+    )
+
+    (result,) = x11.X11Backend().list_client_windows()
+
+    assert (result.window_class, result.desktop, result.window_type, result.hidden) == (
+        "polybar.Polybar",
+        -1,
+        "dock",
+        True,
+    )
+
+
+def test_get_client_windows_skips_windows_closed_while_queried(x_display) -> None:
+    root = x_display.screen.return_value.root
+    root.get_full_property.return_value = SimpleNamespace(value=[41, 42])
+    root.translate_coords.return_value = SimpleNamespace(x=0, y=0)
+    windows = {}
+
+    def create_window(_kind, window_id):
+        if window_id not in windows:
+            window = windows[window_id] = MagicMock()
+            window.get_full_property.return_value = None
+            window.get_wm_class.return_value = ("kitty", "kitty")
+            window.get_wm_name.return_value = "vim"
+            if window_id == 41:
+                window.get_geometry.side_effect = error.BadWindow(x_display, bytes(32))
+            else:
+                window.get_geometry.return_value = SimpleNamespace(width=800, height=600)
+        return windows[window_id]
+
+    x_display.create_resource_object.side_effect = create_window
+    backend = x11.X11Backend()
+
+    assert backend.list_client_window_ids() == ["41", "42"]
+    assert [window.name for window in backend.list_client_windows()] == ["42"]
+    assert [window.name for window in backend.get_client_windows(["41"])] == []
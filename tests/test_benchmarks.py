@@ -0,0 +1,21 @@
+from tests.modules.fakes import SCREENS
+from benchmarks.__main__ import run_benchmark
+from benchmarks.cases import BENCHMARKS
+from benchmarks.fake_tools import fake_tools
+from winshift.modules.screen import get_screens_data
+from winshift.modules.window import get_active_window_data
+
+
+def test_fake_tools_stand_in_for_xrandr_and_xdotool() -> None:
+    with fake_tools(SCREENS):
+        assert get_screens_data() == SCREENS
+        assert get_active_window_data().name == "71303175"
+
+
+def test_run_benchmark_reports_per_call_times() -> None:
+    result = run_benchmark("parse_window_data", rounds=2)
+
+    assert result["name"] == "parse_window_data"
+    assert result["rounds"] == 2
+    assert 0 < result["min_us"] <= result["median_us"]
+    assert "calculate_layout_screen" in BENCHMARKS
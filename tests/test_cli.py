@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+import pytest
+
+from winshift.cli import AppCLI
+
+# generous upper bound for the cumulative import time of winshift.cli, in microseconds
+IMPORT_BUDGET_US = 150_000
+# modules the change-layout hot path must not import at startup
+HEAVY_MODULES = ("PIL", "toml", "socketserver", "Xlib", "concurrent", "multiprocessing", "asyncio")
+# winshift modules only the commands needing them import, checked by name as the timing budget alone is noisy
+LAZY_MODULES = (
+    "winshift.modules.icon_generation",
+    "winshift.modules.tiling",
+    "winshift.modules.reproject",
+    "winshift.modules.rule_watcher",
+)
+
+
+def _import_times(code: str) -> Dict[str, int]:
+    """Return the cumulative import time of every module imported by the code, from python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_change_layout_startup_import_budget() -> None:
+    times = _import_times("from winshift.cli import AppCLI; AppCLI().parse_args(['change-layout', 'half-left'])")
+
+    heavy = [module for module in times if module.split(".")[0] in HEAVY_MODULES or module in LAZY_MODULES]
+    assert not heavy
+    assert times["winshift.cli"] < IMPORT_BUDGET_US
+
+
+def test_parse_args_only_configures_requested_command() -> None:
+    app = AppCLI()
+
+    args = app.parse_args(["--backend", "subprocess", "change-layout", "--dry-run", "half-left"])
+
+    assert args.layout_name == "half-left"
+    assert args.backend == "subprocess"
+    assert app.configured_commands == {"change-layout"}
+
+
+@pytest.mark.parametrize(
+    "argv, expected_sizes",
+    [
+        (["generate-layout-icons", "--image-size", "72", "out"], [72]),
+        (["generate-layout-icons", "--image-size", "48", "--image-size", "72", "out"], [48, 72]),
+        (["generate-layout-icons", "out"], None),
+    ],
+)
+def test_parse_args_image_size_before_output_dir(argv: List[str], expected_sizes: Optional[List[int]]) -> None:
+    args = AppCLI().parse_args(argv)
+
+    assert args.output_dir_path == "out"
+    assert args.image_size == expected_sizes
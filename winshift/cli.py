@@ -1,216 +1,704 @@
 import os
 import argparse
+import dataclasses
+import json
 import shutil
-from typing import Optional
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from winshift.modules.config import add_layout, add_bar_height, load_config, ConfigData
+from winshift.modules.backend import BACKENDS, DisplayBackend, get_backend
+from winshift.modules.config import add_layout, add_bar_height, import_layouts, load_config, ConfigData
+from winshift.modules.cycle import DEFAULT_CYCLE_EXPIRY, DEFAULT_CYCLE_STATE_PATH, LayoutCycler
 from winshift.modules.direction import Direction
-from winshift.modules.icons import create_image
-from winshift.modules.layout import calculate_layout_screen, Layout, BarHeight
-from winshift.modules.screen import get_screens_data, locate_point_on_screen, ScreenData
-from winshift.modules.window import get_active_window_data, resize_reposition_window
+from winshift.modules.geometry import GeometryTable
+from winshift.modules.layout import compile_layout, CalculatedLayout, Layout, BarHeight
+from winshift.modules.placement import apply_plan, parse_plan, resolve_placement, restore_profile
+from winshift.modules.rules import DEFAULT_POLL_INTERVAL
+from winshift.modules.screen import SCREEN_SIDES, ScreenData
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.trace import NULL_TRACER, TRACE_ENV, Tracer, get_tracer
+
+# icon generation (process pool, Pillow), socketserver (daemon), asyncio (watch-rules), tiling and reprojection are
+# imported by the commands using them, keep this module's imports light: every hotkey press pays for them, see
+# tests/test_cli.py
+
+
+def _add_change_layout_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not change layout")
+    parser.add_argument("layout_name", type=str, help="Name of the layout to use")
+    parser.add_argument(
+        "--screen-name",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Name of the screen to use (optional). if not provided, screen will be chosen automatically",
+    )
+
+
+def _add_cycle_layout_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not change layout")
+    parser.add_argument("group_name", type=str, help="Name of the layout group to cycle through")
+    parser.add_argument(
+        "--expiry",
+        type=float,
+        nargs="?",
+        default=DEFAULT_CYCLE_EXPIRY,
+        help=f"Seconds after which a press starts the group over (default: {DEFAULT_CYCLE_EXPIRY})",
+    )
+
+
+def _add_move_to_screen_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not move the window")
+    parser.add_argument("side", type=str, choices=SCREEN_SIDES, help="Side of the current screen to move to")
+
+
+def _add_reproject_windows_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not move the windows")
+
+
+def _add_tile_arguments(parser: argparse.ArgumentParser) -> None:
+    from winshift.modules.tiling import DEFAULT_MASTER_RATIO, TILING_MODES  # pylint: disable=import-outside-toplevel
+
+    parser.add_argument("--dry-run", action="store_true", help="Do not move the windows")
+    parser.add_argument(
+        "--mode",
+        type=str,
+        nargs="?",
+        default="grid",
+        choices=TILING_MODES,
+        help="How to split the screen between its windows (default: grid)",
+    )
+    parser.add_argument(
+        "--screen-name",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Name of the screen to tile (optional). if not provided, the screen of the active window is tiled",
+    )
+    parser.add_argument(
+        "--master-ratio",
+        type=float,
+        nargs="?",
+        default=DEFAULT_MASTER_RATIO,
+        help=f"Share of the screen given to the active window in master-stack mode (default: {DEFAULT_MASTER_RATIO})",
+    )
+
+
+def _add_apply_plan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not change layouts")
+    parser.add_argument(
+        "plan_path",
+        type=str,
+        nargs="?",
+        default="-",
+        help='Plan file, "window layout [screen]" lines or a JSON list (default: - for stdin)',
+    )
+
+
+def _add_restore_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not change layouts")
+    parser.add_argument("profile_name", type=str, help="Name of the profile to restore")
+
+
+def _add_add_layout_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--direction", type=str, help="Screen direction (horizontal or vertical)")
+    parser.add_argument("layout_name", type=str, help="Name of the layout")
+    parser.add_argument(
+        "layout_str",
+        type=str,
+        help="layout string in the format ({x},{y},{width},{height})",
+    )
+
+
+def _add_import_layouts_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--skip-existing", action="store_true", help="Skip layouts already in the config instead of failing"
+    )
+    parser.add_argument(
+        "layouts_path",
+        type=str,
+        nargs="?",
+        default="-",
+        help="TOML file with [layouts.<key>] tables like config.toml (default: - for stdin)",
+    )
+
+
+def _add_add_bar_height_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--screen-name", type=str, help="Screen name (xrandr name)")
+    parser.add_argument("--left", type=int, nargs="?", default=0, help="Left bar height")
+    parser.add_argument("--right", type=int, nargs="?", default=0, help="Right bar height")
+    parser.add_argument("--top", type=int, nargs="?", default=0, help="Top bar height")
+    parser.add_argument("--bottom", type=int, nargs="?", default=0, help="Bottom bar height")
+
+
+def _add_generate_layout_icons_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("output_dir_path", type=str, help="Output directory path")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        nargs="?",
+        default=None,
+        help="Number of processes rendering icons (default: number of CPUs)",
+    )
+    parser.add_argument("--force", action="store_true", help="Render every icon, even unchanged ones")
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        action="append",
+        default=None,
+        help="Size of the generated icons, repeat for several sizes, each in its own SIZExSIZE directory (default: 72)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        nargs="?",
+        default=6,
+        choices=range(10),
+        metavar="0-9",
+        help="zlib compression level of the generated PNGs, lower is faster and bigger (default: 6)",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        nargs="?",
+        default="png",
+        choices=("png", "svg"),
+        help="Format of the generated icons, svg doesn't need Pillow (default: png)",
+    )
+    parser.add_argument(
+        "--sprite-sheet",
+        action="store_true",
+        help="Pack the icons of every size into a single PNG with a JSON index of their offsets",
+    )
+    parser.add_argument(
+        "--margin",
+        type=int,
+        nargs="?",
+        default=8,
+        help="Margin of the generated icons (default: 6)",
+    )
+    parser.add_argument(
+        "--screen-color",
+        type=str,
+        nargs="?",
+        default="#6699ff",
+        help="Color used for the screen rectangle in the generated icons",
+    )
+    parser.add_argument(
+        "--screen-border-color",
+        type=str,
+        nargs="?",
+        default="#b2b2b2",
+        help="Color used for the screen rectangle border in the generated icons (default: #b2b2b2)",
+    )
+    parser.add_argument(
+        "--screen-border-width",
+        type=int,
+        nargs="?",
+        default=0,
+        help="Width used for the screen rectangle border in the generated icons (default: 0)",
+    )
+    parser.add_argument(
+        "--window-color",
+        type=str,
+        nargs="?",
+        default="#003399",
+        help="Color used for the window rectangle in the generated icons (default: #003399)",
+    )
+    parser.add_argument(
+        "--window-border-color",
+        type=str,
+        nargs="?",
+        default="#b2b2b2",
+        help="Color used for the window rectangle border in the generated icons (default: #b2b2b2)",
+    )
+    parser.add_argument(
+        "--window-border-width",
+        type=int,
+        nargs="?",
+        default=1,
+        help="Width used for the window rectangle border in the generated icons (default: 1)",
+    )
+
+
+def _add_dump_geometry_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--json", action="store_true", help="Print the geometry table as JSON")
+
+
+def _add_watch_rules_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dry-run", action="store_true", help="Do not move the windows")
+    parser.add_argument("--existing", action="store_true", help="Also place the windows already open")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        nargs="?",
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"Seconds between window listings without new window events (default: {DEFAULT_POLL_INTERVAL})",
+    )
+
+
+def _add_daemon_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--socket-path",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Unix socket to listen on (default: $XDG_RUNTIME_DIR/winshift-$UID.sock)",
+    )
+
+
+# command name: (help, function adding its arguments), arguments are only added for the command being run
+COMMANDS: Dict[str, Tuple[str, Optional[Callable[[argparse.ArgumentParser], None]]]] = {
+    "list-layouts": ("List available layouts", None),
+    "change-layout": ("Change layout", _add_change_layout_arguments),
+    "cycle-layout": ("Apply the next layout of a group, repeated presses cycle", _add_cycle_layout_arguments),
+    "move-to-screen": ("Move the window to the next screen on a side", _add_move_to_screen_arguments),
+    "reproject-windows": ("Bring back the windows of unplugged or resized screens", _add_reproject_windows_arguments),
+    "tile": ("Tile every window of a screen", _add_tile_arguments),
+    "apply-plan": ("Apply layouts to many windows at once", _add_apply_plan_arguments),
+    "restore-profile": ("Place the windows of a profile", _add_restore_profile_arguments),
+    "add-layout": ("Add a new layout", _add_add_layout_arguments),
+    "import-layouts": ("Add many layouts at once", _add_import_layouts_arguments),
+    "list-bar-heights": ("List bar heights", None),
+    "add-bar-height": ("Add a new bar height", _add_add_bar_height_arguments),
+    "generate-layout-icons": ("Generate layout icons", _add_generate_layout_icons_arguments),
+    "refresh-screens": ("Drop the cached screens and query them again", None),
+    "dump-geometry": ("Print the calculated layouts of every screen", _add_dump_geometry_arguments),
+    "watch-rules": ("Place new windows with the layout of the first matching rule", _add_watch_rules_arguments),
+    "daemon": ("Keep config and screens in memory and serve requests", _add_daemon_arguments),
+}
 
 
 class AppCLI:
     config: ConfigData
+    screen_cache: Optional[ScreenCache] = None
+    backend: Optional[DisplayBackend] = None
+    backend_name: str = "auto"
+    tracer: Tracer = NULL_TRACER
+    geometry_table: Optional[GeometryTable] = None
+    layout_cycler: Optional[LayoutCycler] = None
+    # only worth it for long running processes, a single change-layout calculates one layout
+    precompute_geometry: bool = False
 
     def __init__(self):
         self.parser = argparse.ArgumentParser(description="Divvy")
-        subparsers = self.parser.add_subparsers(dest="command")
-        # list_layouts_parser
-        subparsers.add_parser("list-layouts", help="List available layouts")
-        # change_layout_parser
-        change_layout_parser = subparsers.add_parser("change-layout", help="Change layout")
-        change_layout_parser.add_argument("--dry-run", action="store_true", help="Do not change layout")
-        change_layout_parser.add_argument("layout_name", type=str, help="Name of the layout to use")
-        change_layout_parser.add_argument(
-            "--screen-name",
-            type=str,
-            nargs="?",
-            default=None,
-            help="Name of the screen to use (optional). if not provided, screen will be chosen automatically",
-        )
-        # add_layout_parser
-        add_layout_parser = subparsers.add_parser("add-layout", help="Add a new layout")
-        add_layout_parser.add_argument("--direction", type=str, help="Screen direction (horizontal or vertical)")
-        add_layout_parser.add_argument("layout_name", type=str, help="Name of the layout")
-        add_layout_parser.add_argument(
-            "layout_str",
-            type=str,
-            help="layout string in the format ({x},{y},{width},{height})",
-        )
-        # list bar heights
-        subparsers.add_parser("list-bar-heights", help="List bar heights")
-        # add bar height
-        add_bar_height_parser = subparsers.add_parser("add-bar-height", help="Add a new bar height")
-        add_bar_height_parser.add_argument("--screen-name", type=str, help="Screen name (xrandr name)")
-        add_bar_height_parser.add_argument("--left", type=int, nargs="?", default=0, help="Left bar height")
-        add_bar_height_parser.add_argument("--right", type=int, nargs="?", default=0, help="Right bar height")
-        add_bar_height_parser.add_argument("--top", type=int, nargs="?", default=0, help="Top bar height")
-        add_bar_height_parser.add_argument("--bottom", type=int, nargs="?", default=0, help="Bottom bar height")
-        # generate layout icons
-        generate_layout_icons_parser = subparsers.add_parser("generate-layout-icons", help="Generate layout icons")
-        generate_layout_icons_parser.add_argument("output_dir_path", type=str, help="Output directory path")
-        generate_layout_icons_parser.add_argument(
-            "--image-size",
-            type=int,
-            nargs="?",
-            default=72,
-            help="Size of the generated icons (default: 72)",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--margin",
-            type=int,
-            nargs="?",
-            default=8,
-            help="Margin of the generated icons (default: 6)",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--screen-color",
-            type=str,
-            nargs="?",
-            default="#6699ff",
-            help="Color used for the screen rectangle in the generated icons",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--screen-border-color",
-            type=str,
-            nargs="?",
-            default="#b2b2b2",
-            help="Color used for the screen rectangle border in the generated icons (default: #b2b2b2)",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--screen-border-width",
-            type=int,
-            nargs="?",
-            default=0,
-            help="Width used for the screen rectangle border in the generated icons (default: 0)",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--window-color",
-            type=str,
-            nargs="?",
-            default="#003399",
-            help="Color used for the window rectangle in the generated icons (default: #003399)",
-        )
-        generate_layout_icons_parser.add_argument(
-            "--window-border-color",
+        self.parser.add_argument(
+            "--backend",
             type=str,
-            nargs="?",
-            default="#b2b2b2",
-            help="Color used for the window rectangle border in the generated icons (default: #b2b2b2)",
+            choices=BACKENDS,
+            default=os.environ.get("WINSHIFT_BACKEND", "auto"),
+            help="How to talk to the display server (default: $WINSHIFT_BACKEND or auto)",
         )
-        generate_layout_icons_parser.add_argument(
-            "--window-border-width",
-            type=int,
-            nargs="?",
-            default=1,
-            help="Width used for the window rectangle border in the generated icons (default: 1)",
+        self.parser.add_argument(
+            "--profile",
+            action="store_true",
+            help=f"Print the duration of each stage as JSON lines on stderr, ${TRACE_ENV} writes them to a file "
+            "instead, as a Chrome trace if it ends with .json",
         )
+        subparsers = self.parser.add_subparsers(dest="command")
+        self.command_parsers = {
+            name: subparsers.add_parser(name, help=help_text) for name, (help_text, _) in COMMANDS.items()
+        }
+        self.configured_commands: Set[str] = set()
+
+    def parse_args(self, argv: Optional[List[str]] = None) -> argparse.Namespace:
+        """Parse the command line, only adding the arguments of the requested command to the parser."""
+        argv = sys.argv[1:] if argv is None else argv
+        command = next((arg for arg in argv if arg in COMMANDS), None)
+        if command is not None and command not in self.configured_commands:
+            add_arguments = COMMANDS[command][1]
+            if add_arguments is not None:
+                add_arguments(self.command_parsers[command])
+            self.configured_commands.add(command)
+        return self.parser.parse_args(argv)
 
-    def run(self):
+    def run(self, argv: Optional[List[str]] = None) -> None:
         try:
-            args = self.parser.parse_args()
-            self.config = load_config()
-            if args.command == "list-layouts":
-                self.list_layouts()
-            elif args.command == "change-layout":
-                self.change_layout(args.layout_name, args.screen_name, args.dry_run)
-            elif args.command == "add-layout":
-                add_layout(
-                    Layout(
-                        name=args.layout_name,
-                        layout=args.layout_str,
-                        direction=Direction(args.direction),
-                    )
-                )
-            elif args.command == "list-bar-heights":
-                self.list_bar_heights()
-            elif args.command == "add-bar-height":
-                add_bar_height(
-                    BarHeight(
-                        screen_name=args.screen_name,
-                        top=args.top,
-                        bottom=args.bottom,
-                        right=args.right,
-                        left=args.left,
-                    )
-                )
-            elif args.command == "generate-layout-icons":
-                self.generate_layout_icons(
-                    output_dir_path=args.output_dir_path,
-                    screen_color=args.screen_color,
-                    screen_border_color=args.screen_border_color,
-                    screen_border_width=args.screen_border_width,
-                    window_color=args.window_color,
-                    window_border_color=args.window_border_color,
-                    window_border_width=args.window_border_width,
-                    image_size=args.image_size,
-                    margin=args.margin,
-                )
-            else:
-                self.parser.print_help()
+            args = self.parse_args(argv)
+            self.backend_name = args.backend
+            self.tracer = get_tracer(args.profile)
+            with self.tracer.span("config load"):
+                self.config = load_config()
+            with self.tracer.span(args.command or "help"):
+                self.execute(args)
         except Exception as e:
             print(e)
             self.parser.print_help()
+        finally:
+            self.tracer.flush()
+
+    def reload(self) -> None:
+        """Reload the config and forget the known screens, compiling every valid layout upfront."""
+        self.config = load_config()
+        if self.screen_cache is not None:
+            self.screen_cache.invalidate()
+        for layout in self.config.layouts:
+            try:
+                compile_layout(layout.layout)
+            except ValueError:
+                pass
+        if self.precompute_geometry:
+            self.get_geometry_table()
+            self.get_screen_cache().get_screen_graph()
+
+    def get_backend(self) -> DisplayBackend:
+        """Return the display backend, connecting to it on first use."""
+        if self.backend is None:
+            with self.tracer.span("backend connect"):
+                self.backend = get_backend(self.backend_name)
+        return self.backend
+
+    def get_screen_cache(self) -> ScreenCache:
+        """Return the screen cache of the display backend."""
+        if self.screen_cache is None:
+            self.screen_cache = ScreenCache(self.get_backend())
+        return self.screen_cache
+
+    def get_screens_data(self) -> List[ScreenData]:
+        """Return the screens, only querying the backend when the monitor configuration changed."""
+        return self.get_screen_cache().get_screens_data()
+
+    def get_geometry_table(self) -> GeometryTable:
+        """Return the calculated layouts of the current config and screens, rebuilt when either changes."""
+        screens_data = self.get_screens_data()
+        if self.geometry_table is None or not self.geometry_table.is_current(self.config, screens_data):
+            self.geometry_table = GeometryTable.build(self.config, screens_data)
+        return self.geometry_table
+
+    def execute(self, args: argparse.Namespace) -> None:
+        """Run the command parsed from the command line."""
+        if args.command == "list-layouts":
+            self.list_layouts()
+        elif args.command == "change-layout":
+            self.change_layout(args.layout_name, args.screen_name, args.dry_run)
+        elif args.command == "cycle-layout":
+            self.cycle_layout(args.group_name, args.expiry, args.dry_run)
+        elif args.command == "move-to-screen":
+            self.move_to_screen(args.side, args.dry_run)
+        elif args.command == "reproject-windows":
+            self.reproject_windows(args.dry_run)
+        elif args.command == "tile":
+            self.tile(args.mode, args.screen_name, args.master_ratio, args.dry_run)
+        elif args.command == "apply-plan":
+            self.apply_plan(args.plan_path, args.dry_run)
+        elif args.command == "restore-profile":
+            self.restore_profile(args.profile_name, args.dry_run)
+        elif args.command == "add-layout":
+            add_layout(
+                Layout(
+                    name=args.layout_name,
+                    layout=args.layout_str,
+                    direction=Direction(args.direction),
+                )
+            )
+        elif args.command == "import-layouts":
+            self.import_layouts(args.layouts_path, args.skip_existing)
+        elif args.command == "list-bar-heights":
+            self.list_bar_heights()
+        elif args.command == "add-bar-height":
+            add_bar_height(
+                BarHeight(
+                    screen_name=args.screen_name,
+                    top=args.top,
+                    bottom=args.bottom,
+                    right=args.right,
+                    left=args.left,
+                )
+            )
+        elif args.command == "generate-layout-icons":
+            self.generate_layout_icons(
+                output_dir_path=args.output_dir_path,
+                screen_color=args.screen_color,
+                screen_border_color=args.screen_border_color,
+                screen_border_width=args.screen_border_width,
+                window_color=args.window_color,
+                window_border_color=args.window_border_color,
+                window_border_width=args.window_border_width,
+                image_sizes=args.image_size or [72],
+                margin=args.margin,
+                compress_level=args.compress_level,
+                jobs=args.jobs,
+                force=args.force,
+                sprite_sheet=args.sprite_sheet,
+                icon_format=args.format,
+            )
+        elif args.command == "refresh-screens":
+            for screen_data in self.get_screen_cache().refresh():
+                print(f"{screen_data}")
+        elif args.command == "dump-geometry":
+            self.dump_geometry(args.json)
+        elif args.command == "watch-rules":
+            self.watch_rules(args.existing, args.poll_interval, args.dry_run)
+        elif args.command == "daemon":
+            from winshift.modules.daemon import serve_daemon  # pylint: disable=import-outside-toplevel
+
+            self.precompute_geometry = True
+            self.reload()
+            serve_daemon(self, args.socket_path)
+        else:
+            self.parser.print_help()
 
     def list_layouts(self) -> None:
-        for direction in [Direction.HORIZONTAL, Direction.VERTICAL]:
-            dir_layouts = []
-            max_layout_name_len = 0
-            for layout in self.config.layouts:
-                if layout.direction == direction:
-                    dir_layouts.append(layout)
-                    max_layout_name_len = max(max_layout_name_len, len(layout.name))
-            if dir_layouts:
+        dir_layouts: Dict[Direction, List[Layout]] = {Direction.HORIZONTAL: [], Direction.VERTICAL: []}
+        for layout in self.config.layouts:
+            dir_layouts[layout.direction].append(layout)
+        for direction, layouts in dir_layouts.items():
+            if layouts:
+                max_layout_name_len = max(len(layout.name) for layout in layouts)
                 print(f"layouts {direction.value} screens:")
-                for layout in dir_layouts:
+                for layout in layouts:
                     print(f"  {layout.name.ljust(max_layout_name_len)} \t {layout.layout}")
 
     def change_layout(self, layout_name: str, screen_name: Optional[str] = None, dry_run: bool = False) -> None:
-        window_data = get_active_window_data()
-        screens_data = get_screens_data()
+        tracer = self.tracer
+        with tracer.span("window query"):
+            window_data = self.get_backend().get_active_window_data()
+        with tracer.span("screen query"):
+            screen_index = self.get_screen_cache().get_screen_index()
+            geometry = self.get_geometry_table() if self.precompute_geometry else None
+        with tracer.span("layout"):
+            placement = resolve_placement(self.config, screen_index, window_data, layout_name, screen_name, geometry)
+        print(f'Screen "{placement.screen}"')
+        print(f'Layout "{placement.layout.layout}" applied to screen "{placement.screen.name}"')
+        print(f'Bar height "{placement.bar_height}" applied to screen "{placement.screen.name}"')
+        print(f'Window "{window_data}"')
 
-        if screen_name:
-            target_screen = next((screen for screen in screens_data if screen.name == screen_name), None)
+        if dry_run:
+            print(f"Dry run, calculated window layout: {placement.calculated_layout}")
+        else:
+            with tracer.span("apply"):
+                self.get_backend().move_resize_window(window_data, placement.calculated_layout)
+            print(f"Window resized and repositioned {placement.calculated_layout}")
+
+    def get_layout_cycler(self) -> LayoutCycler:
+        """Return the cycling state, in memory in the daemon and in a file between one-shot commands."""
+        if self.layout_cycler is None:
+            self.layout_cycler = LayoutCycler(None if self.precompute_geometry else DEFAULT_CYCLE_STATE_PATH)
+        return self.layout_cycler
+
+    def cycle_layout(self, group_name: str, expiry: float = DEFAULT_CYCLE_EXPIRY, dry_run: bool = False) -> None:
+        group = self.config.get_group(group_name)
+        if group is None:
+            raise RuntimeError(f"Layout group {group_name} not found")
+        tracer = self.tracer
+        with tracer.span("window query"):
+            window_data = self.get_backend().get_active_window_data()
+        with tracer.span("screen query"):
+            screen_index = self.get_screen_cache().get_screen_index()
+            geometry = self.get_geometry_table() if self.precompute_geometry else None
+        with tracer.span("layout"):
+            screen_data = screen_index.locate(window_data.x, window_data.y)
+            if screen_data is None:
+                raise RuntimeError("No screens found")
+            cycler = self.get_layout_cycler()
+            cycler.expiry = expiry
+            layout_name = cycler.next_layout(self.config, group, screen_data, window_data, geometry)
+            placement = resolve_placement(
+                self.config, screen_index, window_data, layout_name, screen_data.name, geometry
+            )
+        print(f'Layout "{layout_name}" of group "{group_name}" applied to screen "{placement.screen.name}"')
+
+        if dry_run:
+            print(f"Dry run, calculated window layout: {placement.calculated_layout}")
         else:
-            target_screen = locate_point_on_screen(screens_data, window_data.x, window_data.y)
+            with tracer.span("apply"):
+                self.get_backend().move_resize_window(window_data, placement.calculated_layout)
+            print(f"Window resized and repositioned {placement.calculated_layout}")
 
-        if target_screen is None:
+    def move_to_screen(self, side: str, dry_run: bool = False) -> None:
+        from winshift.modules import reproject  # pylint: disable=import-outside-toplevel
+
+        tracer = self.tracer
+        with tracer.span("window query"):
+            window_data = self.get_backend().get_active_window_data()
+        with tracer.span("screen query"):
+            screen_index = self.get_screen_cache().get_screen_index()
+            screen_graph = self.get_screen_cache().get_screen_graph()
+        with tracer.span("layout"):
+            # the center rather than the corner, a window overlapping two screens belongs to the one showing most
+            source = screen_index.locate(
+                window_data.x + window_data.width // 2, window_data.y + window_data.height // 2
+            )
+            if source is None:
+                raise RuntimeError("No screens found")
+            target = screen_graph.neighbor(source.name, side)
+            if target is None:
+                raise RuntimeError(f'No screen {side} of screen "{source.name}"')
+            calculated_layout = reproject.reproject_window(
+                window_data,
+                source,
+                target,
+                self.config.get_bar_height(source.name),
+                self.config.get_bar_height(target.name),
+            )
+        print(f'Window "{window_data}" moved from screen "{source.name}" to screen "{target.name}"')
+
+        if dry_run:
+            print(f"Dry run, calculated window layout: {calculated_layout}")
+        else:
+            with tracer.span("apply"):
+                self.get_backend().move_resize_window(window_data, calculated_layout)
+            print(f"Window resized and repositioned {calculated_layout}")
+
+    def reproject_windows(self, dry_run: bool = False) -> None:
+        from winshift.modules import reproject  # pylint: disable=import-outside-toplevel
+
+        tracer = self.tracer
+        with tracer.span("screen query"):
+            screen_cache = self.get_screen_cache()
+            screens_data = screen_cache.get_screens_data()
+            previous_screens_data = screen_cache.previous_screens_data
+        if previous_screens_data is None:
+            print("The screens didn't change, no window to reproject")
+            return
+        with tracer.span("window query"):
+            windows = self.get_backend().list_client_windows()
+        with tracer.span("layout"):
+            moves = reproject.reproject_windows(
+                windows, previous_screens_data, screens_data, self.config.bar_height_index
+            )
+        for window_data, calculated_layout in moves:
+            print(f'Window "{window_data}" reprojected to {calculated_layout}')
+
+        if dry_run:
+            print(f"Dry run, calculated {len(moves)}/{len(windows)} windows")
+        else:
+            with tracer.span("apply"):
+                self.get_backend().move_resize_windows(moves)
+            screen_cache.forget_previous_screens()
+            print(f"Reprojected {len(moves)}/{len(windows)} windows")
+
+    def tile(
+        self,
+        mode: str = "grid",
+        screen_name: Optional[str] = None,
+        master_ratio: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> None:
+        # pylint: disable=import-outside-toplevel
+        from winshift.modules.tiling import DEFAULT_MASTER_RATIO, tile_windows
+
+        tracer = self.tracer
+        with tracer.span("window query"):
+            window_data = self.get_backend().get_active_window_data()
+        with tracer.span("screen query"):
+            screen_index = self.get_screen_cache().get_screen_index()
+        if screen_name:
+            screen_data = screen_index.get(screen_name)
+        else:
+            # the center like tile_windows, a window overlapping two screens tiles the one showing most of it
+            screen_data = screen_index.locate(
+                window_data.x + window_data.width // 2, window_data.y + window_data.height // 2
+            )
+        if screen_data is None:
             raise RuntimeError(f"Screen {screen_name} not found")
 
-        layout = next(
-            (
-                layout_listed
-                for layout_listed in self.config.layouts
-                if layout_listed.name == layout_name and layout_listed.direction == target_screen.direction
-            ),
-            None,
+        with tracer.span("apply"):
+            moves = tile_windows(
+                self.get_backend(),
+                screen_index,
+                screen_data,
+                mode,
+                self.config.get_bar_height(screen_data.name),
+                DEFAULT_MASTER_RATIO if master_ratio is None else master_ratio,
+                window_data.name,
+                dry_run,
+            )
+        for window, calculated_layout in moves:
+            print(f'{window.name} "{window.title}": {calculated_layout}')
+        action = "Calculated" if dry_run else "Tiled"
+        print(f'{action} {len(moves)} windows on screen "{screen_data.name}" ({mode})')
+
+    def apply_plan(self, plan_path: str, dry_run: bool = False) -> None:
+        if plan_path == "-":
+            plan = sys.stdin.read()
+        else:
+            with open(plan_path, encoding="utf-8") as f:
+                plan = f.read()
+
+        results = apply_plan(
+            self.get_backend(), self.config, self.get_screen_cache().get_screen_index(), parse_plan(plan), dry_run
         )
+        for result in results:
+            entry = result.entry
+            duration_ms = result.duration * 1000
+            if result.error:
+                print(f"{entry.window} {entry.layout_name}: failed in {duration_ms:.2f}ms: {result.error}")
+            else:
+                print(f"{entry.window} {entry.layout_name}: {result.calculated_layout} in {duration_ms:.2f}ms")
+        applied = sum(1 for result in results if not result.error)
+        total_ms = sum(result.duration for result in results) * 1000
+        print(f"{'Calculated' if dry_run else 'Applied'} {applied}/{len(results)} windows in {total_ms:.2f}ms")
 
-        if not layout:
-            raise RuntimeError(f"Layout {layout_name} not found for {target_screen.direction}")
+    def restore_profile(self, profile_name: str, dry_run: bool = False) -> None:
+        profile = self.config.get_profile(profile_name)
+        if profile is None:
+            raise RuntimeError(f"Profile {profile_name} not found")
 
-        bar_height = next(
-            (
-                bar_height_listed
-                for bar_height_listed in self.config.bar_heights
-                if bar_height_listed.screen_name == target_screen.name
-            ),
-            None,
+        start = time.perf_counter()
+        restored = restore_profile(
+            self.get_backend(), self.config, self.get_screen_cache().get_screen_index(), profile, dry_run
         )
+        duration_ms = (time.perf_counter() - start) * 1000
+        for restored_window in restored:
+            window = restored_window.window
+            if restored_window.error:
+                print(
+                    f'{window.name} "{window.title}" {restored_window.profile_window.layout}: {restored_window.error}'
+                )
+            else:
+                print(f'{window.name} "{window.title}": {restored_window.calculated_layout}')
+        placed = sum(1 for restored_window in restored if not restored_window.error)
+        print(f"{'Calculated' if dry_run else 'Restored'} {placed}/{len(restored)} windows in {duration_ms:.2f}ms")
 
-        new_window_layout = calculate_layout_screen(target_screen, layout, bar_height)
-        print(f'Screen "{target_screen}"')
-        print(f'Layout "{layout.layout}" applied to screen "{target_screen.name}"')
-        print(f'Bar height "{bar_height}" applied to screen "{target_screen.name}"')
-        print(f'Window "{window_data}"')
+    def watch_rules(
+        self, place_existing: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL, dry_run: bool = False
+    ) -> None:
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+        from winshift.modules.rule_watcher import RuledWindow, RuleWatcher
 
-        if dry_run:
-            print(f"Dry run, calculated window layout: {new_window_layout}")
+        if not self.config.rules:
+            raise RuntimeError("No window rules found")
+
+        def print_placed(placed: List[RuledWindow]) -> None:
+            for ruled_window in placed:
+                window = ruled_window.window
+                result = ruled_window.error or f"{ruled_window.calculated_layout}"
+                print(f'{window.name} "{window.title}" {ruled_window.rule.layout}: {result}', flush=True)
+
+        watcher = RuleWatcher(
+            self.get_backend(), self.config, self.get_screen_cache(), poll_interval, dry_run, print_placed
+        )
+        print(f"Watching new windows with {len(self.config.rules)} rules", flush=True)
+        try:
+            asyncio.run(watcher.run(place_existing))
+        except KeyboardInterrupt:
+            pass
+
+    def import_layouts(self, layouts_path: str, skip_existing: bool = False) -> None:
+        import toml  # pylint: disable=import-outside-toplevel
+
+        if layouts_path == "-":
+            data = toml.load(sys.stdin)
         else:
-            resize_reposition_window(window_data, new_window_layout)
-            print(f"Window resized and repositioned {new_window_layout}")
+            with open(layouts_path, encoding="utf-8") as f:
+                data = toml.load(f)
+        layouts = ConfigData.from_dict({"layouts": data.get("layouts", {})}).layouts
+        added = import_layouts(layouts, skip_existing)
+        print(f"Imported {added}/{len(layouts)} layouts")
+
+    def dump_geometry(self, as_json: bool = False) -> None:
+        geometry = self.get_geometry_table().as_dict()
+        if as_json:
+            print(json.dumps(geometry, indent=2))
+            return
+        for screen_name, layouts in geometry.items():
+            print(f"screen {screen_name}:")
+            max_layout_name_len = max((len(layout_name) for layout_name in layouts), default=0)
+            for layout_name, calculated_layout in layouts.items():
+                print(f"  {layout_name.ljust(max_layout_name_len)} \t {CalculatedLayout(**calculated_layout)}")
 
     def list_bar_heights(self) -> None:
         for bar_height in self.config.bar_heights:
@@ -225,43 +713,67 @@ class AppCLI:
         window_color: str,
         window_border_color: str,
         window_border_width: int,
-        image_size: int,
+        image_sizes: List[int],
         margin: int,
+        compress_level: int = 6,
+        jobs: Optional[int] = None,
+        force: bool = False,
+        sprite_sheet: bool = False,
+        icon_format: str = "png",
     ) -> None:
-        screens_data = get_screens_data()
+        # pylint: disable=import-outside-toplevel
+        from winshift.modules.icon_generation import (
+            IconReport,
+            IconStyle,
+            generate_icons,
+            generate_sprite_sheet,
+            layout_icon_jobs,
+        )
+
+        if sprite_sheet and icon_format != "png":
+            raise RuntimeError("Sprite sheets are only generated as png")
+        screens_data = self.get_screens_data()
         if not screens_data:
             raise RuntimeError("No screens found")
-        screen_width = screens_data[0].width
-        screen_height = screens_data[0].height
-        screen_direction = screens_data[0].direction
 
-        for layout in self.config.layouts:
-            screen_data = ScreenData(
-                name="",
-                x=0,
-                y=0,
-                width=screen_width if layout.direction == screen_direction else screen_height,
-                height=screen_height if layout.direction == screen_direction else screen_width,
-                direction=layout.direction,
-            )
+        style = IconStyle(
+            image_size=image_sizes[0],
+            margin=margin,
+            screen_color=screen_color,
+            screen_border_color=screen_border_color,
+            screen_border_width=screen_border_width,
+            window_color=window_color,
+            window_border_color=window_border_color,
+            window_border_width=window_border_width,
+            compress_level=compress_level,
+        )
+        icon_jobs = layout_icon_jobs(self.config.layouts, screens_data[0], icon_format)
+        if sprite_sheet:
+            reports = [
+                (output_dir_path, generate_sprite_sheet(icon_jobs, style, image_sizes, output_dir_path, force=force))
+            ]
+        elif len(image_sizes) == 1:
+            reports = [(output_dir_path, generate_icons(icon_jobs, style, output_dir_path, jobs, force, icon_format))]
+        else:
+            reports = []
+            for image_size in image_sizes:
+                size_dir_path = os.path.join(output_dir_path, f"{image_size}x{image_size}")
+                size_style = dataclasses.replace(style, image_size=image_size)
+                reports.append(
+                    (size_dir_path, generate_icons(icon_jobs, size_style, size_dir_path, jobs, force, icon_format))
+                )
 
-            output_path = os.path.join(output_dir_path, f"{layout.direction.value}-{layout.name}.png")
-            window = calculate_layout_screen(screen_data, layout)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            create_image(
-                image_size=image_size,
-                margin=margin,
-                screen_dims=(screen_data.width, screen_data.height),
-                window_dims=(window.x, window.y, window.width, window.height),
-                output_path=output_path,
-                screen_color=screen_color,
-                screen_border_color=screen_border_color,
-                screen_border_width=screen_border_width,
-                window_color=window_color,
-                window_border_color=window_border_color,
-                window_border_width=window_border_width,
-            )
-            print(f"Created {output_path}")
+        report = IconReport()
+        for dir_path, dir_report in reports:
+            for file_name in dir_report.rendered:
+                print(f"Created {os.path.join(dir_path, file_name)}")
+            report.rendered.extend(dir_report.rendered)
+            report.skipped.extend(dir_report.skipped)
+            report.duration += dir_report.duration
+        print(
+            f"Rendered {len(report.rendered)} icons, skipped {len(report.skipped)} unchanged "
+            f"in {report.duration * 1000:.2f}ms"
+        )
 
 
 def _check_external_dependencies() -> None:
@@ -0,0 +1,48 @@
+"""Thin client for the winshift daemon.
+
+This module is the hotkey hot path: it must only import from the standard library and do a single socket round-trip.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import List, Optional
+
+
+def default_socket_path() -> str:
+    """Return the socket path the daemon listens on by default."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"winshift-{os.getuid()}.sock")
+
+
+def send_command(argv: List[str], socket_path: Optional[str] = None) -> dict:
+    """Send a command line to the daemon and return its response, raise ValueError if it isn't a valid one."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            line = response.readline()
+    if not line:
+        raise ValueError("the daemon closed the connection without answering")
+    response = json.loads(line)
+    if not isinstance(response, dict) or not isinstance(response.get("output"), str) or "ok" not in response:
+        raise ValueError(f"unexpected response {line[:200]!r}")
+    return response
+
+
+def main() -> None:
+    try:
+        response = send_command(sys.argv[1:], os.environ.get("WINSHIFT_SOCKET"))
+    except OSError as e:
+        print(f"winshift daemon is not reachable: {e}", file=sys.stderr)
+        sys.exit(2)
+    except ValueError as e:
+        print(f"winshift daemon sent an invalid response: {e}", file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.write(response["output"])
+    sys.exit(0 if response["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from winshift.modules import screen, window
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.screen import ScreenData
+from winshift.modules.window import ClientWindow, WindowData
+
+BACKENDS = ("auto", "x11", "subprocess")
+
+
+class DisplayBackend(ABC):
+    """Access to the display server: screens, the active window and window geometry."""
+
+    @abstractmethod
+    def get_screens_data(self) -> List[ScreenData]:
+        """Return the active monitors."""
+
+    @abstractmethod
+    def get_active_window_data(self) -> WindowData:
+        """Return the focused window."""
+
+    @abstractmethod
+    def get_window_data(self, window_id: str) -> WindowData:
+        """Return the window with the given id, decimal or 0x prefixed hexadecimal."""
+
+    @abstractmethod
+    def move_resize_window(self, window_data: WindowData, layout_data: CalculatedLayout) -> None:
+        """Apply the new position and size of the window as a single operation."""
+
+    @abstractmethod
+    def list_client_windows(self) -> List[ClientWindow]:
+        """Return the windows managed by the window manager."""
+
+    def list_client_window_ids(self) -> List[str]:
+        """Return the ids of the windows managed by the window manager, without querying each window if possible."""
+        return [client_window.name for client_window in self.list_client_windows()]
+
+    def get_client_windows(self, window_ids: Sequence[str]) -> List[ClientWindow]:
+        """Return the client windows with the given ids, without the ones closed since they were listed."""
+        wanted = set(window_ids)
+        return [client_window for client_window in self.list_client_windows() if client_window.name in wanted]
+
+    def get_current_desktop(self) -> Optional[int]:
+        """Return the EWMH desktop shown, None if the window manager doesn't tell."""
+        return None
+
+    def move_resize_windows(self, moves: List[Tuple[WindowData, CalculatedLayout]]) -> None:
+        """Apply the new geometry of many windows, backends batch them when they can."""
+        for window_data, layout_data in moves:
+            self.move_resize_window(window_data, layout_data)
+
+    def get_screens_fingerprint(self) -> Optional[str]:
+        """Return a cheap identifier of the monitor configuration, None if it can't be known without a query."""
+        return None
+
+    def screens_changed(self) -> bool:
+        """Return True if the monitor configuration changed since the last call."""
+        return False
+
+    def watch_client_list(self) -> Optional[int]:
+        """
+        Start listening for changes of the window manager's client list.
+
+        Return a file descriptor which becomes readable when changes may be pending, or None when the backend can't
+        be notified and the client list has to be polled.
+        """
+        return None
+
+    def client_list_changed(self) -> bool:
+        """Handle the pending notifications without blocking, return True if the client list may have changed."""
+        return True
+
+    def close(self) -> None:
+        """Release the resources held by the backend."""
+
+
+class SubprocessBackend(DisplayBackend):
+    """Backend scraping the output of the xrandr and xdotool commands.
+
+    Monitor changes can't be noticed without running xrandr, so the screens are trusted until refresh-screens or
+    reload.
+    """
+
+    def get_screens_data(self) -> List[ScreenData]:
+        return screen.get_screens_data()
+
+    def get_active_window_data(self) -> WindowData:
+        return window.get_active_window_data()
+
+    def get_window_data(self, window_id: str) -> WindowData:
+        return window.get_window_data(str(int(window_id, 0)))
+
+    def list_client_windows(self) -> List[ClientWindow]:
+        return window.list_client_windows()
+
+    def get_current_desktop(self) -> Optional[int]:
+        return window.get_current_desktop()
+
+    def move_resize_window(self, window_data: WindowData, layout_data: CalculatedLayout) -> None:
+        window.resize_reposition_window(window_data, layout_data)
+
+    def move_resize_windows(self, moves: List[Tuple[WindowData, CalculatedLayout]]) -> None:
+        window.resize_reposition_windows(moves)
+
+
+def get_backend(name: str = "auto") -> DisplayBackend:
+    """Return the backend by name, auto prefers a native X11 connection and falls back to subprocesses."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}, expected one of {', '.join(BACKENDS)}")
+    if name == "subprocess":
+        return SubprocessBackend()
+
+    try:
+        from winshift.modules.x11 import X11Backend  # pylint: disable=import-outside-toplevel
+
+        return X11Backend()
+    except ImportError as exc:
+        if name == "x11":
+            raise RuntimeError("The x11 backend requires python-xlib, install winshift[x11]") from exc
+    except Exception:  # pylint: disable=broad-except
+        # no reachable X server, e.g. DISPLAY unset: let the subprocess backend report it when used
+        if name == "x11":
+            raise
+    return SubprocessBackend()
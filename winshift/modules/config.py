@@ -1,23 +1,110 @@
+import fcntl
+import marshal
 import os
-from dataclasses import dataclass
-from typing import List
-
-import toml
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from winshift.modules.direction import Direction
-from winshift.modules.layout import validate_layout, BarHeight, Layout, validate_bar_height, validate_layout_name
+from winshift.modules.layout import (
+    validate_layout,
+    BarHeight,
+    Layout,
+    LayoutGroup,
+    validate_bar_height,
+    validate_layout_name,
+)
+from winshift.modules.profile import Profile, ProfileWindow, validate_profile
+from winshift.modules.rules import WindowRule, validate_rules
 
 
 @dataclass
 class ConfigData:
     bar_heights: List[BarHeight]
     layouts: List[Layout]
+    profiles: List[Profile] = field(default_factory=list)
+    groups: List[LayoutGroup] = field(default_factory=list)
+    # in order, the first rule matching a window wins, validated when the config is built
+    rules: List[WindowRule] = field(default_factory=list)
+    # lookup indexes, kept consistent by add_layout, add_bar_height, add_profile and add_group
+    layout_index: Dict[Tuple[Direction, str], Layout] = field(init=False, repr=False, compare=False)
+    bar_height_index: Dict[str, BarHeight] = field(init=False, repr=False, compare=False)
+    profile_index: Dict[str, Profile] = field(init=False, repr=False, compare=False)
+    group_index: Dict[str, LayoutGroup] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        layouts, bar_heights, profiles, groups = self.layouts, self.bar_heights, self.profiles, self.groups
+        self.layouts, self.bar_heights, self.profiles, self.groups = [], [], [], []
+        self.layout_index, self.bar_height_index, self.profile_index, self.group_index = {}, {}, {}, {}
+        for layout in layouts:
+            self.add_layout(layout)
+        for bar_height in bar_heights:
+            self.add_bar_height(bar_height)
+        for profile in profiles:
+            self.add_profile(profile)
+        for group in groups:
+            self.add_group(group)
+        validate_rules(self.rules)
+
+    def add_layout(self, layout: Layout) -> None:
+        """Add a layout, names are unique per direction."""
+        key = (layout.direction, layout.name)
+        if key in self.layout_index:
+            raise ValueError(f"Layout {layout.name} already exists for {layout.direction.value} screens")
+        self.layouts.append(layout)
+        self.layout_index[key] = layout
+
+    def add_bar_height(self, bar_height: BarHeight) -> None:
+        """Add the bar heights of a screen, only one per screen."""
+        if bar_height.screen_name in self.bar_height_index:
+            raise ValueError(f"Bar height for screen {bar_height.screen_name} already exists")
+        self.bar_heights.append(bar_height)
+        self.bar_height_index[bar_height.screen_name] = bar_height
+
+    def add_profile(self, profile: Profile) -> None:
+        """Add a workspace profile, names are unique and every window needs a layout and a matcher."""
+        validate_profile(profile)
+        if profile.name in self.profile_index:
+            raise ValueError(f"Profile {profile.name} already exists")
+        self.profiles.append(profile)
+        self.profile_index[profile.name] = profile
+
+    def add_group(self, group: LayoutGroup) -> None:
+        """Add a layout group, names are unique."""
+        if group.name in self.group_index:
+            raise ValueError(f"Layout group {group.name} already exists")
+        self.groups.append(group)
+        self.group_index[group.name] = group
 
     def as_dict(self) -> dict:
-        return {
+        data = {
             "bar_heights": {b.screen_name: _bar_height_as_dict(b) for b in self.bar_heights},
             "layouts": {f"{layout.direction.value}_{layout.name}": _layout_as_dict(layout) for layout in self.layouts},
         }
+        if self.profiles:
+            data["profiles"] = {profile.name: _profile_as_dict(profile) for profile in self.profiles}
+        if self.groups:
+            data["groups"] = {group.name: _group_as_dict(group) for group in self.groups}
+        if self.rules:
+            data["rules"] = [_rule_as_dict(rule) for rule in self.rules]
+        return data
+
+    def get_layout(self, name: str, direction: Direction) -> Optional[Layout]:
+        """Return the layout with the given name for screens in the given direction."""
+        return self.layout_index.get((direction, name))
+
+    def get_bar_height(self, screen_name: str) -> Optional[BarHeight]:
+        """Return the bar heights of the given screen."""
+        return self.bar_height_index.get(screen_name)
+
+    def get_profile(self, name: str) -> Optional[Profile]:
+        """Return the workspace profile with the given name."""
+        return self.profile_index.get(name)
+
+    def get_group(self, name: str) -> Optional[LayoutGroup]:
+        """Return the layout group with the given name."""
+        return self.group_index.get(name)
 
     @staticmethod
     def from_dict(data: dict) -> "ConfigData":
@@ -28,6 +115,9 @@ class ConfigData:
         return ConfigData(
             bar_heights=[_bar_height_from_dict(b) for b in data["bar_heights"].values()],
             layouts=[_layout_from_dict(l) for l in data["layouts"].values()],
+            profiles=[_profile_from_dict(name, p) for name, p in data.get("profiles", {}).items()],
+            groups=[_group_from_dict(name, g) for name, g in data.get("groups", {}).items()],
+            rules=[_rule_from_dict(r) for r in data.get("rules", [])],
         )
 
 
@@ -69,6 +159,77 @@ def _layout_from_dict(data: dict) -> Layout:
     )
 
 
+def _profile_as_dict(profile: Profile) -> dict:
+    return {
+        "name": profile.name,
+        "windows": [_profile_window_as_dict(profile_window) for profile_window in profile.windows],
+    }
+
+
+def _profile_from_dict(name: str, data: dict) -> Profile:
+    return Profile(
+        name=data.get("name", name),
+        windows=[_profile_window_from_dict(w) for w in data.get("windows", [])],
+    )
+
+
+def _profile_window_as_dict(profile_window: ProfileWindow) -> dict:
+    data = {"layout": profile_window.layout}
+    if profile_window.window_class:
+        data["class"] = profile_window.window_class
+    if profile_window.title:
+        data["title"] = profile_window.title
+    if profile_window.screen_name:
+        data["screen"] = profile_window.screen_name
+    return data
+
+
+def _profile_window_from_dict(data: dict) -> ProfileWindow:
+    return ProfileWindow(
+        layout=data["layout"],
+        window_class=data.get("class"),
+        title=data.get("title"),
+        screen_name=data.get("screen"),
+    )
+
+
+def _group_as_dict(group: LayoutGroup) -> dict:
+    return {
+        "name": group.name,
+        "layouts": list(group.layouts),
+    }
+
+
+def _group_from_dict(name: str, data: dict) -> LayoutGroup:
+    return LayoutGroup(
+        name=data.get("name", name),
+        layouts=list(data.get("layouts", [])),
+    )
+
+
+def _rule_as_dict(rule: WindowRule) -> dict:
+    data = {"layout": rule.layout}
+    if rule.window_class:
+        data["class"] = rule.window_class
+    if rule.title:
+        data["title"] = rule.title
+    if rule.role:
+        data["role"] = rule.role
+    if rule.screen_name:
+        data["screen"] = rule.screen_name
+    return data
+
+
+def _rule_from_dict(data: dict) -> WindowRule:
+    return WindowRule(
+        layout=data["layout"],
+        window_class=data.get("class"),
+        title=data.get("title"),
+        role=data.get("role"),
+        screen_name=data.get("screen"),
+    )
+
+
 DEFAULT_CONFIG_PATH = os.path.expanduser("~/.config/winshift/config.toml")
 DEFAULT_CONFIG = ConfigData(
     bar_heights=[],
@@ -92,12 +253,120 @@ DEFAULT_CONFIG = ConfigData(
 )
 
 
+# bump when the cached data no longer matches what the current code expects
+CONFIG_CACHE_VERSION = 1
+# don't cache a config modified this recently, a later write within the same mtime tick would go unnoticed
+CONFIG_CACHE_MIN_AGE_NS = 2_000_000_000
+
+
+def _config_cache_path(config_path: str) -> str:
+    return os.path.splitext(config_path)[0] + ".cache"
+
+
+def _config_cache_key(config_path: str) -> Optional[Tuple[int, int, int, int]]:
+    """Return what identifies the current content of the config file, None if it doesn't exist."""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return (CONFIG_CACHE_VERSION, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _plain(data: Any) -> Any:
+    """Turn the dict and list subclasses returned by toml into plain ones, marshal only handles those."""
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_plain(value) for value in data]
+    return data
+
+
+def _store_config_cache(config_path: str, data: dict) -> None:
+    """
+    Store the parsed config next to the file, a failure to write only costs a parse next time.
+
+    Only the TOML parsing is skipped this way. marshal could store the compiled layouts too, but loading code objects
+    from the cache would run code that never went through validate_layout, and a command only compiles the layout it
+    applies. The Layout objects and the lookup indexes, which marshal can't store, are rebuilt from the plain data.
+    """
+    key = _config_cache_key(config_path)
+    if key is None:
+        return
+    cache_path = _config_cache_path(config_path)
+    try:
+        snapshot = marshal.dumps({"key": key, "data": data})
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        pass
+
+
+def _read_config_dict(config_path: str) -> dict:
+    """Return the parsed config file, reusing the marshal snapshot of the TOML stored next to it when unchanged."""
+    key = _config_cache_key(config_path)
+    if key is not None:
+        try:
+            with open(_config_cache_path(config_path), "rb") as f:
+                cached = marshal.load(f)
+            if cached["key"] == key:
+                return cached["data"]
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            pass
+
+    import toml  # pylint: disable=import-outside-toplevel
+
+    with open(config_path, encoding="utf-8") as f:
+        data = _plain(toml.load(f))
+
+    if key is not None and time.time_ns() - key[3] > CONFIG_CACHE_MIN_AGE_NS:
+        _store_config_cache(config_path, data)
+    return data
+
+
+@contextmanager
+def _config_lock(config_path: str) -> Iterator[None]:
+    """Hold an exclusive lock on the config file while reading, modifying and writing it."""
+    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    with open(f"{config_path}.lock", "w", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 def _write_config(config_path: str, config: ConfigData) -> None:
-    """Create the config file if it doesn't exist."""
-    if not os.path.exists(config_path):
-        os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    with open(config_path, "w", encoding="utf-8") as f:
-        toml.dump(config.as_dict(), f)
+    """Replace the config file atomically with a temporary file and a rename."""
+    import toml  # pylint: disable=import-outside-toplevel
+
+    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    tmp_path = f"{config_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            toml.dump(config.as_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, config_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _append_config(config_path: str, data: dict) -> None:
+    """Append new tables to the end of the config file without rewriting it."""
+    import toml  # pylint: disable=import-outside-toplevel
+
+    with open(config_path, "a+", encoding="utf-8") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+        f.write(toml.dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
 
 
 def _read_config(config_path: str) -> ConfigData:
@@ -107,37 +376,83 @@ def _read_config(config_path: str) -> ConfigData:
             bar_heights=[],
             layouts=[],
         )
-    with open(config_path, encoding="utf-8") as f:
-        return ConfigData.from_dict(toml.load(f))
+    return ConfigData.from_dict(_read_config_dict(config_path))
+
+
+@contextmanager
+def edit_config(config_path: str = DEFAULT_CONFIG_PATH) -> Iterator[ConfigData]:
+    """Read the config file under an exclusive lock and write it back atomically, once, if the block succeeds."""
+    with _config_lock(config_path):
+        config = _read_config(config_path)
+        yield config
+        _write_config(config_path, config)
+        _store_config_cache(config_path, _plain(config.as_dict()))
 
 
 def load_config() -> ConfigData:
     """Load the config file, user config overrides default."""
     config = _read_config(DEFAULT_CONFIG_PATH)
 
-    user_config_layouts = [l.name for l in config.layouts]
-    default_layouts = [l for l in DEFAULT_CONFIG.layouts if l.name not in user_config_layouts]
-    config.layouts.extend(default_layouts)
+    user_config_layouts = {l.name for l in config.layouts}
+    for default_layout in DEFAULT_CONFIG.layouts:
+        if default_layout.name not in user_config_layouts:
+            config.add_layout(default_layout)
 
-    user_config_bar_heights = [b.screen_name for b in config.bar_heights]
-    default_bar_heights = [b for b in DEFAULT_CONFIG.bar_heights if b.screen_name not in user_config_bar_heights]
-    config.bar_heights.extend(default_bar_heights)
+    for default_bar_height in DEFAULT_CONFIG.bar_heights:
+        if config.get_bar_height(default_bar_height.screen_name) is None:
+            config.add_bar_height(default_bar_height)
 
     return config
 
 
+def _add_config_entry(
+    config_path: str, section: str, key: str, value: dict, add_entry: Callable[[ConfigData], None]
+) -> None:
+    """Append one entry to the config file under the lock, add_entry raises if it already exists."""
+    with _config_lock(config_path):
+        data = _read_config_dict(config_path) if os.path.exists(config_path) else {}
+        add_entry(ConfigData.from_dict(data))
+        _append_config(config_path, {section: {key: value}})
+        data.setdefault(section, {})[key] = value
+        _store_config_cache(config_path, data)
+
+
 def add_layout(layout: Layout) -> None:
     """Add a new layout to the config file."""
     validate_layout_name(layout.name)
     validate_layout(layout.layout)
-    config = _read_config(DEFAULT_CONFIG_PATH)
-    config.layouts.append(layout)
-    _write_config(DEFAULT_CONFIG_PATH, config)
+    _add_config_entry(
+        DEFAULT_CONFIG_PATH,
+        "layouts",
+        f"{layout.direction.value}_{layout.name}",
+        _layout_as_dict(layout),
+        lambda config: config.add_layout(layout),
+    )
 
 
 def add_bar_height(bar_height: BarHeight) -> None:
     """Add a new bar height to the config file."""
     validate_bar_height(bar_height)
-    config = _read_config(DEFAULT_CONFIG_PATH)
-    config.bar_heights.append(bar_height)
-    _write_config(DEFAULT_CONFIG_PATH, config)
+    _add_config_entry(
+        DEFAULT_CONFIG_PATH,
+        "bar_heights",
+        bar_height.screen_name,
+        _bar_height_as_dict(bar_height),
+        lambda config: config.add_bar_height(bar_height),
+    )
+
+
+def import_layouts(layouts: List[Layout], skip_existing: bool = False) -> int:
+    """Add many layouts to the config file with a single atomic write, return how many were added."""
+    for layout in layouts:
+        validate_layout_name(layout.name)
+        validate_layout(layout.layout)
+
+    added = 0
+    with edit_config(DEFAULT_CONFIG_PATH) as config:
+        for layout in layouts:
+            if skip_existing and config.get_layout(layout.name, layout.direction) is not None:
+                continue
+            config.add_layout(layout)
+            added += 1
+    return added
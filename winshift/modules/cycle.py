@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from winshift.modules.config import ConfigData
+from winshift.modules.geometry import GeometryTable
+from winshift.modules.layout import LayoutGroup, calculate_layout_screen
+from winshift.modules.screen import ScreenData
+from winshift.modules.window import WindowData
+
+DEFAULT_CYCLE_STATE_PATH = os.path.expanduser("~/.cache/winshift/cycle.json")
+# presses further apart than this start the group over, unless the window is still at one of its layouts
+DEFAULT_CYCLE_EXPIRY = 2.0
+# expired states are dropped once there are more than this many windows
+MAX_CYCLE_STATES = 256
+
+Geometry = Tuple[int, int, int, int]
+
+
+@dataclass
+class CycleState:
+    group: str
+    screen: str
+    position: int
+    expires_at: float
+
+
+class LayoutCycler:
+    """
+    Picks the next layout of a group for a window, keeping the last position of every window it placed.
+
+    A press continues from the window's state while it hasn't expired. Otherwise the window's geometry is looked up
+    among the geometries of the group on its screen, computed once per geometry table, so a window still at one of
+    the group's layouts moves to the next one and any other window starts at the first. The state is kept in
+    memory by the daemon, and in a small JSON file between one-shot commands.
+    """
+
+    def __init__(self, state_path: Optional[str] = None, expiry: float = DEFAULT_CYCLE_EXPIRY):
+        self.state_path = state_path
+        self.expiry = expiry
+        self.states: Dict[str, CycleState] = _read_cycle_states(state_path) if state_path else {}
+        self._positions_table: Optional[GeometryTable] = None
+        self._positions: Dict[Tuple[str, str], Dict[Geometry, int]] = {}
+
+    def group_layouts(self, config: ConfigData, group: LayoutGroup, screen_data: ScreenData) -> List[str]:
+        """Return the layouts of the group which exist for the screen direction, in order."""
+        layouts = [name for name in group.layouts if config.get_layout(name, screen_data.direction)]
+        if not layouts:
+            raise RuntimeError(f"Layout group {group.name} has no layout for {screen_data.direction}")
+        return layouts
+
+    def next_layout(
+        self,
+        config: ConfigData,
+        group: LayoutGroup,
+        screen_data: ScreenData,
+        window_data: WindowData,
+        geometry: Optional[GeometryTable] = None,
+    ) -> str:
+        """Return the name of the layout to apply to the window and remember it."""
+        layouts = self.group_layouts(config, group, screen_data)
+        now = time.time()
+        state = self.states.get(window_data.name)
+        if state and state.group == group.name and state.screen == screen_data.name and state.expires_at > now:
+            position = state.position + 1
+        else:
+            positions = self._group_positions(config, group, screen_data, layouts, geometry)
+            current = positions.get((window_data.x, window_data.y, window_data.width, window_data.height))
+            position = current + 1 if current is not None else 0
+        position %= len(layouts)
+
+        if len(self.states) >= MAX_CYCLE_STATES:
+            self.states = {window: state for window, state in self.states.items() if state.expires_at > now}
+        self.states[window_data.name] = CycleState(group.name, screen_data.name, position, now + self.expiry)
+        if self.state_path:
+            _write_cycle_states(self.state_path, self.states, now)
+        return layouts[position]
+
+    def _group_positions(
+        self,
+        config: ConfigData,
+        group: LayoutGroup,
+        screen_data: ScreenData,
+        layouts: List[str],
+        geometry: Optional[GeometryTable],
+    ) -> Dict[Geometry, int]:
+        """Return the position in the group of each geometry the group's layouts give on the screen."""
+        if geometry is None or geometry is not self._positions_table:
+            self._positions_table = geometry
+            self._positions = {}
+        key = (screen_data.name, group.name)
+        if key not in self._positions:
+            positions: Dict[Geometry, int] = {}
+            for position, layout_name in enumerate(layouts):
+                calculated_layout = geometry.get(screen_data.name, layout_name) if geometry else None
+                if calculated_layout is None:
+                    layout = config.get_layout(layout_name, screen_data.direction)
+                    bar_height = config.get_bar_height(screen_data.name)
+                    calculated_layout = calculate_layout_screen(screen_data, layout, bar_height)
+                positions.setdefault(
+                    (
+                        int(calculated_layout.x),
+                        int(calculated_layout.y),
+                        int(calculated_layout.width),
+                        int(calculated_layout.height),
+                    ),
+                    position,
+                )
+            self._positions[key] = positions
+        return self._positions[key]
+
+
+def _read_cycle_states(state_path: str) -> Dict[str, CycleState]:
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return {window: CycleState(**state) for window, state in json.load(f).items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def _write_cycle_states(state_path: str, states: Dict[str, CycleState], now: float) -> None:
+    """Store the states which haven't expired yet, a failure to write only restarts the cycle."""
+    try:
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        tmp_path = f"{state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({window: asdict(state) for window, state in states.items() if state.expires_at > now}, f)
+        os.replace(tmp_path, state_path)
+    except OSError:
+        pass
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import TYPE_CHECKING, List, Optional
+
+from winshift.client import default_socket_path
+
+if TYPE_CHECKING:
+    from winshift.cli import AppCLI
+
+# commands the daemon accepts, everything else is refused so clients can't e.g. start another daemon
+DAEMON_COMMANDS = (
+    "change-layout",
+    "cycle-layout",
+    "move-to-screen",
+    "reproject-windows",
+    "tile",
+    "list-layouts",
+    "list-bar-heights",
+    "refresh-screens",
+    "restore-profile",
+    "dump-geometry",
+)
+RELOAD_COMMAND = "reload"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Read one JSON request line and answer with one JSON response line."""
+
+    server: "WinshiftDaemon"
+
+    def handle(self) -> None:
+        try:
+            argv = json.loads(self.rfile.readline())["argv"]
+            response = self.server.handle_command([str(arg) for arg in argv])
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"ok": False, "output": f"Invalid request: {e}\n"}
+        except Exception as e:  # pylint: disable=broad-except
+            # the client waits for a response line whatever went wrong
+            response = {"ok": False, "output": f"Request failed: {e}\n"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class WinshiftDaemon(socketserver.UnixStreamServer):
+    """Unix socket server keeping config, screens and compiled layouts of an AppCLI in memory."""
+
+    def __init__(self, app: "AppCLI", socket_path: str):
+        self.app = app
+        self.socket_path = socket_path
+        _remove_stale_socket(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def handle_command(self, argv: List[str]) -> dict:
+        """Run a command line against the in-memory app and return its output."""
+        if argv == [RELOAD_COMMAND]:
+            try:
+                self.app.reload()
+            except Exception as e:  # pylint: disable=broad-except
+                return {"ok": False, "output": f"Reload failed: {e}\n"}
+            return {"ok": True, "output": "Config and screens reloaded\n"}
+        if not argv or argv[0] not in DAEMON_COMMANDS:
+            return {"ok": False, "output": f"Unsupported command, expected one of {', '.join(DAEMON_COMMANDS)}\n"}
+
+        output = io.StringIO()
+        ok = True
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                with self.app.tracer.span(argv[0]):
+                    self.app.execute(self.app.parse_args(argv))
+            except SystemExit:
+                ok = False
+            except Exception as e:  # pylint: disable=broad-except
+                print(e)
+                ok = False
+        self.app.tracer.flush()
+        return {"ok": ok, "output": output.getvalue()}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a socket file left behind by a dead daemon, refuse to start if one is still running."""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"A winshift daemon is already listening on {socket_path}")
+
+
+def serve_daemon(app: "AppCLI", socket_path: Optional[str] = None) -> None:
+    """Serve requests until the process is interrupted or terminated."""
+    socket_path = socket_path or default_socket_path()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with WinshiftDaemon(app, socket_path) as daemon:
+        print(f"winshift daemon listening on {socket_path}")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,58 @@
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from winshift.modules.config import ConfigData
+from winshift.modules.direction import Direction
+from winshift.modules.layout import CalculatedLayout, Layout, calculate_layouts, compile_layout
+from winshift.modules.screen import ScreenData
+
+
+@dataclass
+class GeometryTable:
+    """
+    The calculated layout of every layout on every screen of its direction, for a config and a set of screens.
+
+    Layouts only depend on the screen geometry and bar heights, so once built a change-layout is a dict lookup.
+    The table remembers what it was built from, rebuild it when the config or the screens are replaced.
+    """
+
+    config: ConfigData
+    screens: List[ScreenData]
+    entries: Dict[Tuple[str, str], CalculatedLayout] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def build(config: ConfigData, screens: List[ScreenData]) -> "GeometryTable":
+        """Calculate every layout on every screen of its direction, invalid layouts are left out."""
+        table = GeometryTable(config, screens)
+        for direction in Direction:
+            direction_screens = [screen for screen in screens if screen.direction == direction]
+            layouts = [layout for layout in config.layouts if layout.direction == direction and _is_valid(layout)]
+            rows = calculate_layouts(direction_screens, layouts, config.bar_height_index)
+            for layout, row in zip(layouts, rows):
+                for screen, calculated_layout in zip(direction_screens, row):
+                    table.entries[(screen.name, layout.name)] = calculated_layout
+        return table
+
+    def is_current(self, config: ConfigData, screens: List[ScreenData]) -> bool:
+        """Return whether the table was built from this config and these screens."""
+        return self.config is config and self.screens is screens
+
+    def get(self, screen_name: str, layout_name: str) -> Optional[CalculatedLayout]:
+        """Return a copy of the calculated layout, None when the layout doesn't exist for the screen."""
+        calculated_layout = self.entries.get((screen_name, layout_name))
+        return replace(calculated_layout) if calculated_layout is not None else None
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Return the calculated layouts by screen name and layout name."""
+        geometry: Dict[str, Dict[str, Dict[str, int]]] = {screen.name: {} for screen in self.screens}
+        for (screen_name, layout_name), calculated_layout in self.entries.items():
+            geometry[screen_name][layout_name] = asdict(calculated_layout)
+        return geometry
+
+
+def _is_valid(layout: Layout) -> bool:
+    try:
+        compile_layout(layout.layout)
+    except ValueError:
+        return False
+    return True
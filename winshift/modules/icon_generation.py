@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from winshift.modules.layout import Layout, calculate_layout_screen
+from winshift.modules.raster import DEFAULT_COMPRESS_LEVEL, IconRasterizer, encode_png
+from winshift.modules.screen import ScreenData
+from winshift.modules.svg_icons import create_svg
+
+ICON_MANIFEST_NAME = ".winshift-icons.json"
+# bump when the rendering changes so existing icons are rendered again
+ICON_MANIFEST_VERSION = 1
+# below this many icons a process pool costs more than it saves
+PARALLEL_THRESHOLD = 16
+SPRITE_SHEET_NAME = "layouts"
+ICON_FORMATS = ("png", "svg")
+
+
+@dataclass(frozen=True)
+class IconStyle:
+    image_size: int
+    margin: int
+    screen_color: str
+    screen_border_color: str
+    screen_border_width: int
+    window_color: str
+    window_border_color: str
+    window_border_width: int
+    compress_level: int = DEFAULT_COMPRESS_LEVEL
+
+    def output_fields(self, icon_format: str = "png") -> dict:
+        """Return the fields the rendered file depends on, the zlib level only matters to PNGs."""
+        fields = asdict(self)
+        if icon_format != "png":
+            del fields["compress_level"]
+        return fields
+
+
+@dataclass(frozen=True)
+class IconJob:
+    file_name: str
+    screen_dims: Tuple[int, int]
+    window_dims: Tuple[int, int, int, int]
+
+    def content_hash(self, style: IconStyle) -> str:
+        """Return the hash of everything the rendered icon depends on."""
+        icon_format = os.path.splitext(self.file_name)[1][1:]
+        content = [ICON_MANIFEST_VERSION, self.screen_dims, self.window_dims, style.output_fields(icon_format)]
+        return hashlib.sha1(json.dumps(content).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+@dataclass
+class IconReport:
+    rendered: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    duration: float = 0
+
+
+def layout_icon_jobs(layouts: List[Layout], screen_data: ScreenData, icon_format: str = "png") -> List[IconJob]:
+    """Return the icon of every layout drawn on the given screen, rotated for layouts of the other direction."""
+    jobs = []
+    for layout in layouts:
+        rotated = layout.direction != screen_data.direction
+        layout_screen = ScreenData(
+            name="",
+            x=0,
+            y=0,
+            width=screen_data.height if rotated else screen_data.width,
+            height=screen_data.width if rotated else screen_data.height,
+            direction=layout.direction,
+        )
+        window = calculate_layout_screen(layout_screen, layout)
+        jobs.append(
+            IconJob(
+                file_name=f"{layout.direction.value}-{layout.name}.{icon_format}",
+                screen_dims=(layout_screen.width, layout_screen.height),
+                window_dims=(window.x, window.y, window.width, window.height),
+            )
+        )
+    return jobs
+
+
+def _read_manifest(output_dir_path: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir_path, ICON_MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(output_dir_path: str, manifest: Dict[str, str]) -> None:
+    manifest_path = os.path.join(output_dir_path, ICON_MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+# one per process, so the workers reuse their buffers across the icons they render
+_rasterizer: Optional[IconRasterizer] = None
+
+
+def _render_icon(job: IconJob, style: IconStyle, output_dir_path: str) -> None:
+    """Render one icon, run in the worker processes so Pillow is only imported there."""
+    global _rasterizer  # pylint: disable=global-statement
+    if _rasterizer is None:
+        _rasterizer = IconRasterizer()
+
+    buffer = _render_buffer(_rasterizer, job, style, style.image_size)
+    _rasterizer.encode(buffer, style.image_size, os.path.join(output_dir_path, job.file_name), style.compress_level)
+
+
+def _render_svg_icon(job: IconJob, style: IconStyle, output_dir_path: str) -> None:
+    create_svg(
+        image_size=style.image_size,
+        margin=style.margin,
+        screen_dims=job.screen_dims,
+        window_dims=job.window_dims,
+        output_path=os.path.join(output_dir_path, job.file_name),
+        screen_color=style.screen_color,
+        screen_border_color=style.screen_border_color,
+        screen_border_width=style.screen_border_width,
+        window_color=style.window_color,
+        window_border_color=style.window_border_color,
+        window_border_width=style.window_border_width,
+    )
+
+
+def _render_buffer(rasterizer: IconRasterizer, job: IconJob, style: IconStyle, image_size: int) -> bytearray:
+    return rasterizer.render(
+        image_size=image_size,
+        margin=style.margin,
+        screen_dims=job.screen_dims,
+        window_dims=job.window_dims,
+        screen_color=style.screen_color,
+        screen_border_color=style.screen_border_color,
+        screen_border_width=style.screen_border_width,
+        window_color=style.window_color,
+        window_border_color=style.window_border_color,
+        window_border_width=style.window_border_width,
+    )
+
+
+def generate_icons(
+    jobs: List[IconJob],
+    style: IconStyle,
+    output_dir_path: str,
+    workers: Optional[int] = None,
+    force: bool = False,
+    icon_format: str = "png",
+) -> IconReport:
+    """
+    Render the icons whose content changed since the last run, across a process pool when there are many PNGs.
+
+    SVGs are only a few lines of text each, they are always written from this process.
+    """
+    if icon_format not in ICON_FORMATS:
+        raise ValueError(f"Unknown icon format {icon_format}, expected one of {', '.join(ICON_FORMATS)}")
+    render = _render_svg_icon if icon_format == "svg" else _render_icon
+    start = time.perf_counter()
+    os.makedirs(output_dir_path, exist_ok=True)
+    manifest = {} if force else _read_manifest(output_dir_path)
+    report = IconReport()
+
+    pending = []
+    for job in jobs:
+        content_hash = job.content_hash(style)
+        if manifest.get(job.file_name) == content_hash and os.path.exists(os.path.join(output_dir_path, job.file_name)):
+            report.skipped.append(job.file_name)
+        else:
+            pending.append((job, content_hash))
+
+    try:
+        if workers == 1 or len(pending) < PARALLEL_THRESHOLD or icon_format == "svg":
+            for job, content_hash in pending:
+                render(job, style, output_dir_path)
+                manifest[job.file_name] = content_hash
+                report.rendered.append(job.file_name)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    (job, content_hash, executor.submit(render, job, style, output_dir_path))
+                    for job, content_hash in pending
+                ]
+                for job, content_hash, future in futures:
+                    future.result()
+                    manifest[job.file_name] = content_hash
+                    report.rendered.append(job.file_name)
+    finally:
+        _write_manifest(output_dir_path, manifest)
+
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def sprite_sheet_index(jobs: List[IconJob], sizes: List[int], image_name: str) -> Dict:
+    """
+    Return where every icon is placed on the sprite sheet.
+
+    Each size gets its own band of the sheet, the icons filling a square-ish grid of the same number of columns
+    in every band, so the sheet stays close to square whatever the number of layouts.
+    """
+    columns = max(1, math.ceil(math.sqrt(len(jobs))))
+    rows = math.ceil(len(jobs) / columns)
+    icons: Dict[str, Dict[str, Dict[str, int]]] = {os.path.splitext(job.file_name)[0]: {} for job in jobs}
+    y = 0
+    for size in sizes:
+        for position, job in enumerate(jobs):
+            row, column = divmod(position, columns)
+            icons[os.path.splitext(job.file_name)[0]][str(size)] = {
+                "x": column * size,
+                "y": y + row * size,
+                "width": size,
+                "height": size,
+            }
+        y += rows * size
+    return {
+        "image": image_name,
+        "width": columns * max(sizes, default=0),
+        "height": y,
+        "sizes": list(sizes),
+        "icons": icons,
+    }
+
+
+def generate_sprite_sheet(
+    jobs: List[IconJob],
+    style: IconStyle,
+    sizes: List[int],
+    output_dir_path: str,
+    name: str = SPRITE_SHEET_NAME,
+    force: bool = False,
+) -> IconReport:
+    """
+    Render every icon at every size into a single PNG plus a JSON index of the icon offsets.
+
+    The style image size is ignored in favour of the sizes. The sheet is skipped when neither the icons nor the
+    style changed since it was last rendered.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir_path, exist_ok=True)
+    image_name = f"{name}.png"
+    index_name = f"{name}.json"
+    manifest = {} if force else _read_manifest(output_dir_path)
+    report = IconReport()
+
+    style_fields = style.output_fields()
+    del style_fields["image_size"]
+    content = [
+        ICON_MANIFEST_VERSION,
+        list(sizes),
+        style_fields,
+        [(job.file_name, job.screen_dims, job.window_dims) for job in jobs],
+    ]
+    content_hash = hashlib.sha1(json.dumps(content).encode("utf-8"), usedforsecurity=False).hexdigest()
+    if (
+        manifest.get(image_name) == content_hash
+        and os.path.exists(os.path.join(output_dir_path, image_name))
+        and os.path.exists(os.path.join(output_dir_path, index_name))
+    ):
+        report.skipped.extend([image_name, index_name])
+        report.duration = time.perf_counter() - start
+        return report
+
+    index = sprite_sheet_index(jobs, sizes, image_name)
+    sheet_width = index["width"]
+    sheet = bytearray(sheet_width * index["height"] * 4)
+    rasterizer = IconRasterizer()
+    for size in sizes:
+        for job in jobs:
+            position = index["icons"][os.path.splitext(job.file_name)[0]][str(size)]
+            # copy the icon row by row, an icon drawn on its own buffer can't bleed into its neighbours
+            buffer = memoryview(_render_buffer(rasterizer, job, style, size))
+            row_length = size * 4
+            for row in range(size):
+                offset = ((position["y"] + row) * sheet_width + position["x"]) * 4
+                sheet[offset : offset + row_length] = buffer[row * row_length : (row + 1) * row_length]
+            buffer.release()
+    encode_png(sheet, (sheet_width, index["height"]), os.path.join(output_dir_path, image_name), style.compress_level)
+    with open(os.path.join(output_dir_path, index_name), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    manifest[image_name] = content_hash
+    _write_manifest(output_dir_path, manifest)
+    report.rendered.extend([image_name, index_name])
+    report.duration = time.perf_counter() - start
+    return report
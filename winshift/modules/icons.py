@@ -1,6 +1,8 @@
 from typing import Tuple
 from PIL import Image, ImageDraw
 
+from winshift.modules.raster import icon_rectangles
+
 
 def create_image(
     image_size: int,
@@ -18,6 +20,8 @@ def create_image(
     """
     Creates an image with two rectangles following specified conditions and saves it.
 
+    Icon generation draws the same pixels with raster.IconRasterizer, this stays as the reference renderer.
+
     :param image_size: Side length of the image
     :param margin: Margin around the image
     :param screen_dims: Dimensions of the screen rectangle (width, height)
@@ -32,46 +36,38 @@ def create_image(
     """
     # Create a new image with transparency
     img = Image.new("RGBA", (image_size, image_size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    # Adjust the image size for the margin
-    image_size_adjusted = image_size - 2 * margin
-
-    # Find the scale factor to fit the larger rectangle within the N x N image_size
-    scale_factor = min(image_size_adjusted / screen_dims[0], image_size_adjusted / screen_dims[1])
-
-    # Scale the dimensions of the rectangles
-    screen_dims = tuple(int(d * scale_factor) for d in screen_dims)
-    window_dims = (
-        int(window_dims[0] * scale_factor),
-        int(window_dims[1] * scale_factor),
-        int(window_dims[2] * scale_factor),
-        int(window_dims[3] * scale_factor),
-    )
-
-    # Draw the first rectangle centered
-    screen_x: float = margin + (image_size_adjusted - screen_dims[0]) // 2
-    screen_y: float = margin + (image_size_adjusted - screen_dims[1]) // 2
-    screen_width: float = screen_x + screen_dims[0]
-    screen_height: float = screen_y + screen_dims[1]
-    draw.rectangle(
-        (screen_x, screen_y, screen_width, screen_height),
-        outline=screen_border_color,
-        width=screen_border_width,
-        fill=screen_color,
-    )
-
-    # Draw the second rectangle with the offset added to the origin point and with a border
-    window_x: float = screen_x + window_dims[0]
-    window_y: float = screen_y + window_dims[1]
-    window_width: float = window_x + window_dims[2]
-    window_height: float = window_y + window_dims[3]
-    draw.rectangle(
-        (window_x, window_y, window_width, window_height),
-        outline=window_border_color,
-        width=window_border_width,
-        fill=window_color,
+    draw_icon(
+        ImageDraw.Draw(img),
+        image_size=image_size,
+        margin=margin,
+        screen_dims=screen_dims,
+        window_dims=window_dims,
+        screen_color=screen_color,
+        screen_border_color=screen_border_color,
+        screen_border_width=screen_border_width,
+        window_color=window_color,
+        window_border_color=window_border_color,
+        window_border_width=window_border_width,
     )
 
     # Save the image
     img.save(output_path, "PNG")
+
+
+def draw_icon(
+    draw: ImageDraw.ImageDraw,
+    image_size: int,
+    margin: int,
+    screen_dims: Tuple[int, int],
+    window_dims: Tuple[int, int, int, int],
+    screen_color: str,
+    screen_border_color: str,
+    screen_border_width: int,
+    window_color: str,
+    window_border_color: str,
+    window_border_width: int,
+) -> None:
+    """Draw the screen and window rectangles of an icon, see create_image for the parameters."""
+    screen, window = icon_rectangles(image_size, margin, screen_dims, window_dims)
+    draw.rectangle(screen, outline=screen_border_color, width=screen_border_width, fill=screen_color)
+    draw.rectangle(window, outline=window_border_color, width=window_border_width, fill=window_color)
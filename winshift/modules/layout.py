@@ -1,6 +1,8 @@
-from dataclasses import asdict, dataclass
-from typing import Dict, Optional
-from simpleeval import simple_eval
+import ast
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from winshift.modules.direction import Direction
 from winshift.modules.screen import ScreenData
@@ -13,7 +15,7 @@ class BarHeight:
     bottom: int
     left: int
     right: int
-    gap: int
+    gap: int = 0
 
 
 @dataclass
@@ -23,6 +25,14 @@ class Layout:
     direction: Direction
 
 
+@dataclass
+class LayoutGroup:
+    """Layout names cycled through in order by repeated cycle-layout commands."""
+
+    name: str
+    layouts: List[str] = field(default_factory=list)
+
+
 @dataclass
 class LayoutData:
     horizontal: Dict[str, str]
@@ -37,71 +47,213 @@ class CalculatedLayout:
     height: int
 
 
-def calculate_layout_screen(
-    screen_data: ScreenData, layout: Layout, bar_height: Optional[BarHeight] = None
-) -> CalculatedLayout:
-    """Return the calculated layout for the given screen."""
-    validate_layout(layout.layout)
-    screen_data_dict = asdict(screen_data)
+LAYOUT_VARIABLES = ("x", "y", "width", "height")
+LAYOUT_FUNCTIONS = {"int": int, "float": float}
 
-    calculated_layout = layout.layout.format(**screen_data_dict)
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.Tuple,
+    ast.Load,
+    ast.Constant,
+    ast.Name,
+    ast.Call,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.UAdd,
+    ast.USub,
+)
+# simpleeval accepted **, it stays available with a literal exponent small enough not to blow up
+_MAX_EXPONENT = 4
+_EVAL_GLOBALS = {"__builtins__": {}, **LAYOUT_FUNCTIONS}
+_INVALID_LAYOUT_MESSAGE = "Invalid layout format. int,int,int,int expected. {width} and {height} are available."
 
-    result = CalculatedLayout(*[simple_eval(value) for value in calculated_layout.split(",")])
 
-    # ensure to apply bar_height and screen offsets
-    bar_height = bar_height or BarHeight(top=0, bottom=0, left=0, right=0, gap=0, screen_name=screen_data.name)
+@dataclass(frozen=True)
+class CompiledLayout:
+    """A layout string parsed, validated and compiled into a function of the screen geometry."""
+
+    layout: str
+    function: Callable[[int, int, int, int], Tuple[int, int, int, int]]
+
+    def evaluate(self, x: int, y: int, width: int, height: int) -> Tuple[int, int, int, int]:
+        """Return the raw (x, y, width, height) values of the layout for the given screen geometry."""
+        return self.function(x, y, width, height)
+
+
+def _layout_source(layout: str) -> str:
+    """Turn the {placeholder} layout format into a plain python expression."""
+    source = []
+    for literal, placeholder, format_spec, conversion in Formatter().parse(layout):
+        source.append(literal)
+        if placeholder is None:
+            continue
+        if placeholder not in LAYOUT_VARIABLES or format_spec or conversion:
+            raise ValueError(f"Unknown layout placeholder {{{placeholder}}}")
+        source.append(placeholder)
+    return "".join(source)
+
+
+def _validate_node(node: ast.AST) -> None:
+    """Reject anything that is not plain arithmetic over the layout variables."""
+    for child in ast.walk(node):
+        if not isinstance(child, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression {type(child).__name__}")
+        if isinstance(child, ast.Constant) and (
+            isinstance(child.value, bool) or not isinstance(child.value, (int, float))
+        ):
+            raise ValueError(f"Unsupported constant {child.value!r}")
+        if isinstance(child, ast.Name) and child.id not in LAYOUT_VARIABLES and child.id not in LAYOUT_FUNCTIONS:
+            raise ValueError(f"Unknown name {child.id}")
+        if isinstance(child, ast.Call) and (
+            not isinstance(child.func, ast.Name)
+            or child.func.id not in LAYOUT_FUNCTIONS
+            or len(child.args) != 1
+            or child.keywords
+        ):
+            raise ValueError("Only int(value) and float(value) calls are supported")
+        if isinstance(child, ast.BinOp) and isinstance(child.op, ast.Pow) and not _is_small_exponent(child.right):
+            raise ValueError(f"Only integer exponents between 0 and {_MAX_EXPONENT} are supported")
+
+
+def _is_small_exponent(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, int)
+        and not isinstance(node.value, bool)
+        and 0 <= node.value <= _MAX_EXPONENT
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_layout(layout: str) -> CompiledLayout:
+    """Return the compiled layout, each distinct layout string is only parsed once."""
+    try:
+        tree = ast.parse(_layout_source(layout), mode="eval")
+        if not isinstance(tree.body, ast.Tuple) or len(tree.body.elts) != 4:
+            raise ValueError("Exactly four values expected")
+        _validate_node(tree)
+        # lambda x, y, width, height: (...), so evaluating it doesn't build a locals dict every time
+        function = ast.Expression(
+            body=ast.Lambda(
+                args=ast.arguments(
+                    posonlyargs=[],
+                    args=[ast.arg(arg=name) for name in LAYOUT_VARIABLES],
+                    kwonlyargs=[],
+                    kw_defaults=[],
+                    defaults=[],
+                ),
+                body=tree.body,
+            )
+        )
+        ast.fix_missing_locations(function)
+        compiled = CompiledLayout(
+            layout=layout, function=eval(compile(function, "<layout>", "eval"), _EVAL_GLOBALS)  # nosec
+        )
+        # evaluate once with dummy dimensions to catch errors like divisions by zero early
+        compiled.evaluate(0, 0, 1920, 1080)
+    except Exception as exc:
+        raise ValueError(_INVALID_LAYOUT_MESSAGE) from exc
+    return compiled
+
+
+@lru_cache(maxsize=4096)
+def _calculate_layout(
+    layout: str, screen: Tuple[int, int, int, int], bar_height: Tuple[int, int, int, int, int]
+) -> Tuple[int, int, int, int]:
+    """Return the calculated layout values for a screen geometry and bar heights as plain tuples."""
+    return _fit_layout(compile_layout(layout).evaluate(*screen), screen, bar_height)
+
+
+def _fit_layout(
+    values: Tuple[int, int, int, int], screen: Tuple[int, int, int, int], bar_height: Tuple[int, int, int, int, int]
+) -> Tuple[int, int, int, int]:
+    """Clamp the raw layout values to the screen minus its bars, apply the gap and the screen offsets."""
+    x, y, width, height = values
+    screen_x, screen_y, screen_width, screen_height = screen
+    top, bottom, left, right, gap = bar_height
 
     # calculate if the result goes beyond the established limits for each side of the screen
     # otherwise we use the gap
-    if result.x < bar_height.left:
-        diff = bar_height.left - result.x
-        result.x += diff
+    if x < left:
+        x += left - x
     else:
-        result.x += bar_height.gap
-    if result.y < bar_height.top:
-        diff = bar_height.top - result.y
-        result.y += diff
+        x += gap
+    if y < top:
+        y += top - y
     else:
-        result.y += bar_height.gap
+        y += gap
 
-    if result.x + result.width > screen_data.width - bar_height.right:
-        diff = (result.x + result.width) - (screen_data.width - bar_height.right)
-        result.width -= diff
+    if x + width > screen_width - right:
+        width -= (x + width) - (screen_width - right)
     else:
-        result.width -= bar_height.gap
+        width -= gap
 
-    if result.y + result.height > screen_data.height - bar_height.bottom:
-        diff = (result.y + result.height) - (screen_data.height - bar_height.bottom)
-        result.height -= diff
+    if y + height > screen_height - bottom:
+        height -= (y + height) - (screen_height - bottom)
     else:
-        result.height -= bar_height.gap
+        height -= gap
 
     # always apply screen offsets
-    result.x += screen_data.x
-    result.y += screen_data.y
+    return x + screen_x, y + screen_y, width, height
 
-    return result
+
+def calculate_layout_screen(
+    screen_data: ScreenData, layout: Layout, bar_height: Optional[BarHeight] = None
+) -> CalculatedLayout:
+    """Return the calculated layout for the given screen."""
+    # ensure to apply bar_height and screen offsets
+    bar_height = bar_height or BarHeight(top=0, bottom=0, left=0, right=0, gap=0, screen_name=screen_data.name)
+
+    return CalculatedLayout(
+        *_calculate_layout(
+            layout.layout,
+            (screen_data.x, screen_data.y, screen_data.width, screen_data.height),
+            (bar_height.top, bar_height.bottom, bar_height.left, bar_height.right, bar_height.gap),
+        )
+    )
+
+
+def calculate_layouts(
+    screens: Sequence[ScreenData],
+    layouts: Sequence[Layout],
+    bar_heights: Optional[Mapping[str, BarHeight]] = None,
+) -> List[List[CalculatedLayout]]:
+    """
+    Return the calculated layout of every layout on every screen, one row per layout and one column per screen.
+
+    Same results as calculate_layout_screen in a double loop, without its per call overhead or filling its cache:
+    each layout is compiled once and evaluated over the columns of screen geometries and bar heights, which are
+    built once for all layouts. Bar heights are looked up by screen name, screens without one have no bars.
+    """
+    bar_heights = bar_heights or {}
+    columns = [(screen.x, screen.y, screen.width, screen.height) for screen in screens]
+    bar_columns = []
+    for screen in screens:
+        bar_height = bar_heights.get(screen.name)
+        bar_columns.append(
+            (bar_height.top, bar_height.bottom, bar_height.left, bar_height.right, bar_height.gap)
+            if bar_height
+            else (0, 0, 0, 0, 0)
+        )
+    xs, ys, widths, heights = zip(*columns) if columns else ((), (), (), ())
+
+    rows = []
+    for layout in layouts:
+        values = map(compile_layout(layout.layout).function, xs, ys, widths, heights)
+        rows.append([CalculatedLayout(*fitted) for fitted in map(_fit_layout, values, columns, bar_columns)])
+    return rows
 
 
 def validate_layout(layout: str) -> None:
-    """Return True if the layout is valid int,int,int,int str format"""
-    try:
-        x, y, width, height = layout.format(
-            **{
-                "x": 0,
-                "y": 0,
-                "width": 1920,
-                "height": 1080,
-            }
-        ).split(",")
-        simple_eval(x)
-        simple_eval(y)
-        simple_eval(width)
-        simple_eval(height)
-    except Exception as exc:
-        raise ValueError(
-            "Invalid layout format. int,int,int,int expected. {width} and {height} are available."
-        ) from exc
+    """Raise ValueError if the layout is not a valid int,int,int,int str format"""
+    compile_layout(layout)
 
 
 def validate_layout_name(layout_name: str) -> None:
@@ -0,0 +1,169 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.config import ConfigData
+from winshift.modules.geometry import GeometryTable
+from winshift.modules.layout import BarHeight, CalculatedLayout, Layout, calculate_layout_screen
+from winshift.modules.profile import Profile, ProfileMatcher, ProfileWindow
+from winshift.modules.screen import ScreenData, ScreenIndex
+from winshift.modules.window import ClientWindow, WindowData
+
+ACTIVE_WINDOW = "active"
+
+
+@dataclass
+class Placement:
+    screen: ScreenData
+    layout: Layout
+    bar_height: Optional[BarHeight]
+    calculated_layout: CalculatedLayout
+
+
+@dataclass
+class PlanEntry:
+    window: str
+    layout_name: str
+    screen_name: Optional[str] = None
+
+
+@dataclass
+class PlanResult:
+    entry: PlanEntry
+    duration: float
+    calculated_layout: Optional[CalculatedLayout] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RestoredWindow:
+    window: ClientWindow
+    profile_window: ProfileWindow
+    calculated_layout: Optional[CalculatedLayout] = None
+    error: Optional[str] = None
+
+
+def resolve_placement(
+    config: ConfigData,
+    screen_index: ScreenIndex,
+    window_data: WindowData,
+    layout_name: str,
+    screen_name: Optional[str] = None,
+    geometry: Optional[GeometryTable] = None,
+) -> Placement:
+    """
+    Return where the layout puts the window, on the given screen or the one the window is on.
+
+    The calculated layout is looked up in the geometry table when one is given, and calculated otherwise.
+    """
+    if screen_name:
+        target_screen = screen_index.get(screen_name)
+    else:
+        target_screen = screen_index.locate(window_data.x, window_data.y)
+
+    if target_screen is None:
+        raise RuntimeError(f"Screen {screen_name} not found")
+
+    layout = config.get_layout(layout_name, target_screen.direction)
+    if not layout:
+        raise RuntimeError(f"Layout {layout_name} not found for {target_screen.direction}")
+
+    bar_height = config.get_bar_height(target_screen.name)
+    calculated_layout = geometry.get(target_screen.name, layout.name) if geometry else None
+    if calculated_layout is None:
+        calculated_layout = calculate_layout_screen(target_screen, layout, bar_height)
+    return Placement(target_screen, layout, bar_height, calculated_layout)
+
+
+def parse_plan(text: str) -> List[PlanEntry]:
+    """Parse a plan: a JSON list of {"window", "layout", "screen"} objects or "window layout [screen]" lines.
+
+    window is a window id or "active", lines starting with # are ignored.
+    """
+    if text.lstrip().startswith("["):
+        return [
+            PlanEntry(window=str(item["window"]), layout_name=item["layout"], screen_name=item.get("screen"))
+            for item in json.loads(text)
+        ]
+
+    entries = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        if len(fields) not in (2, 3):
+            raise ValueError(f"Invalid plan line {line_number}, expected: window layout [screen]")
+        entries.append(PlanEntry(*fields))
+    return entries
+
+
+def apply_plan(
+    backend: DisplayBackend,
+    config: ConfigData,
+    screen_index: ScreenIndex,
+    entries: List[PlanEntry],
+    dry_run: bool = False,
+) -> List[PlanResult]:
+    """
+    Apply every entry of the plan with the same backend session, failures don't stop the remaining entries.
+
+    Every entry is resolved first, then the windows are moved in one batch. The duration of an entry is the time
+    spent resolving it.
+    """
+    results = []
+    moves: List[Tuple[WindowData, CalculatedLayout]] = []
+    active_window: Optional[WindowData] = None
+    for entry in entries:
+        start = time.perf_counter()
+        try:
+            if entry.window == ACTIVE_WINDOW:
+                active_window = active_window or backend.get_active_window_data()
+                window_data = active_window
+            else:
+                window_data = backend.get_window_data(entry.window)
+            placement = resolve_placement(config, screen_index, window_data, entry.layout_name, entry.screen_name)
+            moves.append((window_data, placement.calculated_layout))
+            results.append(PlanResult(entry, time.perf_counter() - start, placement.calculated_layout))
+        except Exception as e:  # pylint: disable=broad-except
+            results.append(PlanResult(entry, time.perf_counter() - start, error=str(e)))
+
+    if not dry_run and moves:
+        try:
+            backend.move_resize_windows(moves)
+        except Exception as e:  # pylint: disable=broad-except
+            for result in results:
+                if result.error is None:
+                    result.error = str(e)
+    return results
+
+
+def restore_profile(
+    backend: DisplayBackend,
+    config: ConfigData,
+    screen_index: ScreenIndex,
+    profile: Profile,
+    dry_run: bool = False,
+) -> List[RestoredWindow]:
+    """Place every client window matched by the profile, listing the windows once and moving them in one batch."""
+    matcher = ProfileMatcher(profile)
+    restored = []
+    moves: List[Tuple[WindowData, CalculatedLayout]] = []
+    for window in backend.list_client_windows():
+        profile_window = matcher.match(window)
+        if profile_window is None:
+            continue
+        try:
+            placement = resolve_placement(
+                config, screen_index, window, profile_window.layout, profile_window.screen_name
+            )
+        except RuntimeError as e:
+            restored.append(RestoredWindow(window, profile_window, error=str(e)))
+            continue
+        restored.append(RestoredWindow(window, profile_window, placement.calculated_layout))
+        moves.append((window, placement.calculated_layout))
+
+    if not dry_run:
+        backend.move_resize_windows(moves)
+    return restored
@@ -0,0 +1,58 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Pattern, Tuple
+
+from winshift.modules.window import ClientWindow
+
+
+@dataclass
+class ProfileWindow:
+    layout: str
+    window_class: Optional[str] = None
+    title: Optional[str] = None
+    screen_name: Optional[str] = None
+
+
+@dataclass
+class Profile:
+    name: str
+    windows: List[ProfileWindow] = field(default_factory=list)
+
+
+class ProfileMatcher:
+    """The window rules of a profile with their regular expressions compiled once."""
+
+    def __init__(self, profile: Profile):
+        self.rules: List[Tuple[Optional[Pattern], Optional[Pattern], ProfileWindow]] = []
+        for profile_window in profile.windows:
+            try:
+                self.rules.append(
+                    (
+                        re.compile(profile_window.window_class) if profile_window.window_class else None,
+                        re.compile(profile_window.title) if profile_window.title else None,
+                        profile_window,
+                    )
+                )
+            except re.error as exc:
+                raise ValueError(f"Invalid window matcher in profile {profile.name}: {exc}") from exc
+
+    def match(self, window: ClientWindow) -> Optional[ProfileWindow]:
+        """Return the first rule matching the window class and title."""
+        for class_pattern, title_pattern, profile_window in self.rules:
+            if class_pattern and not class_pattern.search(window.window_class):
+                continue
+            if title_pattern and not title_pattern.search(window.title):
+                continue
+            return profile_window
+        return None
+
+
+def validate_profile(profile: Profile) -> None:
+    if profile.name == "" or profile.name is None:
+        raise ValueError("profile name must not be empty")
+    for profile_window in profile.windows:
+        if not profile_window.layout:
+            raise ValueError(f"every window of profile {profile.name} needs a layout")
+        if not profile_window.window_class and not profile_window.title:
+            raise ValueError(f"every window of profile {profile.name} needs a class or a title to match")
+    ProfileMatcher(profile)
@@ -0,0 +1,161 @@
+import struct
+import zlib
+from typing import Dict, Tuple
+
+# (x0, y0, x1, y1) with both corners inside the rectangle, as Pillow draws them
+Rectangle = Tuple[int, int, int, int]
+
+# zlib level used by Pillow when saving a PNG
+DEFAULT_COMPRESS_LEVEL = 6
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def icon_rectangles(
+    image_size: int,
+    margin: int,
+    screen_dims: Tuple[int, int],
+    window_dims: Tuple[int, int, int, int],
+) -> Tuple[Rectangle, Rectangle]:
+    """Return the screen and window rectangles of an icon, see icons.create_image for the parameters."""
+    # Adjust the image size for the margin
+    image_size_adjusted = image_size - 2 * margin
+
+    # Find the scale factor to fit the larger rectangle within the N x N image_size
+    scale_factor = min(image_size_adjusted / screen_dims[0], image_size_adjusted / screen_dims[1])
+
+    # Scale the dimensions of the rectangles
+    screen_width, screen_height = (int(d * scale_factor) for d in screen_dims)
+    window_x, window_y, window_width, window_height = (int(d * scale_factor) for d in window_dims)
+
+    # The screen is centered, the window offset from the screen origin
+    screen_x = margin + (image_size_adjusted - screen_width) // 2
+    screen_y = margin + (image_size_adjusted - screen_height) // 2
+    window_x += screen_x
+    window_y += screen_y
+    return (
+        (screen_x, screen_y, screen_x + screen_width, screen_y + screen_height),
+        (window_x, window_y, window_x + window_width, window_y + window_height),
+    )
+
+
+class IconRasterizer:
+    """
+    Draws icons into reusable RGBA buffers, one per image size, and saves them as PNG without Pillow.
+
+    The rectangles follow Pillow's ImageDraw.rectangle pixel for pixel: corners are inclusive, the fill is
+    clipped to the image and the outline is drawn as nested one pixel rectangles, only when its width isn't
+    zero and its color differs from the fill.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: Dict[int, Tuple[bytearray, bytes]] = {}
+        self._inks: Dict[str, bytes] = {}
+
+    def ink(self, color: str) -> bytes:
+        """Return the RGBA bytes of a color, Pillow is only imported for the color names."""
+        ink = self._inks.get(color)
+        if ink is None:
+            ink = self._inks[color] = _parse_color(color)
+        return ink
+
+    def render(
+        self,
+        image_size: int,
+        margin: int,
+        screen_dims: Tuple[int, int],
+        window_dims: Tuple[int, int, int, int],
+        screen_color: str,
+        screen_border_color: str,
+        screen_border_width: int,
+        window_color: str,
+        window_border_color: str,
+        window_border_width: int,
+    ) -> bytearray:
+        """
+        Draw an icon and return its RGBA buffer.
+
+        The buffer is reused by the next icon of the same size, copy it to keep it.
+        """
+        if image_size not in self._buffers:
+            blank = bytes(image_size * image_size * 4)
+            self._buffers[image_size] = (bytearray(blank), blank)
+        buffer, blank = self._buffers[image_size]
+        buffer[:] = blank
+
+        screen, window = icon_rectangles(image_size, margin, screen_dims, window_dims)
+        self._rectangle(
+            buffer, image_size, screen, self.ink(screen_color), self.ink(screen_border_color), screen_border_width
+        )
+        self._rectangle(
+            buffer, image_size, window, self.ink(window_color), self.ink(window_border_color), window_border_width
+        )
+        return buffer
+
+    def encode(
+        self, buffer: bytearray, image_size: int, output_path: str, compress_level: int = DEFAULT_COMPRESS_LEVEL
+    ) -> None:
+        """Save an RGBA buffer as a PNG."""
+        encode_png(buffer, (image_size, image_size), output_path, compress_level)
+
+    @staticmethod
+    def _rectangle(
+        buffer: bytearray, image_size: int, rectangle: Rectangle, fill: bytes, outline: bytes, width: int
+    ) -> None:
+        x0, y0, x1, y1 = rectangle
+        _fill_rows(buffer, image_size, x0, x1, range(y0, y1 + 1), fill)
+        if outline == fill or width == 0:
+            return
+        # Pillow draws the sides as lines from y0 + width to y1 - width + 1, leaving out their end, even once they
+        # cross on thick outlines and go up
+        start, end = y0 + width, y1 - width + 1
+        sides = range(start, end) if start <= end else range(end + 1, start + 1)
+        for i in range(width):
+            _fill_rows(buffer, image_size, x0, x1, (y0 + i, y1 - i), outline)
+            _fill_rows(buffer, image_size, x1 - i, x1 - i, sides, outline)
+            _fill_rows(buffer, image_size, x0 + i, x0 + i, sides, outline)
+
+
+def _parse_color(color: str) -> bytes:
+    digits = color[1:]
+    if color.startswith("#") and len(digits) in (3, 4, 6, 8):
+        try:
+            if len(digits) in (3, 4):
+                digits = "".join(digit * 2 for digit in digits)
+            return bytes.fromhex(digits if len(digits) == 8 else f"{digits}ff")
+        except ValueError:
+            pass
+    from PIL import ImageColor  # pylint: disable=import-outside-toplevel
+
+    return bytes(ImageColor.getcolor(color, "RGBA"))
+
+
+def _fill_rows(buffer: bytearray, image_size: int, x0: int, x1: int, rows, ink: bytes) -> None:
+    """Paint columns x0 to x1 of the given rows, clipped to the image."""
+    x0, x1 = max(x0, 0), min(x1, image_size - 1)
+    if x0 > x1:
+        return
+    span = ink * (x1 - x0 + 1)
+    for y in rows:
+        if 0 <= y < image_size:
+            start = (y * image_size + x0) * 4
+            buffer[start : start + len(span)] = span
+
+
+def encode_png(
+    buffer: bytearray, dims: Tuple[int, int], output_path: str, compress_level: int = DEFAULT_COMPRESS_LEVEL
+) -> None:
+    """Save an RGBA buffer as a PNG, every row unfiltered: the icons are flat colors zlib packs well as is."""
+    width, height = dims
+    stride = width * 4
+    view = memoryview(buffer)
+    raw = b"".join(b"\x00" + view[row * stride : (row + 1) * stride] for row in range(height))
+    view.release()
+    with open(output_path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(raw, compress_level)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
@@ -0,0 +1,118 @@
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from winshift.modules.layout import BarHeight, CalculatedLayout
+from winshift.modules.screen import ScreenData, ScreenIndex
+from winshift.modules.window import WindowData
+
+Area = Tuple[int, int, int, int]
+
+
+def screen_areas(screen_data: ScreenData, bar_height: Optional[BarHeight] = None) -> Tuple[Area, Area]:
+    """
+    Return the areas windows are placed in on the screen, as (x, y, width, height) in root window coordinates.
+
+    The first one is the screen minus its bars, windows are kept inside it. The second one is further inset by the
+    gap on each side, window geometries are expressed relative to it so gaps are kept from screen to screen.
+    """
+    top, bottom, left, right, gap = (
+        (bar_height.top, bar_height.bottom, bar_height.left, bar_height.right, bar_height.gap)
+        if bar_height
+        else (0, 0, 0, 0, 0)
+    )
+    usable = (
+        screen_data.x + left,
+        screen_data.y + top,
+        max(screen_data.width - left - right, 1),
+        max(screen_data.height - top - bottom, 1),
+    )
+    inner = (
+        usable[0] + gap,
+        usable[1] + gap,
+        usable[2] - 2 * gap if usable[2] > 2 * gap else usable[2],
+        usable[3] - 2 * gap if usable[3] > 2 * gap else usable[3],
+    )
+    return usable, inner
+
+
+class ScreenProjection:
+    """Maps window geometries from one screen to another, the scales and offsets worked out once for the pair."""
+
+    def __init__(
+        self,
+        source: ScreenData,
+        target: ScreenData,
+        source_bar_height: Optional[BarHeight] = None,
+        target_bar_height: Optional[BarHeight] = None,
+    ):
+        self.source = source
+        self.target = target
+        _, (self.source_x, self.source_y, source_width, source_height) = screen_areas(source, source_bar_height)
+        usable, inner = screen_areas(target, target_bar_height)
+        self.usable_x, self.usable_y, self.usable_width, self.usable_height = usable
+        self.target_x, self.target_y, target_width, target_height = inner
+        self.scale_x = target_width / source_width
+        self.scale_y = target_height / source_height
+
+    def project(self, window_data: WindowData) -> CalculatedLayout:
+        """Return the geometry of the window on the target screen, kept inside the target bars."""
+        width = min(round(window_data.width * self.scale_x), self.usable_width)
+        height = min(round(window_data.height * self.scale_y), self.usable_height)
+        x = self.target_x + round((window_data.x - self.source_x) * self.scale_x)
+        y = self.target_y + round((window_data.y - self.source_y) * self.scale_y)
+        x = max(min(x, self.usable_x + self.usable_width - width), self.usable_x)
+        y = max(min(y, self.usable_y + self.usable_height - height), self.usable_y)
+        return CalculatedLayout(x, y, width, height)
+
+
+def reproject_window(
+    window_data: WindowData,
+    source: ScreenData,
+    target: ScreenData,
+    source_bar_height: Optional[BarHeight] = None,
+    target_bar_height: Optional[BarHeight] = None,
+) -> CalculatedLayout:
+    """
+    Return the geometry of the window moved from the source screen to the target one, proportionally.
+
+    The window keeps its position and size relative to the area between the bars and gaps of each screen, so a
+    window covering the left half of a screen covers the left half of the other one whatever their resolutions.
+    """
+    return ScreenProjection(source, target, source_bar_height, target_bar_height).project(window_data)
+
+
+def reproject_windows(
+    windows: Sequence[WindowData],
+    old_screens: List[ScreenData],
+    new_screens: List[ScreenData],
+    bar_heights: Optional[Mapping[str, BarHeight]] = None,
+) -> List[Tuple[WindowData, CalculatedLayout]]:
+    """
+    Return the moves bringing the windows of screens which went away or changed back onto the current screens.
+
+    Each window belongs to the old screen containing its center. Windows of a screen still there with the same
+    geometry are left alone. The others are reprojected onto the screen of the same name when it was only resized,
+    otherwise onto the current screen closest to the center of the one they were on. Projections are built once
+    per old screen, the moves are meant for a single move_resize_windows call.
+    """
+    bar_heights = bar_heights or {}
+    old_index = ScreenIndex(old_screens)
+    new_index = ScreenIndex(new_screens)
+    projections: Dict[str, Optional[ScreenProjection]] = {}
+    moves = []
+    for window_data in windows:
+        source = old_index.locate(window_data.x + window_data.width // 2, window_data.y + window_data.height // 2)
+        if source is None:
+            continue
+        if source.name not in projections:
+            target = new_index.get(source.name) or new_index.nearest(
+                source.x + source.width // 2, source.y + source.height // 2
+            )
+            projections[source.name] = (
+                ScreenProjection(source, target, bar_heights.get(source.name), bar_heights.get(target.name))
+                if target is not None and target != source
+                else None
+            )
+        projection = projections[source.name]
+        if projection is not None:
+            moves.append((window_data, projection.project(window_data)))
+    return moves
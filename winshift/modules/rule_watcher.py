@@ -0,0 +1,123 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.config import ConfigData
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.placement import resolve_placement
+from winshift.modules.rules import DEFAULT_POLL_INTERVAL, RuleMatcher, WindowRule
+from winshift.modules.screen_cache import ScreenCache
+from winshift.modules.window import ClientWindow, WindowData
+
+
+@dataclass
+class RuledWindow:
+    window: ClientWindow
+    rule: WindowRule
+    calculated_layout: Optional[CalculatedLayout] = None
+    error: Optional[str] = None
+
+
+class RuleWatcher:
+    """
+    Places every new client window with the layout of the first rule matching it.
+
+    The window manager's client list is listened to on the backend connection from an asyncio loop, or polled when
+    the backend can't notify changes. Notifications are coalesced: whatever the number of windows created since the
+    last pass, e.g. at login, the next pass lists the client window ids once, queries and matches only the new
+    windows and moves them all in one batch.
+    """
+
+    def __init__(
+        self,
+        backend: DisplayBackend,
+        config: ConfigData,
+        screen_cache: ScreenCache,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        dry_run: bool = False,
+        on_placed: Optional[Callable[[List[RuledWindow]], None]] = None,
+    ):
+        self.backend = backend
+        self.config = config
+        self.screen_cache = screen_cache
+        self.matcher = RuleMatcher(config.rules)
+        self.poll_interval = poll_interval
+        self.dry_run = dry_run
+        self.on_placed = on_placed
+        self.known_windows: Set[str] = set()
+
+    def new_window_ids(self, window_ids: Sequence[str]) -> List[str]:
+        """Return the ids not seen by a previous pass, forgetting the closed windows."""
+        new_ids = [window_id for window_id in window_ids if window_id not in self.known_windows]
+        self.known_windows = set(window_ids)
+        return new_ids
+
+    def place_windows(self, windows: List[ClientWindow]) -> List[RuledWindow]:
+        """Place the windows matching a rule, moving them in one batch."""
+        if not windows:
+            return []
+
+        screen_index = self.screen_cache.get_screen_index()
+        placed = []
+        moves: List[Tuple[WindowData, CalculatedLayout]] = []
+        for window in windows:
+            rule = self.matcher.match(window)
+            if rule is None:
+                continue
+            try:
+                placement = resolve_placement(self.config, screen_index, window, rule.layout, rule.screen_name)
+            except RuntimeError as e:
+                placed.append(RuledWindow(window, rule, error=str(e)))
+                continue
+            placed.append(RuledWindow(window, rule, placement.calculated_layout))
+            moves.append((window, placement.calculated_layout))
+
+        if moves and not self.dry_run:
+            self.backend.move_resize_windows(moves)
+        if placed and self.on_placed is not None:
+            self.on_placed(placed)
+        return placed
+
+    async def run(self, place_existing: bool = False) -> None:
+        """Watch the client list until cancelled, also placing the windows already open with place_existing."""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        fileno = self.backend.watch_client_list()
+        polled = fileno is None
+        if fileno is not None:
+            loop.add_reader(fileno, self._on_readable, changed)
+        try:
+            window_ids = self.new_window_ids(await self._call(polled, self.backend.list_client_window_ids))
+            if place_existing:
+                self.place_windows(await self._call(polled, self.backend.get_client_windows, window_ids))
+            while True:
+                if polled:
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    await changed.wait()
+                    changed.clear()
+                await self._place_new_windows(polled)
+                # the replies read while listing may have queued notifications the file descriptor won't signal
+                if not polled and self.backend.client_list_changed():
+                    changed.set()
+        finally:
+            if fileno is not None:
+                loop.remove_reader(fileno)
+
+    def _on_readable(self, changed: asyncio.Event) -> None:
+        if self.backend.client_list_changed():
+            changed.set()
+
+    async def _place_new_windows(self, polled: bool) -> None:
+        # only the new windows are queried, a burst of windows at login doesn't query every open window each time
+        new_ids = self.new_window_ids(await self._call(polled, self.backend.list_client_window_ids))
+        if new_ids:
+            self.place_windows(await self._call(polled, self.backend.get_client_windows, new_ids))
+
+    @staticmethod
+    async def _call(polled: bool, function: Callable[..., Any], *args: Any) -> Any:
+        if polled:
+            # e.g. wmctrl, run without blocking the loop; a notifying backend's connection stays on the loop thread
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
@@ -0,0 +1,125 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+from winshift.modules.window import ClientWindow
+
+# seconds between two listings of the client windows by the watcher, for backends which can't notify changes
+DEFAULT_POLL_INTERVAL = 0.5
+# the fields of a window are matched joined by this, it is replaced in the fields themselves
+_FIELD_SEPARATOR = "\n"
+_ANY_FIELD = "[^\n]*"
+# a leading (?i) is only valid at the start of the whole expression, it is scoped to its pattern instead
+_GLOBAL_FLAGS = r"\A\(\?([imsx]+)\)"
+# constructs which behave differently once the patterns are combined: backreferences point to other groups,
+# \A and \Z anchor to the whole joined string and lookarounds see the neighboring fields
+_UNCOMBINABLE = r"\\[1-9AZz]|\(\?P=|\(\?<?[=!]"
+
+
+@dataclass
+class WindowRule:
+    layout: str
+    window_class: Optional[str] = None
+    title: Optional[str] = None
+    role: Optional[str] = None
+    screen_name: Optional[str] = None
+
+
+def _field_pattern(pattern: Optional[str]) -> str:
+    """Return a pattern searching the field for the rule pattern, any field when the rule has none."""
+    if not pattern:
+        return _ANY_FIELD
+    flags = re.match(_GLOBAL_FLAGS, pattern)
+    if flags:
+        pattern = f"(?{flags.group(1)}:{pattern[flags.end():]})"
+    return f"{_ANY_FIELD}?(?:{pattern}){_ANY_FIELD}"
+
+
+def _rule_patterns(rule: WindowRule) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    return rule.window_class, rule.title, rule.role
+
+
+def _window_fields(window: ClientWindow) -> Tuple[str, str, str]:
+    return (
+        window.window_class.replace(_FIELD_SEPARATOR, " "),
+        window.title.replace(_FIELD_SEPARATOR, " "),
+        window.role.replace(_FIELD_SEPARATOR, " "),
+    )
+
+
+class RuleMatcher:
+    """
+    Window rules compiled into a single regular expression, one alternative per rule.
+
+    The class, title and role of a window are joined by newlines and matched once: alternatives are tried in order,
+    so the first matching rule wins, and the alternative which matched names the rule. Each pattern is searched in
+    its own field, ^ and $ match at the field boundaries.
+
+    Rules using backreferences, \\A, \\Z or lookarounds can't be combined and are matched one by one like profile
+    windows, before the combined match when they come first. A combined match is checked against its rule alone, as a
+    pattern such as \\s can match across fields; the rules after it are then matched one by one.
+    """
+
+    def __init__(self, rules: Sequence[WindowRule]):
+        self.rules = list(rules)
+        self.pattern: Optional[Pattern] = None
+        self.patterns: List[List[Optional[Pattern]]] = []
+        for i, rule in enumerate(self.rules):
+            try:
+                self.patterns.append([re.compile(pattern) if pattern else None for pattern in _rule_patterns(rule)])
+            except re.error as exc:
+                raise ValueError(f"Invalid window matcher in rule {i + 1}: {exc}") from exc
+
+        combined = [i for i, rule in enumerate(self.rules) if not _is_uncombinable(rule)]
+        if combined:
+            alternatives = [
+                f"(?P<rule{i}>"
+                f"{_FIELD_SEPARATOR.join(_field_pattern(pattern) for pattern in _rule_patterns(self.rules[i]))})"
+                for i in combined
+            ]
+            try:
+                self.pattern = re.compile("|".join(alternatives), re.MULTILINE)
+            except re.error:
+                # e.g. the same group name in two rules
+                combined = []
+        # indexes of the rules matched one by one
+        self.separate = sorted(set(range(len(self.rules))) - set(combined))
+
+    def match(self, window: ClientWindow) -> Optional[WindowRule]:
+        """Return the first rule matching the window class, title and role."""
+        fields = _window_fields(window)
+        matched = self.pattern.fullmatch(_FIELD_SEPARATOR.join(fields)) if self.pattern is not None else None
+        first = int(matched.lastgroup[4:]) if matched else len(self.rules)
+        for i in self.separate:
+            if i > first:
+                break
+            if self._matches(i, fields):
+                return self.rules[i]
+        if matched is None:
+            return None
+        if self._matches(first, fields):
+            return self.rules[first]
+        for i in range(first + 1, len(self.rules)):
+            if self._matches(i, fields):
+                return self.rules[i]
+        return None
+
+    def _matches(self, i: int, fields: Tuple[str, str, str]) -> bool:
+        return all(pattern is None or pattern.search(field) for pattern, field in zip(self.patterns[i], fields))
+
+
+def _is_uncombinable(rule: WindowRule) -> bool:
+    return any(re.search(_UNCOMBINABLE, pattern) for pattern in _rule_patterns(rule) if pattern)
+
+
+def validate_rules(rules: Sequence[WindowRule]) -> None:
+    """Raise ValueError for rules without a layout, without anything to match or with an invalid pattern."""
+    for position, rule in enumerate(rules, start=1):
+        if not rule.layout:
+            raise ValueError(f"window rule {position} needs a layout")
+        # e.g. a misspelled key, the rule would match every window
+        if not rule.window_class and not rule.title and not rule.role:
+            raise ValueError(
+                f"window rule {position} for layout {rule.layout} needs a class, a title or a role to match"
+            )
+    RuleMatcher(rules)
@@ -1,6 +1,7 @@
+from bisect import bisect_right
 from dataclasses import dataclass
 import subprocess
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from winshift.modules.direction import Direction
 
@@ -28,37 +29,157 @@ def _parse_screen_data(screen_data: List[str]) -> ScreenData:
     return ScreenData(name, x, y, width, height, direction)
 
 
-def get_screens_data() -> List[ScreenData]:
-    """Return screen data using xrandr."""
+def read_active_monitors() -> str:
+    """Return the output of xrandr listing the active monitors."""
     args = ["xrandr", "--listactivemonitors"]
     with subprocess.Popen(args, stdout=subprocess.PIPE) as xrandr:
-        monitors = xrandr.stdout.read().decode("utf-8").split("\n")[1:-1]
-        return [_parse_screen_data(monitor.split()) for monitor in monitors]
+        return xrandr.stdout.read().decode("utf-8")
 
 
-def locate_point_on_screen(screens: List[ScreenData], x: int, y: int) -> Optional[ScreenData]:
-    """Return the screen where the point is located."""
-    horizontal_matches = []
-    vertical_matches = []
-    # try to match both horizontal and vertical
-    for screen in screens:
-        screen_left = screen.x
-        screen_top = screen.y
-        screen_right = screen.x + screen.width
-        screen_bottom = screen.y + screen.height
+def parse_active_monitors(output: str) -> List[ScreenData]:
+    """Return screen data from the output of read_active_monitors."""
+    monitors = output.split("\n")[1:-1]
+    return [_parse_screen_data(monitor.split()) for monitor in monitors]
 
-        if screen_left <= x <= screen_right:
-            horizontal_matches.append(screen)
-        if screen_top <= y <= screen_bottom:
-            vertical_matches.append(screen)
 
-        if screen_left <= x <= screen_right and screen_top <= y <= screen_bottom:
-            return screen
+def get_screens_data() -> List[ScreenData]:
+    """Return screen data using xrandr."""
+    return parse_active_monitors(read_active_monitors())
+
+
+class ScreenIndex:
+    """Point lookup over a fixed set of screens, built once per monitor topology.
+
+    Screens are split in a grid of cells delimited by every screen edge, each cell holding the first screen covering
+    it. Screens are half-open rectangles: the pixel at x + width belongs to the screen on the right, if any.
+    """
+
+    def __init__(self, screens: List[ScreenData]):
+        self.screens = screens
+        self.by_name: Dict[str, ScreenData] = {}
+        for screen in screens:
+            self.by_name.setdefault(screen.name, screen)
+        self.x_edges = sorted({edge for screen in screens for edge in (screen.x, screen.x + screen.width)})
+        self.columns: List[List[int]] = []
+        self.cells: List[List[Optional[ScreenData]]] = []
+        for left in self.x_edges[:-1]:
+            covering = [screen for screen in screens if screen.x <= left < screen.x + screen.width]
+            y_edges = sorted({edge for screen in covering for edge in (screen.y, screen.y + screen.height)})
+            self.columns.append(y_edges)
+            self.cells.append(
+                [
+                    next((screen for screen in covering if screen.y <= top < screen.y + screen.height), None)
+                    for top in y_edges[:-1]
+                ]
+            )
+
+    def get(self, name: str) -> Optional[ScreenData]:
+        """Return the screen by name."""
+        return self.by_name.get(name)
+
+    def locate(self, x: int, y: int) -> Optional[ScreenData]:
+        """Return the screen containing the point, otherwise the nearest one."""
+        column = bisect_right(self.x_edges, x) - 1
+        if 0 <= column < len(self.columns):
+            y_edges = self.columns[column]
+            row = bisect_right(y_edges, y) - 1
+            if 0 <= row < len(y_edges) - 1 and self.cells[column][row] is not None:
+                return self.cells[column][row]
+        return self.nearest(x, y)
+
+    def nearest(self, x: int, y: int) -> Optional[ScreenData]:
+        """Return the screen closest to the point, the first listed one on ties."""
+        return _nearest_screen(self.screens, x, y)
+
+
+# sides a window can be moved to, see ScreenGraph
+SCREEN_SIDES = ("left", "right", "up", "down")
 
-    # if no match, try to match only horizontal or vertical
-    if horizontal_matches:
-        return horizontal_matches[0]
-    if vertical_matches:
-        return vertical_matches[0]
 
-    return None
+class ScreenGraph:
+    """
+    The neighbor of every screen on each side, built once per monitor topology.
+
+    The neighbor on a side is the closest screen beyond that edge sharing part of it, the one sharing the most on
+    ties. When no screen shares the edge, e.g. on staggered walls, it is the screen beyond the edge whose center is
+    the closest.
+    """
+
+    def __init__(self, screens: List[ScreenData]):
+        self.screens = screens
+        self.neighbors: Dict[Tuple[str, str], ScreenData] = {}
+        for side in SCREEN_SIDES:
+            edges = [_edges(screen, side) for screen in screens]
+            for screen, screen_edges in zip(screens, edges):
+                neighbor = _find_neighbor(screen, screen_edges, screens, edges)
+                if neighbor is not None:
+                    self.neighbors[(screen.name, side)] = neighbor
+
+    def neighbor(self, screen_name: str, side: str) -> Optional[ScreenData]:
+        """Return the screen next to the given one on the side, None at the edge of the wall."""
+        if side not in SCREEN_SIDES:
+            raise ValueError(f"Invalid side {side}, expected one of {', '.join(SCREEN_SIDES)}")
+        return self.neighbors.get((screen_name, side))
+
+
+def _edges(screen: ScreenData, side: str) -> Tuple[int, int, int, int]:
+    """Return the screen edges as (near, far, start, end): along the side's axis, then across it."""
+    left, right, top, bottom = screen.x, screen.x + screen.width, screen.y, screen.y + screen.height
+    if side == "left":
+        return -right, -left, top, bottom
+    if side == "right":
+        return left, right, top, bottom
+    if side == "up":
+        return -bottom, -top, left, right
+    return top, bottom, left, right
+
+
+def _find_neighbor(
+    screen: ScreenData,
+    screen_edges: Tuple[int, int, int, int],
+    screens: List[ScreenData],
+    edges: List[Tuple[int, int, int, int]],
+) -> Optional[ScreenData]:
+    near, far, start, end = screen_edges
+    center_near, center_start = near + far, start + end
+    adjacent, adjacent_key = None, (0, 0)
+    nearest, nearest_distance = None, 0
+    for other, (other_near, other_far, other_start, other_end) in zip(screens, edges):
+        if other_near < far or other.name == screen.name:
+            continue
+        shared = min(end, other_end) - max(start, other_start)
+        if shared > 0:
+            key = (other_near - far, -shared)
+            if adjacent is None or key < adjacent_key:
+                adjacent, adjacent_key = other, key
+        # doubled centers, compared with each other only
+        distance = (other_near + other_far - center_near) ** 2 + (other_start + other_end - center_start) ** 2
+        if nearest is None or distance < nearest_distance:
+            nearest, nearest_distance = other, distance
+    return adjacent or nearest
+
+
+def _nearest_screen(screens: List[ScreenData], x: int, y: int) -> Optional[ScreenData]:
+    """Return the screen closest to the point, the first listed one on ties."""
+    nearest_screen = None
+    nearest_distance = 0
+    for screen in screens:
+        dx = max(screen.x - x, 0, x - (screen.x + screen.width - 1))
+        dy = max(screen.y - y, 0, y - (screen.y + screen.height - 1))
+        distance = dx * dx + dy * dy
+        if nearest_screen is None or distance < nearest_distance:
+            nearest_screen = screen
+            nearest_distance = distance
+    return nearest_screen
+
+
+def locate_point_on_screen(screens: List[ScreenData], x: int, y: int) -> Optional[ScreenData]:
+    """Return the screen where the point is located, or the nearest one.
+
+    Scans the screens once, like ScreenIndex.locate without building the index: use a ScreenIndex kept with the
+    screens for repeated lookups.
+    """
+    for screen in screens:
+        if screen.x <= x < screen.x + screen.width and screen.y <= y < screen.y + screen.height:
+            return screen
+    return _nearest_screen(screens, x, y)
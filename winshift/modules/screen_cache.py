@@ -0,0 +1,139 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.direction import Direction
+from winshift.modules.screen import ScreenData, ScreenGraph, ScreenIndex
+
+DEFAULT_SCREEN_CACHE_PATH = os.path.expanduser("~/.cache/winshift/screens.json")
+
+
+class ScreenCache:
+    """Screens kept in memory and on disk, keyed by the backend's monitor configuration fingerprint."""
+
+    def __init__(self, backend: DisplayBackend, cache_path: str = DEFAULT_SCREEN_CACHE_PATH):
+        self.backend = backend
+        self.cache_path = cache_path
+        self.screens_data: Optional[List[ScreenData]] = None
+        # fingerprint the in-memory screens were looked up with
+        self.fingerprint: Optional[str] = None
+        self.screen_index: Optional[ScreenIndex] = None
+        self.screen_graph: Optional[ScreenGraph] = None
+        # screens of the monitor configuration before the current one, to bring windows back from unplugged monitors
+        self.previous_screens_data: Optional[List[ScreenData]] = None
+
+    def get_screens_data(self) -> List[ScreenData]:
+        """Return the screens, only querying the backend when the monitor configuration changed."""
+        if self.screens_data is not None and not self.backend.screens_changed():
+            return self.screens_data
+
+        fingerprint = self.backend.get_screens_fingerprint()
+        cached = _read_screen_cache(self.cache_path) if fingerprint else None
+        if cached is not None and cached[0] == fingerprint:
+            _, screens_data, previous_screens_data = cached
+        else:
+            screens_data = self.backend.get_screens_data()
+            previous_screens_data = self.screens_data or (cached[1] if cached else None)
+            if fingerprint:
+                _write_screen_cache(self.cache_path, fingerprint, screens_data, previous_screens_data)
+        if previous_screens_data is not None and previous_screens_data != screens_data:
+            self.previous_screens_data = previous_screens_data
+        self.screens_data = screens_data
+        self.fingerprint = fingerprint
+        return screens_data
+
+    def get_screen_index(self) -> ScreenIndex:
+        """Return the lookup index of the current screens, rebuilt only when they change."""
+        screens_data = self.get_screens_data()
+        if self.screen_index is None or self.screen_index.screens is not screens_data:
+            self.screen_index = ScreenIndex(screens_data)
+        return self.screen_index
+
+    def get_screen_graph(self) -> ScreenGraph:
+        """Return the neighbors of the current screens, rebuilt only when they change."""
+        screens_data = self.get_screens_data()
+        if self.screen_graph is None or self.screen_graph.screens is not screens_data:
+            self.screen_graph = ScreenGraph(screens_data)
+        return self.screen_graph
+
+    def forget_previous_screens(self) -> None:
+        """Forget the previous screens once their windows were brought back, so they aren't moved twice."""
+        self.previous_screens_data = None
+        if self.fingerprint and self.screens_data is not None:
+            _write_screen_cache(self.cache_path, self.fingerprint, self.screens_data)
+
+    def invalidate(self) -> None:
+        """Forget the in-memory screens."""
+        self.screens_data = None
+
+    def refresh(self) -> List[ScreenData]:
+        """Drop both the in-memory and on-disk caches and query the screens again, remembering the previous ones."""
+        cached = _read_screen_cache(self.cache_path)
+        previous_screens_data = self.screens_data or (cached[1] if cached else None)
+        self.invalidate()
+        if os.path.exists(self.cache_path):
+            os.unlink(self.cache_path)
+        screens_data = self.get_screens_data()
+        if previous_screens_data is not None and previous_screens_data != screens_data:
+            self.previous_screens_data = previous_screens_data
+            if self.fingerprint:
+                _write_screen_cache(self.cache_path, self.fingerprint, screens_data, previous_screens_data)
+        return screens_data
+
+
+def _screen_data_as_dict(screen_data: ScreenData) -> dict:
+    return {
+        "name": screen_data.name,
+        "x": screen_data.x,
+        "y": screen_data.y,
+        "width": screen_data.width,
+        "height": screen_data.height,
+        "direction": screen_data.direction.value,
+    }
+
+
+def _screen_data_from_dict(data: dict) -> ScreenData:
+    return ScreenData(
+        name=data["name"],
+        x=data["x"],
+        y=data["y"],
+        width=data["width"],
+        height=data["height"],
+        direction=Direction(data["direction"]),
+    )
+
+
+def _read_screen_cache(cache_path: str) -> Optional[Tuple[str, List[ScreenData], Optional[List[ScreenData]]]]:
+    """Return the cached fingerprint, the screens stored for it and the screens before them, if any."""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        previous = data.get("previous_screens")
+        return (
+            data["fingerprint"],
+            [_screen_data_from_dict(screen) for screen in data["screens"]],
+            [_screen_data_from_dict(screen) for screen in previous] if previous is not None else None,
+        )
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_screen_cache(
+    cache_path: str,
+    fingerprint: str,
+    screens_data: List[ScreenData],
+    previous_screens_data: Optional[List[ScreenData]] = None,
+) -> None:
+    """Store the screens atomically, a failure to write only costs a query next time."""
+    data = {"fingerprint": fingerprint, "screens": [_screen_data_as_dict(s) for s in screens_data]}
+    if previous_screens_data is not None:
+        data["previous_screens"] = [_screen_data_as_dict(s) for s in previous_screens_data]
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
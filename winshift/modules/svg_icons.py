@@ -0,0 +1,64 @@
+from typing import Optional, TextIO, Tuple
+
+
+def create_svg(
+    image_size: int,
+    margin: int,
+    screen_dims: Tuple[int, int],
+    window_dims: Tuple[int, int, int, int],
+    output_path: str,
+    screen_color: str,
+    screen_border_color: str,
+    screen_border_width: int,
+    window_color: str,
+    window_border_color: str,
+    window_border_width: int,
+) -> None:
+    """
+    Creates an SVG with the same two rectangles as icons.create_image and saves it.
+
+    The rectangles keep the screen coordinates, the view box scales them to the image size so the icon stays
+    sharp at any size. Margin and border widths are in pixels of the image size, as for the PNG icons.
+
+    :param image_size: Side length of the image
+    :param margin: Margin around the image
+    :param screen_dims: Dimensions of the screen rectangle (width, height)
+    :param window_dims: Dimensions of the window rectangle (x offset, y offset, width, height)
+    :param output_path: Path to save the output image
+    :param screen_color: Fill color for the screen rectangle
+    :param screen_border_color: Border color for the screen rectangle
+    :param screen_border_width: Border width for the screen rectangle
+    :param window_color: Fill color for the window rectangle
+    :param window_border_color: Border color for the window rectangle
+    :param window_border_width: Border width for the window rectangle
+    """
+    # Length of an image pixel in screen coordinates
+    side = max(screen_dims)
+    pixel = side / (image_size - 2 * margin)
+    view_x = -(side - screen_dims[0]) / 2 - margin * pixel
+    view_y = -(side - screen_dims[1]) / 2 - margin * pixel
+    view_size = side + 2 * margin * pixel
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{image_size}" height="{image_size}" '
+            f'viewBox="{view_x:g} {view_y:g} {view_size:g} {view_size:g}">\n'
+        )
+        _write_rectangle(f, (0, 0, *screen_dims), screen_color, screen_border_color, screen_border_width * pixel)
+        _write_rectangle(f, window_dims, window_color, window_border_color, window_border_width * pixel)
+        f.write("</svg>\n")
+
+
+def _write_rectangle(
+    f: TextIO, rectangle: Tuple[int, int, int, int], fill: str, outline: Optional[str], width: float
+) -> None:
+    x, y, w, h = rectangle
+    if width <= 0 or outline == fill:
+        f.write(f'  <rect x="{x}" y="{y}" width="{w}" height="{h}" fill="{fill}"/>\n')
+        return
+    # SVG centers strokes on the edges, the PNG icons draw the border inside the rectangle
+    inset = min(width, w, h) / 2
+    f.write(
+        f'  <rect x="{x + inset:g}" y="{y + inset:g}" width="{w - 2 * inset:g}" height="{h - 2 * inset:g}" '
+        f'fill="{fill}" stroke="{outline}" stroke-width="{width:g}"/>\n'
+    )
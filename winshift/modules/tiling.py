@@ -0,0 +1,167 @@
+from math import ceil, sqrt
+from typing import Callable, Dict, List, Optional, Tuple
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.direction import Direction
+from winshift.modules.layout import BarHeight, CalculatedLayout
+from winshift.modules.reproject import Area, screen_areas
+from winshift.modules.screen import ScreenData, ScreenIndex
+from winshift.modules.window import ClientWindow
+
+TILING_MODES = ("master-stack", "grid", "columns", "bsp")
+DEFAULT_MASTER_RATIO = 0.5
+# panels and desktop windows keep their place
+UNTILED_WINDOW_TYPES = ("dock", "desktop")
+
+# area, number of windows, gap, master ratio
+Tiler = Callable[[Area, int, int, float], List[Area]]
+
+
+def _transpose(area: Area) -> Area:
+    x, y, width, height = area
+    return y, x, height, width
+
+
+def _split(start: int, length: int, count: int, gap: int) -> List[Tuple[int, int]]:
+    """Split the segment in count (start, length) parts separated by the gap, the first parts get the remainder."""
+    if count > 1:
+        # narrower gaps rather than parts overflowing the segment
+        gap = min(gap, max(length - count, 0) // (count - 1))
+    size, extra = divmod(max(length - gap * (count - 1), count), count)
+    parts = []
+    for i in range(count):
+        part = size + 1 if i < extra else size
+        parts.append((start, part))
+        start += part + gap
+    return parts
+
+
+def _master_stack(area: Area, count: int, gap: int, master_ratio: float) -> List[Area]:
+    """The first window on the left, the others stacked on the right."""
+    x, y, width, height = area
+    if count == 1:
+        return [area]
+    master_width = min(max(round((width - gap) * master_ratio), 1), max(width - gap - 1, 1))
+    stack_x = x + master_width + gap
+    stack_width = max(width - master_width - gap, 1)
+    return [(x, y, master_width, height)] + [
+        (stack_x, stack_y, stack_width, stack_height) for stack_y, stack_height in _split(y, height, count - 1, gap)
+    ]
+
+
+def _grid(area: Area, count: int, gap: int, _master_ratio: float) -> List[Area]:
+    """As many rows as needed of ceil(sqrt(count)) windows, the last row's windows share its whole width."""
+    x, y, width, height = area
+    columns = ceil(sqrt(count))
+    rows = ceil(count / columns)
+    tiles = []
+    for row, (row_y, row_height) in enumerate(_split(y, height, rows, gap)):
+        row_count = min(columns, count - row * columns)
+        tiles.extend(
+            (column_x, row_y, column_width, row_height) for column_x, column_width in _split(x, width, row_count, gap)
+        )
+    return tiles
+
+
+def _columns(area: Area, count: int, gap: int, _master_ratio: float) -> List[Area]:
+    """Side by side windows of equal width."""
+    x, y, width, height = area
+    return [(column_x, y, column_width, height) for column_x, column_width in _split(x, width, count, gap)]
+
+
+def _bsp(area: Area, count: int, gap: int, _master_ratio: float) -> List[Area]:
+    """Split the area along its longer side between the two halves of the windows, recursively."""
+    tiles: List[Area] = []
+
+    def split(x: int, y: int, width: int, height: int, window_count: int) -> None:
+        if window_count == 1:
+            tiles.append((x, y, width, height))
+            return
+        first_count = window_count // 2
+        if width >= height:
+            first_width = min(max(round((width - gap) * first_count / window_count), 1), max(width - gap - 1, 1))
+            split(x, y, first_width, height, first_count)
+            split(x + first_width + gap, y, max(width - first_width - gap, 1), height, window_count - first_count)
+        else:
+            first_height = min(max(round((height - gap) * first_count / window_count), 1), max(height - gap - 1, 1))
+            split(x, y, width, first_height, first_count)
+            split(x, y + first_height + gap, width, max(height - first_height - gap, 1), window_count - first_count)
+
+    split(*area, count)
+    return tiles
+
+
+_TILERS: Dict[str, Tiler] = {
+    "master-stack": _master_stack,
+    "grid": _grid,
+    "columns": _columns,
+    "bsp": _bsp,
+}
+
+
+def tile_screen(
+    screen_data: ScreenData,
+    count: int,
+    mode: str = "grid",
+    bar_height: Optional[BarHeight] = None,
+    master_ratio: float = DEFAULT_MASTER_RATIO,
+) -> List[CalculatedLayout]:
+    """
+    Return the geometries of count windows tiling the screen, in one pass over the windows.
+
+    Windows are kept inside the bars and gaps of the screen and separated by the gap. Vertical screens are tiled
+    transposed: master-stack puts the master on top and columns become rows.
+    """
+    if mode not in _TILERS:
+        raise ValueError(f"Unknown tiling mode {mode}, expected one of {', '.join(TILING_MODES)}")
+    if count <= 0:
+        return []
+    gap = bar_height.gap if bar_height else 0
+    _, area = screen_areas(screen_data, bar_height)
+    if screen_data.direction == Direction.VERTICAL:
+        return [
+            CalculatedLayout(*_transpose(tile)) for tile in _TILERS[mode](_transpose(area), count, gap, master_ratio)
+        ]
+    return [CalculatedLayout(*tile) for tile in _TILERS[mode](area, count, gap, master_ratio)]
+
+
+def is_tiled(window: ClientWindow, current_desktop: Optional[int]) -> bool:
+    """
+    Return True for the windows tiling rearranges: visible windows of the current desktop.
+
+    Minimized windows, panels, desktop windows and windows shown on every desktop, e.g. a bar listed by wmctrl which
+    doesn't report window types, are left alone.
+    """
+    if window.hidden or window.window_type in UNTILED_WINDOW_TYPES or window.desktop == -1:
+        return False
+    return window.desktop is None or current_desktop is None or window.desktop == current_desktop
+
+
+def tile_windows(
+    backend: DisplayBackend,
+    screen_index: ScreenIndex,
+    screen_data: ScreenData,
+    mode: str = "grid",
+    bar_height: Optional[BarHeight] = None,
+    master_ratio: float = DEFAULT_MASTER_RATIO,
+    first_window: Optional[str] = None,
+    dry_run: bool = False,
+) -> List[Tuple[ClientWindow, CalculatedLayout]]:
+    """
+    Tile the client windows whose center is on the screen, listing the windows once and moving them in one batch.
+
+    Only the windows is_tiled accepts are rearranged, in the order the backend lists them, except first_window, e.g.
+    the active one, which comes first and becomes the master.
+    """
+    current_desktop = backend.get_current_desktop()
+    windows = [
+        window
+        for window in backend.list_client_windows()
+        if is_tiled(window, current_desktop)
+        and screen_index.locate(window.x + window.width // 2, window.y + window.height // 2) == screen_data
+    ]
+    windows.sort(key=lambda window: window.name != first_window)
+    moves = list(zip(windows, tile_screen(screen_data, len(windows), mode, bar_height, master_ratio)))
+    if not dry_run:
+        backend.move_resize_windows(moves)
+    return moves
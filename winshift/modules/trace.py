@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import ContextManager, Iterator, List, Optional, TextIO
+
+# path of the trace file, a .json path gets a Chrome trace (chrome://tracing, Perfetto), anything else JSON lines
+TRACE_ENV = "WINSHIFT_TRACE"
+# a daemon keeps its spans for the Chrome trace, only the most recent ones
+MAX_TRACE_SPANS = 10_000
+
+
+@dataclass
+class Span:
+    name: str
+    start_ns: int
+    duration_ns: int
+
+
+class Tracer:
+    """Records how long each stage of a command takes, with a monotonic clock."""
+
+    enabled = True
+
+    def __init__(self, trace_path: Optional[str] = None, stream: Optional[TextIO] = None):
+        self.trace_path = trace_path
+        # kept from creation time, the daemon redirects stderr to the client while running commands
+        self.stream = stream or sys.stderr
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        start = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self.spans.append(Span(name, start, time.monotonic_ns() - start))
+
+    def span(self, name: str) -> ContextManager[None]:
+        """Time the block, nested spans are recorded before the spans containing them."""
+        return self._span(name)
+
+    def flush(self) -> None:
+        """Write the recorded spans, a Chrome trace is rewritten whole so it stays a valid JSON document."""
+        if self.trace_path and self.trace_path.endswith(".json"):
+            del self.spans[:-MAX_TRACE_SPANS]
+            _write_chrome_trace(self.trace_path, self.spans)
+            return
+        if self.trace_path:
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                _write_json_lines(f, self.spans)
+        else:
+            _write_json_lines(self.stream, self.spans)
+            self.stream.flush()
+        self.spans.clear()
+
+
+class NullTracer(Tracer):
+    """Tracer used when tracing is off, spans cost a method call."""
+
+    enabled = False
+
+    def span(self, name: str) -> ContextManager[None]:
+        return _NULL_CONTEXT
+
+    def flush(self) -> None:
+        pass
+
+
+_NULL_CONTEXT = nullcontext()
+NULL_TRACER = NullTracer()
+
+
+def get_tracer(profile: bool = False) -> Tracer:
+    """Return a tracer writing to $WINSHIFT_TRACE, or JSON lines to stderr with --profile, or the null tracer."""
+    trace_path = os.environ.get(TRACE_ENV)
+    if trace_path:
+        return Tracer(trace_path)
+    if profile:
+        return Tracer()
+    return NULL_TRACER
+
+
+def _write_json_lines(f: TextIO, spans: List[Span]) -> None:
+    pid = os.getpid()
+    for span in spans:
+        f.write(
+            json.dumps(
+                {
+                    "stage": span.name,
+                    "start_us": span.start_ns // 1000,
+                    "duration_us": round(span.duration_ns / 1000, 3),
+                    "pid": pid,
+                }
+            )
+            + "\n"
+        )
+
+
+def _write_chrome_trace(trace_path: str, spans: List[Span]) -> None:
+    pid = os.getpid()
+    events = [
+        {
+            "name": span.name,
+            "cat": "winshift",
+            "ph": "X",
+            "ts": span.start_ns / 1000,
+            "dur": span.duration_ns / 1000,
+            "pid": pid,
+            "tid": pid,
+        }
+        for span in spans
+    ]
+    tmp_path = f"{trace_path}.{pid}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp_path, trace_path)
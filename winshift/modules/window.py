@@ -1,6 +1,6 @@
 import subprocess
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Tuple
 
 from winshift.modules.layout import CalculatedLayout
 
@@ -14,6 +14,20 @@ class WindowData:
     height: int
 
 
+@dataclass
+class ClientWindow(WindowData):
+    window_class: str = ""
+    title: str = ""
+    # WM_WINDOW_ROLE, only known to the x11 backend
+    role: str = ""
+    # EWMH desktop of the window, -1 when it is shown on every desktop, None when unknown
+    desktop: Optional[int] = None
+    # "dock" or "desktop" for panels and desktop windows, only known to the x11 backend
+    window_type: str = ""
+    # minimized, only known to the x11 backend
+    hidden: bool = False
+
+
 def _parse_window_data(window_data: List[str]) -> WindowData:
     """Return window data from xdotool output."""
     name = window_data[0].split(" ")[1]
@@ -32,23 +46,61 @@ def get_active_window_data() -> WindowData:
         return _parse_window_data(window_info)
 
 
-def resize_reposition_window(window_data: WindowData, layout_data: CalculatedLayout) -> None:
-    """Resize and reposition the window."""
-    subprocess.call(
-        [
-            "xdotool",
-            "windowsize",
-            window_data.name,
-            str(layout_data.width),
-            str(layout_data.height),
-        ]
-    )
-    subprocess.call(
-        [
-            "xdotool",
-            "windowmove",
-            window_data.name,
-            str(layout_data.x),
-            str(layout_data.y),
-        ]
+def get_window_data(window_id: str) -> WindowData:
+    """Return window data of the given window using xdotool."""
+    args = ["xdotool", "getwindowgeometry", window_id]
+    with subprocess.Popen(args, stdout=subprocess.PIPE) as xdotool:
+        window_info = xdotool.stdout.read().decode("utf-8").split("\n")
+        return _parse_window_data(window_info)
+
+
+def _parse_client_window(line: str) -> ClientWindow:
+    """Return a client window from a wmctrl -lxG output line."""
+    window_id, desktop, x, y, width, height, window_class, *rest = line.split(None, 8)
+    title = rest[1] if len(rest) > 1 else ""
+    return ClientWindow(
+        str(int(window_id, 16)), int(x), int(y), int(width), int(height), window_class, title, desktop=int(desktop)
     )
+
+
+def list_client_windows() -> List[ClientWindow]:
+    """Return the windows managed by the window manager using wmctrl."""
+    args = ["wmctrl", "-l", "-x", "-G"]
+    with subprocess.Popen(args, stdout=subprocess.PIPE) as wmctrl:
+        lines = wmctrl.stdout.read().decode("utf-8").splitlines()
+        return [_parse_client_window(line) for line in lines if line.strip()]
+
+
+def get_current_desktop() -> Optional[int]:
+    """Return the current desktop using wmctrl, None if the window manager doesn't tell."""
+    args = ["wmctrl", "-d"]
+    with subprocess.Popen(args, stdout=subprocess.PIPE) as wmctrl:
+        for line in wmctrl.stdout.read().decode("utf-8").splitlines():
+            fields = line.split()
+            if len(fields) > 1 and fields[1] == "*":
+                return int(fields[0])
+    return None
+
+
+def _move_resize_args(window_data: WindowData, layout_data: CalculatedLayout) -> List[str]:
+    return [
+        "windowmove",
+        window_data.name,
+        str(layout_data.x),
+        str(layout_data.y),
+        "windowsize",
+        window_data.name,
+        str(layout_data.width),
+        str(layout_data.height),
+    ]
+
+
+def resize_reposition_window(window_data: WindowData, layout_data: CalculatedLayout) -> None:
+    """Resize and reposition the window with a single chained xdotool invocation."""
+    subprocess.call(["xdotool", *_move_resize_args(window_data, layout_data)])
+
+
+def resize_reposition_windows(moves: List[Tuple[WindowData, CalculatedLayout]]) -> None:
+    """Resize and reposition many windows with a single chained xdotool invocation."""
+    if moves:
+        subprocess.call(["xdotool", *[arg for move in moves for arg in _move_resize_args(*move)]])
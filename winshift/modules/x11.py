@@ -0,0 +1,224 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Xlib import X, display, error
+from Xlib.ext import randr
+from Xlib.protocol import event
+
+from winshift.modules.backend import DisplayBackend
+from winshift.modules.direction import Direction
+from winshift.modules.layout import CalculatedLayout
+from winshift.modules.screen import ScreenData
+from winshift.modules.window import ClientWindow, WindowData
+
+# _NET_MOVERESIZE_WINDOW flags: x, y, width and height present, sent by a pager-like tool, default gravity
+_MOVERESIZE_FLAGS = (1 << 8) | (1 << 9) | (1 << 10) | (1 << 11) | (2 << 12)
+# _NET_WM_DESKTOP of windows shown on every desktop
+_ALL_DESKTOPS = 0xFFFFFFFF
+# the _NET_WM_WINDOW_TYPE values reported in ClientWindow.window_type
+_WINDOW_TYPES = {"_NET_WM_WINDOW_TYPE_DOCK": "dock", "_NET_WM_WINDOW_TYPE_DESKTOP": "desktop"}
+
+
+class X11Backend(DisplayBackend):
+    """Backend talking the X11 protocol over a single persistent connection."""
+
+    def __init__(self, display_name: Optional[str] = None):
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        if not self.display.has_extension("RANDR"):
+            self.display.close()
+            raise RuntimeError("The X server does not support the RandR extension")
+        self.net_active_window = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+        self.net_moveresize_window = self.display.intern_atom("_NET_MOVERESIZE_WINDOW")
+        self.net_client_list = self.display.intern_atom("_NET_CLIENT_LIST")
+        self.net_wm_name = self.display.intern_atom("_NET_WM_NAME")
+        self.utf8_string = self.display.intern_atom("UTF8_STRING")
+        self.wm_window_role = self.display.intern_atom("WM_WINDOW_ROLE")
+        supported = self.root.get_full_property(self.display.intern_atom("_NET_SUPPORTED"), X.AnyPropertyType)
+        self.supports_moveresize = supported is not None and self.net_moveresize_window in supported.value
+        self.randr_first_event = self.display.query_extension("RANDR").first_event
+        self.root.xrandr_select_input(randr.RRScreenChangeNotifyMask)
+        # both kinds of notifications share the event queue, see _drain_events
+        self.pending_screens_change = False
+        self.pending_client_list_change = False
+        # atoms only some commands need, interned on first use
+        self.atoms: Dict[str, int] = {}
+
+    def _atom(self, name: str) -> int:
+        if name not in self.atoms:
+            self.atoms[name] = self.display.intern_atom(name)
+        return self.atoms[name]
+
+    def get_screens_data(self) -> List[ScreenData]:
+        """Return the active monitors, in the same order xrandr --listactivemonitors lists them."""
+        screens = []
+        for monitor in self.root.xrandr_get_monitors(is_active=True).monitors:
+            width = monitor.width_in_pixels
+            height = monitor.height_in_pixels
+            screens.append(
+                ScreenData(
+                    name=self.display.get_atom_name(monitor.name),
+                    x=monitor.x,
+                    y=monitor.y,
+                    width=width,
+                    height=height,
+                    direction=Direction.HORIZONTAL if width > height else Direction.VERTICAL,
+                )
+            )
+        return screens
+
+    def get_screens_fingerprint(self) -> Optional[str]:
+        """Return the RandR configuration timestamps, they change whenever the monitor setup changes."""
+        resources = self.root.xrandr_get_screen_resources_current()
+        return f"x11:{self.display.get_display_name()}:{resources.config_timestamp}:{resources.timestamp}"
+
+    def _drain_events(self) -> None:
+        """Read the queued events without blocking, remembering which kinds of changes they notify."""
+        while self.display.pending_events():
+            x_event = self.display.next_event()
+            if x_event.type == self.randr_first_event + randr.RRScreenChangeNotify:
+                self.pending_screens_change = True
+            elif x_event.type == X.PropertyNotify and x_event.atom == self.net_client_list:
+                self.pending_client_list_change = True
+
+    def screens_changed(self) -> bool:
+        """Drain the queued RandR screen change notifications without blocking."""
+        self._drain_events()
+        changed, self.pending_screens_change = self.pending_screens_change, False
+        return changed
+
+    def watch_client_list(self) -> Optional[int]:
+        """Listen for _NET_CLIENT_LIST property changes on the root window, set by the window manager."""
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.display.flush()
+        return self.display.fileno()
+
+    def client_list_changed(self) -> bool:
+        self._drain_events()
+        changed, self.pending_client_list_change = self.pending_client_list_change, False
+        return changed
+
+    def get_active_window_data(self) -> WindowData:
+        """Return the window referenced by the EWMH _NET_ACTIVE_WINDOW root property."""
+        active_window = self.root.get_full_property(self.net_active_window, X.AnyPropertyType)
+        if active_window is None or not active_window.value or not active_window.value[0]:
+            raise RuntimeError("No active window found")
+        return self.get_window_data(str(active_window.value[0]))
+
+    def get_window_data(self, window_id: str) -> WindowData:
+        """Return the window position in root coordinates and its size, like xdotool getwindowgeometry."""
+        resource_id = int(window_id, 0)
+        window = self.display.create_resource_object("window", resource_id)
+        geometry = window.get_geometry()
+        position = self.root.translate_coords(window, 0, 0)
+        return WindowData(str(resource_id), position.x, position.y, geometry.width, geometry.height)
+
+    def list_client_window_ids(self) -> List[str]:
+        """Return the windows listed in the EWMH _NET_CLIENT_LIST root property, a single request."""
+        client_list = self.root.get_full_property(self.net_client_list, X.AnyPropertyType)
+        return [str(window_id) for window_id in client_list.value] if client_list is not None else []
+
+    def list_client_windows(self) -> List[ClientWindow]:
+        """Return the windows listed in the EWMH _NET_CLIENT_LIST root property."""
+        return self.get_client_windows(self.list_client_window_ids())
+
+    def get_client_windows(self, window_ids: Sequence[str]) -> List[ClientWindow]:
+        """Query the geometry, class, title, role, desktop, type and state of each window, a few requests each."""
+        windows = []
+        for window_id in window_ids:
+            try:
+                windows.append(self._get_client_window(window_id))
+            except error.XError:
+                # BadWindow or BadDrawable: the window was closed since it was listed
+                continue
+        return windows
+
+    def _get_client_window(self, window_id: str) -> ClientWindow:
+        window = self.display.create_resource_object("window", int(window_id))
+        window_data = self.get_window_data(window_id)
+        wm_class = window.get_wm_class()
+        return ClientWindow(
+            window_data.name,
+            window_data.x,
+            window_data.y,
+            window_data.width,
+            window_data.height,
+            window_class=".".join(wm_class) if wm_class else "",
+            title=self.get_window_title(window),
+            role=self.get_window_role(window),
+            desktop=self.get_window_desktop(window),
+            window_type=self.get_window_type(window),
+            hidden=self.is_window_hidden(window),
+        )
+
+    def get_current_desktop(self) -> Optional[int]:
+        """Return the EWMH _NET_CURRENT_DESKTOP root property."""
+        desktop = self.root.get_full_property(self._atom("_NET_CURRENT_DESKTOP"), X.AnyPropertyType)
+        return int(desktop.value[0]) if desktop is not None and len(desktop.value) else None
+
+    def get_window_title(self, window) -> str:
+        """Return the EWMH _NET_WM_NAME of the window, falling back to the ICCCM WM_NAME."""
+        title = window.get_full_property(self.net_wm_name, self.utf8_string)
+        if title is not None:
+            value = title.value
+            return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+        return window.get_wm_name() or ""
+
+    def get_window_role(self, window) -> str:
+        """Return the ICCCM WM_WINDOW_ROLE of the window, empty if it has none."""
+        role = window.get_full_property(self.wm_window_role, X.AnyPropertyType)
+        if role is None:
+            return ""
+        value = role.value
+        return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+    def get_window_desktop(self, window) -> Optional[int]:
+        """Return the EWMH _NET_WM_DESKTOP of the window, -1 when it is shown on every desktop."""
+        desktop = window.get_full_property(self._atom("_NET_WM_DESKTOP"), X.AnyPropertyType)
+        if desktop is None or not len(desktop.value):
+            return None
+        return -1 if desktop.value[0] == _ALL_DESKTOPS else int(desktop.value[0])
+
+    def get_window_type(self, window) -> str:
+        """Return "dock" or "desktop" from the EWMH _NET_WM_WINDOW_TYPE of the window, empty for other types."""
+        types = window.get_full_property(self._atom("_NET_WM_WINDOW_TYPE"), X.AnyPropertyType)
+        for window_type in types.value if types is not None else []:
+            for name, short_name in _WINDOW_TYPES.items():
+                if window_type == self._atom(name):
+                    return short_name
+        return ""
+
+    def is_window_hidden(self, window) -> bool:
+        """Return True if the EWMH _NET_WM_STATE of the window says it is minimized."""
+        state = window.get_full_property(self._atom("_NET_WM_STATE"), X.AnyPropertyType)
+        return state is not None and self._atom("_NET_WM_STATE_HIDDEN") in state.value
+
+    def move_resize_window(self, window_data: WindowData, layout_data: CalculatedLayout) -> None:
+        """Ask the window manager for the new geometry with a single _NET_MOVERESIZE_WINDOW message.
+
+        Window managers without EWMH support get a single ConfigureWindow request instead.
+        """
+        self._send_move_resize(window_data, layout_data)
+        self.display.flush()
+
+    def move_resize_windows(self, moves: List[Tuple[WindowData, CalculatedLayout]]) -> None:
+        """Queue the geometry requests of every window and flush them to the server at once."""
+        for window_data, layout_data in moves:
+            self._send_move_resize(window_data, layout_data)
+        self.display.flush()
+
+    def _send_move_resize(self, window_data: WindowData, layout_data: CalculatedLayout) -> None:
+        window = self.display.create_resource_object("window", int(window_data.name))
+        geometry = [int(layout_data.x), int(layout_data.y), int(layout_data.width), int(layout_data.height)]
+        if self.supports_moveresize:
+            message = event.ClientMessage(
+                window=window,
+                client_type=self.net_moveresize_window,
+                data=(32, [_MOVERESIZE_FLAGS, *geometry]),
+            )
+            self.root.send_event(message, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+        else:
+            x, y, width, height = geometry
+            window.configure(x=x, y=y, width=width, height=height)
+
+    def close(self) -> None:
+        self.display.close()